@@ -0,0 +1,32 @@
+"""
+Riddle answer check benchmark: exact, typo and wrong answers
+
+Run from repository root:
+    python -m benchmarks.bench_answers [checks]
+"""
+import sys
+import time
+
+from src.modules.answers import AnswerMatcher
+
+MATCHER = AnswerMatcher("Электрическая лампочка", ["лампочка", "лампа", "светильник"])
+ANSWERS = {
+    "exact": "Лампочка",
+    "punctuation": "  электрическая,  ЛАМПОЧКА! ",
+    "typo": "лампачка",
+    "wrong": "груша",
+    "long wrong": "висит груша нельзя скушать",
+}
+
+
+def main(checks: int) -> None:
+    for name, text in ANSWERS.items():
+        started = time.perf_counter()
+        for _ in range(checks):
+            result = MATCHER.matches(text)
+        elapsed = (time.perf_counter() - started) / checks * 1e6
+        print(f"{name:>12}: {elapsed:.2f}us per check, accepted={result}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
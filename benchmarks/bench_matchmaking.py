@@ -0,0 +1,117 @@
+"""
+Matchmaking simulation: match quality and matching latency
+
+Players arrive over simulated time with normally distributed ratings,
+compare rating difference with the old first-come pairing.
+
+Run from repository root:
+    python -m benchmarks.bench_matchmaking [players] [arrival_seconds]
+"""
+import random
+import statistics
+import sys
+import time
+
+from src.modules.matchmaking import Matchmaker
+
+TOPICS = ["1", "2", "3", "4", "5"]
+TICK = 0.5
+
+
+def percentile(values: list[float], p: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def first_come(
+        arrivals: list[tuple[float, str]], ratings: dict[str, float], topics: dict[str, str]
+) -> list[float]:
+    # pairing per topic as the old waiting room did
+    waiting: dict[str, str] = {}
+    diffs = []
+    for _, sid in arrivals:
+        if (other := waiting.pop(topics[sid], None)) is not None:
+            diffs.append(abs(ratings[sid] - ratings[other]))
+        else:
+            waiting[topics[sid]] = sid
+    return diffs
+
+
+class Simulation:
+    def __init__(self, players: int, arrival: float) -> None:
+        rnd = random.Random(1)
+        self.arrival = arrival
+        self.ratings = {f"sid-{i}": rnd.gauss(1500, 300) for i in range(players)}
+        self.topics = {sid: rnd.choice(TOPICS) for sid in self.ratings}
+        self.arrivals = sorted((rnd.uniform(0, arrival), sid) for sid in self.ratings)
+        self.matchmaker = Matchmaker()
+        self.joined: dict[str, float] = {}
+        self.diffs: list[float] = []
+        self.waits: list[float] = []
+        self.join_times: list[float] = []
+        self.tick_times: list[float] = []
+        self.peak = 0
+
+    def matched(self, sids: list[str], now: float) -> None:
+        self.diffs.append(abs(self.ratings[sids[0]] - self.ratings[sids[1]]))
+        self.waits.extend(now - self.joined.pop(sid) for sid in sids)
+
+    def join(self, at: float, sid: str) -> None:
+        self.joined[sid] = at
+        started = time.perf_counter()
+        sids = self.matchmaker.join(self.topics[sid], sid, self.ratings[sid], at)
+        self.join_times.append(time.perf_counter() - started)
+        if sids:
+            self.matched(sids, at)
+
+    def tick(self, now: float) -> None:
+        self.peak = max(self.peak, len(self.matchmaker))
+        started = time.perf_counter()
+        for _, sids in self.matchmaker.tick(now):
+            self.matched(sids, now)
+        self.tick_times.append(time.perf_counter() - started)
+
+    def run(self) -> None:
+        now, index = 0.0, 0
+        # players without opponent within MAX_WINDOW stay, stop after a while
+        while (index < len(self.arrivals) or len(self.matchmaker)) and now < self.arrival * 10:
+            now += TICK
+            while index < len(self.arrivals) and self.arrivals[index][0] <= now:
+                self.join(*self.arrivals[index])
+                index += 1
+            self.tick(now)
+
+    def report(self) -> None:
+        diffs, waits = self.diffs, self.waits
+        fifo_diffs = first_come(self.arrivals, self.ratings, self.topics)
+        print(
+            f"{len(self.ratings)} players over {self.arrival:.0f}s, {len(diffs)} games, "
+            f"peak waiting {self.peak}"
+        )
+        print(
+            f"rating diff: mean {statistics.fmean(diffs):.1f}, p50 {percentile(diffs, 50):.1f}, "
+            f"p95 {percentile(diffs, 95):.1f} (first-come mean {statistics.fmean(fifo_diffs):.1f})"
+        )
+        print(
+            f"wait: p50 {percentile(waits, 50):.2f}s, p95 {percentile(waits, 95):.2f}s, "
+            f"max {max(waits):.2f}s"
+        )
+        print(
+            f"join: p50 {percentile(self.join_times, 50) * 1e6:.1f}us, "
+            f"p99 {percentile(self.join_times, 99) * 1e6:.1f}us"
+        )
+        print(
+            f"tick: p50 {percentile(self.tick_times, 50) * 1e3:.3f}ms, "
+            f"p99 {percentile(self.tick_times, 99) * 1e3:.3f}ms, "
+            f"max {max(self.tick_times) * 1e3:.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    simulation = Simulation(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50_000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 60.0,
+    )
+    simulation.run()
+    simulation.report()
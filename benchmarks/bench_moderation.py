@@ -0,0 +1,81 @@
+"""
+Chat moderation throughput with big term lists: scan time depends
+on message length, not on the count of terms
+
+Run from repository root:
+    python -m benchmarks.bench_moderation [terms] [messages]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from src.modules.moderation import MASK, ModerationRules, Term
+
+LETTERS = "абвгдежзийклмнопрстуфхцчшщъыьэюя"
+WORDS = (
+    "привет как дела что нового игра вопрос ответ ёлка лампочка сеть протокол "
+    "сервер клиент комната сообщение поиск быстро медленно хорошо"
+).split()
+
+
+def random_word(rnd: random.Random) -> str:
+    return "".join(rnd.choices(LETTERS, k=rnd.randint(5, 10)))
+
+
+def build(terms: list[str]) -> tuple[ModerationRules, float, int]:
+    started = time.perf_counter()
+    rules = ModerationRules(
+        version=1,
+        terms=[Term(text, "insult", True) for text in terms],
+        policies={"default": {"insult": MASK}},
+        rooms={},
+        default="default",
+    )
+    elapsed = time.perf_counter() - started
+    return rules, elapsed, tracemalloc.get_traced_memory()[0]
+
+
+def scan(rules: ModerationRules, texts: list[str]) -> tuple[float, int]:
+    started = time.perf_counter()
+    masked = sum(rules.moderate("room", text).action is not None for text in texts)
+    return time.perf_counter() - started, masked
+
+
+def main(count: int, messages: int) -> None:
+    rnd = random.Random(1)
+    terms = list({random_word(rnd) for _ in range(count)})
+    texts = []
+    for i in range(messages):
+        words = rnd.choices(WORDS, k=rnd.randint(3, 30))
+        if i % 10 == 0:
+            words.append(rnd.choice(terms))
+        texts.append(" ".join(words))
+    chars = sum(map(len, texts))
+
+    for size in (100, count // 10, count):
+        tracemalloc.start()
+        rules, built, memory = build(terms[:size])
+        tracemalloc.stop()
+        elapsed, masked = scan(rules, texts)
+        print(
+            f"{rules} built in {built:.2f}s, "
+            f"{memory / 2**20:.1f}MiB): {messages / elapsed:,.0f} msg/s, "
+            f"{chars / elapsed / 1e6:.2f}M chars/s, {elapsed / messages * 1e6:.1f}us "
+            f"per message, {masked} masked"
+        )
+
+    for length in (50, 500, 5000):
+        text = " ".join(rnd.choices(WORDS, k=length // 5))[:length]
+        runs = 200
+        started = time.perf_counter()
+        for _ in range(runs):
+            rules.moderate("room", text)
+        print(f"{len(text)} chars: {(time.perf_counter() - started) / runs * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20_000,
+    )
@@ -0,0 +1,81 @@
+"""
+Write-behind persistence benchmark: flush throughput and restore time
+
+Run from repository root:
+    python -m benchmarks.bench_persistence [games]
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.modules.content import content_loader
+from src.modules.mod import Client, Trivia
+from src.modules.persistence import CLIENT, GAME, StateStore, restore_containers
+
+
+def make_state(games: int) -> tuple[list[Client], list[Trivia]]:
+    pack = content_loader.current
+    clients, trivias = [], []
+    for i in range(games):
+        trivia = Trivia()
+        trivia.load_questions(pack)
+        trivia.topic = "6"
+        trivia.get_question("6")
+        for player in (f"sid-{i}-a", f"sid-{i}-b"):
+            client = Client()
+            client.name = player
+            client.game_uid = f"uid-{i}"
+            client.create_game("trivia")
+            trivia.add_user(player)
+            clients.append(client)
+        trivias.append(trivia)
+    return clients, trivias
+
+
+async def main(games: int) -> None:
+    clients, trivias = make_state(games)
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / "state.db"
+        store = StateStore(path)
+        await store.start(interval=3600)
+
+        for i, trivia in enumerate(trivias):
+            store.mark(GAME, f"uid-{i}", trivia)
+        for i, client in enumerate(clients):
+            store.mark(CLIENT, f"/trivia client-{i}", client)
+        started = time.perf_counter()
+        rows = await store.flush()
+        elapsed = time.perf_counter() - started
+        print(f"initial flush: {rows} rows in {elapsed:.3f}s ({rows / elapsed:,.0f} rows/s)")
+
+        # heavy scoring traffic: many changes per object, one write per object
+        started = time.perf_counter()
+        for _ in range(10):
+            for i, client in enumerate(clients):
+                client.game.score_increment()
+                store.mark(CLIENT, f"/trivia client-{i}", client)
+        marked = time.perf_counter() - started
+        started = time.perf_counter()
+        rows = await store.flush()
+        elapsed = time.perf_counter() - started
+        print(
+            f"scoring: {10 * len(clients)} changes marked in {marked:.3f}s, "
+            f"flushed as {rows} rows in {elapsed:.3f}s"
+        )
+        await store.stop()
+        print(f"database size: {path.stat().st_size / 1024 / 1024:.1f} MiB")
+
+        store = StateStore(path)
+        started = time.perf_counter()
+        states = await store.restore()
+        read = time.perf_counter() - started
+        restore_containers(states)
+        elapsed = time.perf_counter() - started
+        print(f"restore: {len(states)} states read in {read:.3f}s, total {elapsed:.3f}s")
+        await store.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -0,0 +1,73 @@
+"""
+Quiz show round benchmark: record answers and score one round for many players,
+compare with per-answer dicts and per-player score lookups of two-player games
+
+Run from repository root:
+    python -m benchmarks.bench_quiz [players] [rounds]
+"""
+import random
+import sys
+import time
+
+from src.modules.content import TriviaQuestion
+from src.modules.quiz import QuizShow
+
+
+def dict_round(answers: list[tuple[str, int]], correct: int, scores: dict[str, int]) -> float:
+    started = time.perf_counter()
+    recorded = [{"answer": index, "sid": sid} for sid, index in answers]
+    for item in recorded:
+        if item.get("answer") == correct:
+            scores[item["sid"]] += 1
+    return time.perf_counter() - started
+
+
+def main(players: int, rounds: int) -> None:
+    rnd = random.Random(1)
+    questions = [
+        TriviaQuestion(f"question {i}", rnd.randint(1, 4), tuple("abcd")) for i in range(rounds)
+    ]
+    show = QuizShow("bench", "room", questions)
+    sids = [f"sid-{i}" for i in range(players)]
+    for sid in sids:
+        show.add_player(sid, sid)
+
+    record = score = deltas = legacy = 0.0
+    scores = dict.fromkeys(sids, 0)
+    for _ in range(rounds):
+        question = show.next_question()
+        # 90% of players answer before the deadline
+        answers = [(sid, rnd.randint(1, 4)) for sid in sids if rnd.random() < 0.9]
+        started = time.perf_counter()
+        for sid, index in answers:
+            show.record(sid, index, show.round)
+        record += time.perf_counter() - started
+        started = time.perf_counter()
+        result = show.score_round()
+        score += time.perf_counter() - started
+        started = time.perf_counter()
+        show.deltas(result)
+        deltas += time.perf_counter() - started
+        legacy += dict_round(answers, question.answer, scores)
+
+    started = time.perf_counter()
+    leaders = show.leaders(10)
+    top = time.perf_counter() - started
+    print(f"{players} players, {rounds} rounds, leader score {leaders[0]['score']}")
+    print(
+        f"record: {record / rounds * 1e3:.2f}ms per round "
+        f"({record / rounds / players * 1e9:.0f}ns per answer)"
+    )
+    print(
+        f"score round: {score / rounds * 1e3:.3f}ms, "
+        f"per-player deltas: {deltas / rounds * 1e3:.2f}ms"
+    )
+    print(f"dict answers + score lookups: {legacy / rounds * 1e3:.2f}ms per round")
+    print(f"leaders: {top * 1e3:.2f}ms")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+    )
@@ -0,0 +1,46 @@
+"""
+Chat history search benchmark over a big room
+
+Run from repository root:
+    python -m benchmarks.bench_search [messages]
+"""
+import random
+import sys
+import time
+
+from src.modules.history import MessageHistory
+
+WORDS = (
+    "привет как дела что нового игра вопрос ответ ёлка лампочка сеть протокол "
+    "python язык сервер клиент комната сообщение поиск быстро медленно хорошо"
+).split()
+QUERIES = ["привет", "елка ответ", "сер*", "python сервер", "прот*", "редкоеслово"]
+
+
+def main(messages: int) -> None:
+    rnd = random.Random(1)
+    history = MessageHistory(limit=messages)
+    started = time.perf_counter()
+    for i in range(messages):
+        words = rnd.choices(WORDS, k=8)
+        if i % 10_000 == 0:
+            words.append("редкоеслово")
+        history.add_message({"text": " ".join(words), "author": f"user{i % 100}"})
+    elapsed = time.perf_counter() - started
+    print(f"indexed {messages} messages in {elapsed:.2f}s ({messages / elapsed:,.0f} msg/s)")
+
+    for query in QUERIES:
+        runs = 200
+        started = time.perf_counter()
+        for _ in range(runs):
+            found, cursor = history.search(query, limit=20)
+        first = (time.perf_counter() - started) / runs * 1000
+        started = time.perf_counter()
+        for _ in range(runs):
+            history.search(query, before=cursor, limit=20)
+        second = (time.perf_counter() - started) / runs * 1000
+        print(f"{query!r:>18}: page 1 {first:.3f} ms, page 2 {second:.3f} ms, hits {len(found)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
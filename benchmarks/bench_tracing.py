@@ -0,0 +1,53 @@
+"""
+Tracing overhead per event: no tracer, middleware with sampling off, 10% and 100% sampled.
+With TRACE_SAMPLE=0 init_app does not install the middleware at all
+
+Run from repository root:
+    python -m benchmarks.bench_tracing [events]
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.apps.base import BaseNamespace
+from src.modules.tracing import FileSpanExporter, Tracer, span
+
+
+class BenchApp(BaseNamespace):
+    async def on_answer(self, sid, data):
+        with span("validate"):
+            index = int(data["index"])
+        with span("game.update"):
+            index += 1
+        with span("encode"):
+            return {"index": index}
+
+
+async def measure(namespace: BaseNamespace, events: int) -> float:
+    data = {"index": 1}
+    started = time.perf_counter()
+    for _ in range(events):
+        await namespace.trigger_event("answer", "sid", data)
+    return (time.perf_counter() - started) / events * 1e6
+
+
+async def main(events: int) -> None:
+    baseline = await measure(BenchApp("/bench"), events)
+    print(f"{'no tracer':<16}{baseline:8.2f}us/event")
+    with tempfile.TemporaryDirectory() as folder:
+        for rate in (0.0, 0.1, 1.0):
+            tracer = Tracer(FileSpanExporter(Path(folder) / f"spans-{rate}.jsonl"), rate)
+            namespace = BenchApp("/bench")
+            namespace.add_middleware(tracer.middleware)
+            result = await measure(namespace, events)
+            await tracer.stop()
+            print(
+                f"{f'sample {rate:.0%}':<16}{result:8.2f}us/event "
+                f"({result - baseline:+.2f}us, {tracer.exporter.exported} spans)"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -0,0 +1,88 @@
+"""
+Socket.IO packet size and encode/decode CPU: JSON text packets
+against MessagePack packets for the payloads the apps send
+
+Run from repository root (needs msgpack package):
+    python -m benchmarks.bench_transport [runs]
+"""
+import random
+import sys
+import time
+from typing import Any, Callable
+
+from socketio import packet
+
+from src.modules.content import content_loader
+from src.modules.transport import msgpack
+
+WORDS = (
+    "привет как дела что нового игра вопрос ответ ёлка лампочка сеть протокол "
+    "сервер клиент комната сообщение поиск быстро медленно хорошо"
+).split()
+
+
+def payloads() -> dict[str, tuple[str, str, Any]]:
+    rnd = random.Random(1)
+    pack = content_loader.current
+    question = pack.questions_for("5")[0]
+    players = [{"name": f"player{i}", "score": rnd.randint(0, 10)} for i in range(2)]
+    messages = [
+        {"text": " ".join(rnd.choices(WORDS, k=rnd.randint(3, 15))), "author": f"user{i % 7}"}
+        for i in range(100)
+    ]
+    return {
+        "trivia game": ("/trivia", "game", {
+            "uid": "0b6a3c5e-2f1d-4a8e-9c7b-5d4e3f2a1b0c",
+            "question_count": 9,
+            "players": players,
+            "answer": question.answer,
+            "current_question": {"text": question.text, "options": list(question.options)},
+        }),
+        "trivia topics": ("/trivia", "topics", [dict(topic) for topic in pack.topics]),
+        "quiz result": ("/trivia", "quiz_result", {
+            "round": 3, "answer": 2, "distribution": [1200, 30512, 800, 7311],
+            "answered": 39823, "players": 50000,
+        }),
+        "chat message": ("/chat", "message", messages[0]),
+        "chat batch x100": ("/chat", "messages", messages),
+    }
+
+
+def measure(func: Callable[[], Any], runs: int) -> float:
+    started = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - started) / runs * 1e6
+
+
+def compare(
+        name: str, namespace: str, event: str, data: Any, classes: tuple[type, ...], runs: int
+) -> None:
+    row = [f"{name:>16}"]
+    for packet_class in classes:
+        def make(packet_class=packet_class):
+            return packet_class(packet.EVENT, data=[event, data], namespace=namespace)
+
+        encoded = make().encode()
+        size = len(encoded.encode() if isinstance(encoded, str) else encoded)
+        encode = measure(lambda make=make: make().encode(), runs)
+        decode = measure(
+            lambda packet_class=packet_class, encoded=encoded: packet_class(encoded_packet=encoded),
+            runs,
+        )
+        row.append(f"{size:>6}B enc {encode:6.1f}us dec {decode:6.1f}us")
+    print(" | ".join(row))
+
+
+def main(runs: int) -> None:
+    if msgpack is None:
+        sys.exit("msgpack package isn't installed")
+    from socketio.msgpack_packet import MsgPackPacket
+
+    print(f"{'payload':>16} | {'JSON':^33} | {'MessagePack':^33}")
+    for name, (namespace, event, data) in payloads().items():
+        compare(name, namespace, event, data, (packet.Packet, MsgPackPacket), runs)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,216 @@
+"""
+Benchmark matrix of runtime tuning profiles: start the server once per profile
+and record connect latency, call throughput, latency percentiles and memory
+
+Run from repository root:
+    python -m benchmarks.matrix [--profiles default quiet uvloop] [--clients 200] [--calls 20]
+        [--report matrix.json] [--compare baseline.json]
+
+Every profile gets a fresh `python -m src.main` process with TUNING_PROFILE and PORT set,
+clients connect with the profile transports, then call riddle "next" and chat "send_message"
+in turns and wait for the ack. RSS is read from /proc (Linux only, "-" elsewhere)
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+import socketio
+
+import src
+from src.modules.persistence import STATE_DB_ENV
+from src.modules.tuning import PORT_ENV, PROFILE_ENV, PROFILES, Profile
+
+PORT = 8091
+READY_TIMEOUT = 30.0
+CALL_TIMEOUT = 10.0
+ROOMS = 10
+PERCENTILES = (50, 90, 99)
+NAMESPACES = ["/chat", "/riddle"]
+COLUMNS = ("connect_p50", "calls_per_s", "p50", "p90", "p99", "rss_mb", "peak_rss_mb")
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {f"p{p}": 0.0 for p in PERCENTILES}
+    cuts = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else values * 99
+    return {f"p{p}": round(cuts[p - 1] * 1000, 3) for p in PERCENTILES}
+
+
+def memory(pid: int) -> dict[str, float | None]:
+    """
+    Current and peak resident memory of the process
+    :param pid: process id
+    :return: rss_mb and peak_rss_mb, None if /proc isn't available
+    """
+    values = {"VmRSS": None, "VmHWM": None}
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as file:
+            for line in file:
+                key, _, value = line.partition(":")
+                if key in values:
+                    values[key] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        pass
+    return {"rss_mb": values["VmRSS"], "peak_rss_mb": values["VmHWM"]}
+
+
+class Load:
+    def __init__(self, url: str, transports: list[str], calls: int) -> None:
+        self._url = url
+        self._transports = transports
+        self._calls = calls
+        self.connect: list[float] = []
+        self.latency: list[float] = []
+        self.errors = 0
+
+    async def _call(self, client: socketio.AsyncClient, event: str, data: dict, namespace: str) -> None:
+        started = time.perf_counter()
+        try:
+            await client.call(event, data, namespace=namespace, timeout=CALL_TIMEOUT)
+        except socketio.exceptions.SocketIOError:
+            self.errors += 1
+        else:
+            self.latency.append(time.perf_counter() - started)
+
+    async def _client(self, number: int) -> None:
+        client = socketio.AsyncClient()
+        started = time.perf_counter()
+        try:
+            await client.connect(self._url, namespaces=NAMESPACES, transports=self._transports)
+        except socketio.exceptions.ConnectionError:
+            self.errors += 1
+            return
+        self.connect.append(time.perf_counter() - started)
+        try:
+            room = f"bench{number % ROOMS}"
+            await self._call(client, "join", {"name": f"bench{number}", "room": room}, "/chat")
+            for call in range(self._calls):
+                if call % 2:
+                    await self._call(client, "send_message", {"text": f"message {call}"}, "/chat")
+                else:
+                    await self._call(client, "next", {}, "/riddle")
+        finally:
+            await client.disconnect()
+
+    async def run(self, clients: int) -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*(self._client(number) for number in range(clients)))
+        return time.perf_counter() - started
+
+
+async def wait_ready(url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + READY_TIMEOUT
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                async with session.get(f"{url}/ready") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server isn't ready in {READY_TIMEOUT}s")
+
+
+def start_server(profile: str, port: int, folder: str) -> subprocess.Popen:
+    root = Path(src.__file__).parent
+    env = {
+        **os.environ,
+        PROFILE_ENV: profile,
+        PORT_ENV: str(port),
+        # every profile starts with an empty state database
+        STATE_DB_ENV: str(Path(folder) / "state.db"),
+        "PYTHONPATH": str(root.parent),
+    }
+    # routes serve templates and static relative to src/
+    return subprocess.Popen(
+        [sys.executable, "-m", "src.main"],
+        cwd=root,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def run_profile(name: str, clients: int, calls: int, port: int) -> dict:
+    profile = PROFILES[name]
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as folder:
+        return await _run_profile(profile, start_server(name, port, folder), url, clients, calls)
+
+
+async def _run_profile(
+        profile: Profile, process: subprocess.Popen, url: str, clients: int, calls: int
+) -> dict:
+    try:
+        await wait_ready(url, process)
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{url}/ready") as response:
+                tuning = (await response.json())["tuning"]
+        idle = memory(process.pid)["rss_mb"]
+        load = Load(url, list(profile.transports), calls)
+        elapsed = await load.run(clients)
+        return {
+            "loop": tuning["loop"],
+            "transports": list(profile.transports),
+            "elapsed": round(elapsed, 3),
+            "calls": len(load.latency),
+            "errors": load.errors,
+            "connect_p50": percentiles(load.connect)["p50"],
+            "calls_per_s": round(len(load.latency) / elapsed, 1) if elapsed else 0.0,
+            **percentiles(load.latency),
+            "idle_rss_mb": idle,
+            **memory(process.pid),
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def print_report(report: dict, baseline: dict | None) -> None:
+    print(f"{report['clients']} clients x {report['calls']} calls per profile, latency in ms")
+    print(f"{'profile':<16}{'loop':<9}" + "".join(f"{column:>13}" for column in COLUMNS))
+    for name, row in report["profiles"].items():
+        line = f"{name:<16}{row['loop']:<9}" + "".join(
+            f"{'-' if row[column] is None else row[column]:>13}" for column in COLUMNS
+        )
+        if row["errors"]:
+            line += f"  errors: {row['errors']}"
+        if baseline and (base := baseline["profiles"].get(name)) and base["calls_per_s"]:
+            line += f"  throughput {row['calls_per_s'] / base['calls_per_s'] - 1:+.1%} vs baseline"
+        print(line)
+
+
+async def main(args: argparse.Namespace) -> None:
+    report = {"clients": args.clients, "calls": args.calls, "profiles": {}}
+    for name in args.profiles:
+        report["profiles"][name] = await run_profile(name, args.clients, args.calls, args.port)
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(report, baseline)
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2))
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=list(PROFILES))
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=20, help="calls per client")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--report", type=Path, help="write JSON report")
+    parser.add_argument("--compare", type=Path, help="baseline JSON report")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args(sys.argv[1:])))
@@ -0,0 +1,158 @@
+"""
+Replay captured traffic against a local server and report handler latency
+
+Capture traffic with CAPTURE_FILE=capture.jsonl, then run from repository root:
+    python -m benchmarks.replay capture.jsonl [--speed 1] [--copies 10] [--url URL]
+        [--report build.json] [--compare baseline.json]
+
+--speed 0 replay at max speed, --copies run every captured client N times concurrently,
+without --url a local init_app() server is started, so replay works offline
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import socketio
+from aiohttp import web
+
+import src
+from src.app import init_app
+from src.modules.capture import CONNECT, DISCONNECT, CapturedEvent, read_capture
+from src.modules.persistence import STATE_DB_ENV
+
+PORT = 8090
+CALL_TIMEOUT = 10.0
+PERCENTILES = (50, 90, 99)
+
+
+class Replay:
+    def __init__(self, url: str, speed: float) -> None:
+        self._url = url
+        self._speed = speed
+        self._started = 0.0
+        self.latency: defaultdict[str, list[float]] = defaultdict(list)
+        self.errors: defaultdict[str, int] = defaultdict(int)
+
+    async def _wait(self, at: float) -> None:
+        if self._speed > 0 and (delay := self._started + at / self._speed - time.perf_counter()) > 0:
+            await asyncio.sleep(delay)
+
+    async def _client(self, events: list[CapturedEvent]) -> None:
+        client = socketio.AsyncClient()
+        namespaces = sorted({event.namespace for event in events})
+        await self._wait(events[0].at)
+        try:
+            await client.connect(self._url, namespaces=namespaces, transports=["websocket"])
+        except socketio.exceptions.ConnectionError:
+            self.errors[CONNECT] += 1
+            return
+        try:
+            for event in events:
+                if event.event in (CONNECT, DISCONNECT):
+                    continue
+                await self._wait(event.at)
+                name = f"{event.namespace}:{event.event}"
+                started = time.perf_counter()
+                try:
+                    # server acks after the handler returns
+                    await client.call(
+                        event.event, event.data, namespace=event.namespace, timeout=CALL_TIMEOUT
+                    )
+                except socketio.exceptions.SocketIOError:
+                    self.errors[name] += 1
+                else:
+                    self.latency[name].append(time.perf_counter() - started)
+        finally:
+            await client.disconnect()
+
+    async def run(self, clients: dict[int, list[CapturedEvent]], copies: int) -> float:
+        self._started = time.perf_counter()
+        await asyncio.gather(
+            *(self._client(events) for events in clients.values() for _ in range(copies))
+        )
+        return time.perf_counter() - self._started
+
+    def report(self, elapsed: float) -> dict:
+        events = {}
+        for name, values in sorted(self.latency.items()):
+            if len(values) > 1:
+                cuts = statistics.quantiles(values, n=100, method="inclusive")
+            else:
+                cuts = values * 99
+            events[name] = {
+                "count": len(values),
+                **{f"p{p}": round(cuts[p - 1] * 1000, 3) for p in PERCENTILES},
+                "max": round(max(values) * 1000, 3),
+            }
+        return {
+            "elapsed": round(elapsed, 3),
+            "calls": sum(len(values) for values in self.latency.values()),
+            "errors": dict(self.errors),
+            "events": events,
+        }
+
+
+async def serve(folder: str) -> web.AppRunner:
+    # routes serve templates and static relative to src/
+    os.chdir(Path(src.__file__).parent)
+    # replayed clients are kept out of the working state database
+    os.environ[STATE_DB_ENV] = str(Path(folder) / "state.db")
+    runner = web.AppRunner(await init_app(), shutdown_timeout=3)
+    await runner.setup()
+    await web.TCPSite(runner, port=PORT).start()
+    return runner
+
+
+def print_report(report: dict, baseline: dict | None) -> None:
+    print(f"replayed {report['calls']} calls in {report['elapsed']}s, errors: {report['errors']}")
+    print(f"{'event':<28}{'count':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  ms")
+    for name, row in report["events"].items():
+        line = f"{name:<28}{row['count']:>8}" + "".join(
+            f"{row[key]:>10}" for key in ("p50", "p90", "p99", "max")
+        )
+        if baseline and (base := baseline["events"].get(name)) and base["p99"]:
+            line += f"  p99 {row['p99'] / base['p99'] - 1:+.1%} vs baseline"
+        print(line)
+
+
+async def main(args: argparse.Namespace) -> None:
+    clients = read_capture(args.capture)
+    with tempfile.TemporaryDirectory() as folder:
+        runner = None if args.url else await serve(folder)
+        try:
+            replay = Replay(args.url or f"http://127.0.0.1:{PORT}", args.speed)
+            report = replay.report(await replay.run(clients, args.copies))
+        finally:
+            if runner is not None:
+                await runner.cleanup()
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(report, baseline)
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("capture", type=Path)
+    parser.add_argument("--speed", type=float, default=1.0, help="0 is max speed")
+    parser.add_argument("--copies", type=int, default=1)
+    parser.add_argument("--url", help="replay against running server")
+    parser.add_argument("--report", type=Path, help="write JSON report")
+    parser.add_argument("--compare", type=Path, help="baseline JSON report")
+    args = parser.parse_args(argv)
+    args.capture = args.capture.resolve()
+    for name in ("report", "compare"):
+        if (value := getattr(args, name)) is not None:
+            setattr(args, name, value.resolve())
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args(sys.argv[1:])))
@@ -0,0 +1,100 @@
+import asyncio
+import hmac
+import os
+
+from aiohttp import web
+
+from src.modules.memory import (
+    TRACE_FRAMES,
+    AllocationTracker,
+    list_containers,
+    memory_report,
+)
+from src.modules.profiler import MAX_DURATION, ProfileSession
+
+ADMIN_TOKEN_ENV = "ADMIN_TOKEN"
+
+
+def get_admin_token() -> str | None:
+    return os.environ.get(ADMIN_TOKEN_ENV) or None
+
+
+def check_admin(request: web.Request) -> None:
+    """
+    Allow request only with "Authorization: Bearer <ADMIN_TOKEN>" header,
+    admin routes are disabled when token isn't configured
+    :raise HTTPForbidden: token not configured or doesn't match
+    """
+    token = request.app.get("admin_token")
+    header = request.headers.get("Authorization", "")
+    if not token or not hmac.compare_digest(header, f"Bearer {token}"):
+        raise web.HTTPForbidden(text="Admin token required")
+
+
+def _query_float(request: web.Request, name: str, default: float) -> float:
+    try:
+        return float(request.query.get(name, default))
+    except ValueError as err:
+        raise web.HTTPBadRequest(text=f"Parameter {name} must be a number") from err
+
+
+async def profile(request: web.Request) -> web.StreamResponse:
+    """
+    Profile the event loop: GET /admin/profile?seconds=5&interval=0.005&event=answer&top=20
+    format=collapsed return only collapsed stacks as text
+    """
+    check_admin(request)
+    if ProfileSession.is_running():
+        raise web.HTTPConflict(text="Profile session is already running")
+    try:
+        session = ProfileSession(
+            duration=_query_float(request, "seconds", 5),
+            interval=_query_float(request, "interval", 0.005),
+            event=request.query.get("event"),
+            namespaces=request.app["sio"].namespace_handlers.values(),
+        )
+    except ValueError as err:
+        raise web.HTTPBadRequest(text=f"{err}, max is {MAX_DURATION}") from err
+    await session.run()
+    if request.query.get("format") == "collapsed":
+        return web.Response(text=session.collapsed())
+    return web.json_response(session.report(int(_query_float(request, "top", 20))))
+
+
+async def memory(request: web.Request) -> web.StreamResponse:
+    """
+    Object counts and approximate size per container: GET /admin/memory?top=20
+    """
+    check_admin(request)
+    limit = int(_query_float(request, "top", 20))
+    # heap walk runs in worker thread, containers are listed on the loop
+    report = await asyncio.to_thread(memory_report, limit, list_containers())
+    return web.json_response(report)
+
+
+async def memory_trace(request: web.Request) -> web.StreamResponse:
+    """
+    Allocation tracing: GET /admin/memory/trace?action=start&frames=10 take baseline,
+    action=diff&group=lineno&top=20 compare with baseline by allocation site,
+    action=stop stop tracing
+    """
+    check_admin(request)
+    action = request.query.get("action", "diff")
+    if action == "start":
+        frames = int(_query_float(request, "frames", TRACE_FRAMES))
+        await asyncio.to_thread(AllocationTracker.start, frames)
+        return web.json_response({"tracing": True})
+    if action == "stop":
+        AllocationTracker.stop()
+        return web.json_response({"tracing": False})
+    if action != "diff":
+        raise web.HTTPBadRequest(text="Action must be start, diff or stop")
+    if (group := request.query.get("group", "lineno")) not in ("lineno", "filename", "traceback"):
+        raise web.HTTPBadRequest(text="Group must be lineno, filename or traceback")
+    try:
+        body = await asyncio.to_thread(
+            AllocationTracker.diff, int(_query_float(request, "top", 20)), group
+        )
+    except RuntimeError as err:
+        raise web.HTTPConflict(text=str(err)) from err
+    return web.json_response(body)
@@ -1,32 +1,67 @@
+import asyncio
 import logging
 import logging.config
+from typing import Iterable
 
 import socketio
+import yaml
 from aiohttp import web
 from aiohttp.web_app import Application
 
-from src.apps.chat import ChatApp
-from src.apps.riddle import RiddleApp
-from src.apps.trivia import TriviaApp
+from src.admin import get_admin_token
+from src.apps import chat, riddle, trivia
+from src.config.config_folder import get_config_folder
+from src.modules.assets import asset_cache
+from src.modules.capture import TrafficRecorder, get_capture_file
+from src.modules.content import content_loader
+from src.modules.mod import Client
+from src.modules.moderation import moderation_loader, moderator
+from src.modules.monitor import admission, loop_monitor
+from src.modules.persistence import state_store
+from src.modules.startup import startup
+from src.modules.tracing import (
+    FileSpanExporter,
+    Tracer,
+    get_sample_rate,
+    get_trace_file,
+)
+from src.modules.transport import get_serializer
+from src.modules.tuning import Profile, get_profile, server_options
 from src.routes import setup_routes
 
+LOGGING_CONFIG = "logging.yaml"
 
-async def init_app():
+
+def setup_logging() -> None:
+    """
+    Configure logging from config/logging.yaml, called once by the entrypoint
+    """
+    with get_config_folder(LOGGING_CONFIG).open() as file:
+        logging.config.dictConfig(yaml.safe_load(file))
+
+
+async def init_app(profile: Profile | None = None):
     # Create webapp
     app = web.Application()
-    # logger
-    logging.basicConfig(level="DEBUG")
-    logger = logging.getLogger()
-    # init socketio.AsyncServer in app scope
-    app["sio"] = socketio.AsyncServer(
-        async_mode="aiohttp", logger=logger, engine_logger=logger
-    )
-    # Attach SocketIO to webapp
-    app["sio"].attach(app)
-    app["sio"].register_namespace(RiddleApp("/riddle"))
-    app["sio"].register_namespace(ChatApp("/chat"))
-    app["sio"].register_namespace(TriviaApp("/trivia"))
-
+    app["profile"] = profile or get_profile()
+    with startup.phase("socketio attach"):
+        # init socketio.AsyncServer in app scope
+        logger = logging.getLogger()
+        # opt-in MessagePack packets, browser pages get the serializer from /transport.js
+        app["serializer"] = get_serializer()
+        app["sio"] = socketio.AsyncServer(
+            async_mode="aiohttp",
+            logger=logger,
+            engine_logger=logger,
+            serializer=app["serializer"],
+            **server_options(app["profile"]),
+        )
+        # Attach SocketIO to webapp
+        app["sio"].attach(app)
+    with startup.phase("namespaces"):
+        register_namespaces(app)
+    # admin routes are enabled only with ADMIN_TOKEN
+    app["admin_token"] = get_admin_token()
     # init app context
     app.cleanup_ctx.append(context)
     # init webapp routes
@@ -34,6 +69,63 @@ async def init_app():
     return app
 
 
+def register_namespaces(app: Application):
+    app["sio"].register_namespace(riddle.RiddleApp(riddle.NAMESPACE))
+    app["sio"].register_namespace(chat.ChatApp(chat.NAMESPACE))
+    app["sio"].register_namespace(trivia.TriviaApp(trivia.NAMESPACE))
+    # opt-in traffic capture for replay, see benchmarks/replay.py
+    app["recorder"] = None
+    if capture_file := get_capture_file():
+        app["recorder"] = TrafficRecorder(capture_file)
+    # opt-in span tracing with head-based sampling
+    app["tracer"] = None
+    if trace_file := get_trace_file():
+        app["tracer"] = Tracer(FileSpanExporter(trace_file), get_sample_rate())
+    for namespace in app["sio"].namespace_handlers.values():
+        if app["recorder"]:
+            namespace.add_middleware(app["recorder"].middleware)
+        if app["tracer"] and app["tracer"].enabled:
+            namespace.add_middleware(app["tracer"].middleware)
+        namespace.add_middleware(loop_monitor.middleware)
+        namespace.add_middleware(admission.middleware)
+    # moderation is the innermost stage of chat messages
+    app["sio"].namespace_handlers[chat.NAMESPACE].add_middleware(moderator.middleware)
+
+
+async def restore_sessions(app: Application, sessions: Iterable[tuple[str, str, Client]]):
+    # restored clients wait for reconnect with their session token
+    for namespace, token, client in sessions:
+        if (handler := app["sio"].namespace_handlers.get(namespace)) is not None:
+            await handler.restore_session(token, client)
+
+
 async def context(app: Application):
+    with startup.phase("preload"):
+        # content, moderation lists and site assets are independent, read them concurrently
+        await asyncio.gather(
+            content_loader.start(), moderation_loader.start(), asset_cache.start()
+        )
+    with startup.phase("state restore"):
+        # games are restored with the questions they were saved with
+        await restore_sessions(app, await state_store.start())
+    loop_monitor.start()
+    if app["recorder"]:
+        app["recorder"].start()
+    if app["tracer"]:
+        app["tracer"].start()
+    startup.set_warm(True)
     yield
+    startup.set_warm(False)
+    if app["recorder"]:
+        await app["recorder"].stop()
+    if app["tracer"]:
+        await app["tracer"].stop()
+    await loop_monitor.stop()
+    # store is stopped first, parked sessions released below stay persisted
+    await state_store.stop()
+    for namespace in app["sio"].namespace_handlers.values():
+        await namespace.stop()
+    await content_loader.stop()
+    await moderation_loader.stop()
+    await asset_cache.stop()
     await app["sio"].shutdown()
@@ -0,0 +1,165 @@
+import asyncio
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterable
+
+import socketio
+
+from src.modules.mod import Client, ClientContainer
+from src.modules.persistence import CLIENT, state_store
+from src.modules.session import ParkedSession, SessionManager
+from src.modules.tracing import detached_task, span
+
+CallNext = Callable[[], Awaitable[Any]]
+Middleware = Callable[[socketio.AsyncNamespace, str, tuple, CallNext], Awaitable[Any]]
+
+
+async def cancel_tasks(tasks: Iterable[asyncio.Task | None]) -> None:
+    """
+    Cancel background tasks and wait until they are finished
+    :param tasks: tasks, None items are skipped
+    """
+    running = [task for task in tasks if task is not None]
+    for task in running:
+        task.cancel()
+    await asyncio.gather(*running, return_exceptions=True)
+
+
+class BaseNamespace(socketio.AsyncNamespace):
+    """
+    Namespace with middlewares around event handlers and resumable sessions.
+    Middleware get namespace, event name, handler arguments and call_next
+    """
+
+    def __init__(self, namespace=None) -> None:
+        super().__init__(namespace)
+        self._middlewares: list[Middleware] = []
+        self.sessions = SessionManager(self._expire_session)
+        self._background: set[asyncio.Task] = set()
+        # looked up once, middlewares use it on every event
+        self._clients = ClientContainer(self.namespace)
+
+    @property
+    def clients(self) -> ClientContainer:
+        return self._clients
+
+    def add_middleware(self, middleware: Middleware) -> None:
+        """
+        Add middleware, first added is the outermost
+        :param middleware: coroutine function
+        """
+        self._middlewares.append(middleware)
+
+    async def trigger_event(self, event: str, *args):
+        if not self._middlewares:
+            return await super().trigger_event(event, *args)
+        call: CallNext = partial(super().trigger_event, event, *args)
+        for middleware in reversed(self._middlewares):
+            call = partial(middleware, self, event, args, call)
+        return await call()
+
+    async def emit(self, event, data=None, to=None, room=None, *args, **kwargs):
+        target = to or room
+        # SID replaying missed events gets this one after them
+        if not self.sessions.is_held(target):
+            with span("emit", event=str(event)):
+                await super().emit(event, data, to, room, *args, **kwargs)
+        if self.sessions.buffering:
+            for name in target if isinstance(target, list) else [target]:
+                self.sessions.record(name, event, data)
+
+    def start_session(self, sid: str) -> None:
+        """
+        Issue session token to new client, call at the end of on_connect
+        :param sid: client SID
+        """
+        self._send_session(sid, resumed=False)
+
+    async def resume_session(self, sid: str, auth: Any) -> bool:
+        """
+        Attach parked client to new SID if auth has valid session token
+        :param sid: new client SID
+        :param auth: auth data of connect event
+        :return: True if session resumed
+        """
+        token = auth.get("session") if isinstance(auth, dict) else None
+        if (session := self.sessions.resume(token, sid)) is None:
+            return False
+        old_sid, client = session.sid, session.client
+        state_store.mark_deleted(CLIENT, self.clients.key(old_sid))
+        self.clients.del_item(old_sid)
+        self.clients.set_item(sid, client)
+        await self.session_resumed(old_sid, sid, client)
+        # rooms are entered after replay, so live events can't overtake missed ones
+        self._send_session(sid, resumed=True)
+        return True
+
+    def park_session(self, sid: str, client: Client) -> bool:
+        """
+        Keep client state of disconnected SID for grace period, call in on_disconnect
+        :param sid: client SID
+        :param client: Client
+        :return: False if SID has no session, client should be released now
+        """
+        return self.sessions.park(sid, client, self.rooms(sid))
+
+    async def restore_session(self, token: str, client: Client) -> None:
+        """
+        Park client restored from state store, it's released if not resumed
+        within grace period. Token stands for SID until the client reconnects
+        :param token: session token
+        :param client: restored Client
+        """
+        old_sid = client.sid
+        self.clients.set_item(token, client)
+        self.clients.bind_session(token, token)
+        rooms = [room for room in (client.room, client.game_uid) if room]
+        self.sessions.restore(token, client, rooms)
+        if old_sid is not None:
+            # namespace state still refers to SID from before restart
+            await self.session_resumed(old_sid, token, client)
+
+    def _send_session(self, sid: str, *, resumed: bool) -> None:
+        token = self.sessions.issue(sid)
+        self.clients.bind_session(sid, token)
+        state_store.mark(CLIENT, self.clients.key(sid), self.clients.get_item(sid))
+        # connect handler runs before client receive CONNECT packet,
+        # so session token and missed events are sent right after it
+        task = detached_task(self._replay(sid, token, resumed))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _replay(self, sid: str, token: str, resumed: bool) -> None:
+        await self._emit_to(sid, "session", {"token": token, "resumed": resumed})
+        while (item := self.sessions.next_event(sid)) is not None:
+            await self._emit_to(sid, *item)
+        # no await between the last buffered event and room entering
+        if (session := self.sessions.release_hold(sid)) is not None:
+            for room in session.rooms:
+                if room != session.sid:
+                    await self.enter_room(sid, room)
+
+    async def _emit_to(self, sid: str, event: str, data: Any) -> None:
+        with span("emit", event=event):
+            await super().emit(event, data, to=sid)
+
+    async def _expire_session(self, session: ParkedSession) -> None:
+        await self.release(session.sid, session.client)
+
+    async def stop(self) -> None:
+        """
+        Stop background work and release parked sessions on shutdown,
+        override in namespace to cancel its own tasks
+        """
+        await cancel_tasks(list(self._background))
+        await self.sessions.stop()
+
+    async def session_resumed(self, old_sid: str, sid: str, client: Client) -> None:
+        """
+        Move namespace state from old SID to new one, override in namespace
+        """
+
+    async def release(self, sid: str, client: Client) -> None:
+        """
+        Final cleanup of client, override in namespace
+        """
+        self.clients.disconnect(sid)
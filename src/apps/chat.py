@@ -1,28 +1,64 @@
+import asyncio
 import logging
+import time
 from typing import Any
 
-import socketio
 from pydantic import ValidationError
 
+from src.apps.base import BaseNamespace, cancel_tasks
 from src.helper import send_status
-from src.modules.mod import ClientContainer
-from src.schemas.schema import ChatOnJoin
+from src.modules.history import HistoryContainer
+from src.modules.mod import Client, ClientContainer
+from src.modules.persistence import CLIENT, state_store
+from src.modules.rooms import RoomRegistry, TypingTracker
+from src.modules.tracing import detached_task
+from src.schemas.schema import ChatOnCreateRoom, ChatOnJoin, ChatOnSearch
 
-client_container = ClientContainer()
+_ROOMS = ["sex", "drugs", "rock'n'roll"]
+PRESENCE_INTERVAL = 0.5
+TYPING_INTERVAL = 0.3
+TYPING_TIMEOUT = 3.0
+
+NAMESPACE = "/chat"
+
+client_container = ClientContainer(NAMESPACE)
+state_store.track(client_container)
+room_registry = RoomRegistry(_ROOMS)
+history_container = HistoryContainer()
+typing_tracker = TypingTracker(TYPING_TIMEOUT)
 
 logger = logging.getLogger("chat")
-_ROOMS = ["sex", "drugs", "rock'n'roll"]
 
 
-class ChatApp(socketio.AsyncNamespace):
-    async def on_connect(self, sid: str, environ):
+class ChatApp(BaseNamespace):
+    def __init__(self, namespace=None) -> None:
+        super().__init__(namespace)
+        self._presence_task: asyncio.Task | None = None
+        self._typing_task: asyncio.Task | None = None
+
+    async def on_connect(self, sid: str, environ, auth=None):
+        if await self.resume_session(sid, auth):
+            logger.info(f"Client {sid} resumed session on {self.__class__.__qualname__}")
+            return
         logger.info(f"Client {sid} connect to {self.__class__.__qualname__}")
-        client_container.get_item(sid)
+        client_container.connect(sid)
+        self.start_session(sid)
         await send_status(client_container, logger)
 
     async def on_disconnect(self, sid: str):
         client = client_container.get_item(sid)
-        client_container.del_item(sid)
+        typing_tracker.stop(client.room, sid)
+        if not self.park_session(sid, client):
+            await self.release(sid, client)
+
+    async def session_resumed(self, old_sid: str, sid: str, client: Client):
+        if client.room:
+            room_registry.join(client.room, sid)
+            room_registry.leave(client.room, old_sid)
+
+    async def release(self, sid: str, client: Client):
+        client_container.disconnect(sid)
+        self._forget_member(sid, client.room)
         logger.info(
             f"Client: {sid} disconnected from {self.__class__.__qualname__}, "
             f"connection time is : {client.connection_time()}"
@@ -30,7 +66,18 @@ class ChatApp(socketio.AsyncNamespace):
         await send_status(client_container, logger)
 
     async def on_get_rooms(self, sid: str, data: dict[str, Any]):
-        await self.emit("rooms", to=sid, data=_ROOMS)
+        await self.emit("rooms", to=sid, data=room_registry.rooms_snapshot())
+
+    async def on_create_room(self, sid: str, data: dict[str, Any]):
+        try:
+            msg = ChatOnCreateRoom(**data)
+        except ValidationError as err:
+            await self.emit("error", to=sid, data={"error": err.json()})
+            logger.error(f"Client {sid} validation error! Error: {err.json()}")
+        else:
+            if room_registry.create(msg.room):
+                logger.info(f"Client {sid} create the room: {msg.room}")
+            await self.emit("rooms", to=sid, data=room_registry.rooms_snapshot())
 
     async def on_join(self, sid: str, data: dict[str, Any]):
         try:
@@ -41,10 +88,15 @@ class ChatApp(socketio.AsyncNamespace):
             raise ConnectionRefusedError("error", {"error": err.json()}) from err
         else:
             client = client_container.get_item(sid)
+            if client.room and client.room != msg.room:
+                await self._leave_room(sid, client.room)
             client.name = msg.name
             client.room = msg.room
+            state_store.mark(CLIENT, client_container.key(sid), client)
             await self.emit("move", to=sid, data={"room": msg.room})
             await self.enter_room(sid, msg.room)
+            room_registry.join(msg.room, sid)
+            self._schedule_presence()
             logger.info(
                 f"Client {sid} with name: {msg.name}, join the room: {msg.room}"
             )
@@ -57,9 +109,10 @@ class ChatApp(socketio.AsyncNamespace):
 
     async def on_leave(self, sid: str, data: dict[str, Any]):
         client = client_container.get_item(sid)
-        await self.close_room(room=client.room)
+        await self._leave_room(sid, client.room)
         logger.info(f"Client {sid}, with name: {client.name} left the room: {client.room}")
-        del client.room
+        client.room = None
+        state_store.mark(CLIENT, client_container.key(sid), client)
 
     async def on_send_message(self, sid: str, data: dict[str, Any]):
         client = client_container.get_item(sid)
@@ -68,6 +121,93 @@ class ChatApp(socketio.AsyncNamespace):
             "text": text,
             "author": client.name,
         }
+        typing_tracker.stop(client.room, sid)
         await self.emit("message", data=msg, room=client.room)
         logger.info(f"Client {sid} send message {msg} on room: {client.room} ")
         client.add_message(client.room, msg)
+        if text and text.strip():
+            history_container.get_item(client.room).add_message(msg)
+
+    async def on_search(self, sid: str, data: dict[str, Any]):
+        try:
+            msg = ChatOnSearch(**data)
+        except ValidationError as err:
+            await self.emit("error", to=sid, data={"error": err.json()})
+            logger.error(f"Client {sid} validation error! Error: {err.json()}")
+        else:
+            room = client_container.get_item(sid).room
+            found, cursor = [], None
+            if room and room in history_container.objects:
+                history = history_container.get_item(room)
+                found, cursor = history.search(msg.query, msg.before, msg.limit)
+            await self.emit(
+                "search_results",
+                to=sid,
+                data={
+                    "query": msg.query,
+                    "results": [{"id": i, **message} for i, message in found],
+                    "next": cursor,
+                },
+            )
+
+    async def on_typing(self, sid: str, data: dict[str, Any]):
+        client = client_container.get_item(sid)
+        if client.room:
+            typing_tracker.ping(client.room, sid, client.name, time.monotonic())
+            self._schedule_typing()
+
+    async def _leave_room(self, sid: str, room: str | None):
+        if room:
+            await self.leave_room(sid, room)
+            self._forget_member(sid, room)
+
+    def _forget_member(self, sid: str, room: str | None):
+        room_registry.leave(room, sid)
+        typing_tracker.stop(room, sid)
+        if room and room not in room_registry:
+            history_container.del_item(room)
+        self._schedule_presence()
+
+    def _schedule_presence(self):
+        """
+        Start presence broadcaster if it isn't running,
+        room changes are coalesced and sent at most once per interval
+        """
+        if self._presence_task is None and room_registry.has_changes:
+            self._presence_task = detached_task(self._broadcast_presence())
+
+    async def _broadcast_presence(self):
+        try:
+            while room_registry.has_changes:
+                await asyncio.sleep(PRESENCE_INTERVAL)
+                for room, members in room_registry.pop_changes().items():
+                    await self.emit(
+                        "presence", room=room, data={"room": room, "members": members}
+                    )
+        finally:
+            self._presence_task = None
+
+    async def stop(self):
+        await super().stop()
+        await cancel_tasks([self._presence_task, self._typing_task])
+        self._presence_task = self._typing_task = None
+
+    def _schedule_typing(self):
+        """
+        Start shared typing timer if it isn't running, it expire typing users
+        and send one "typing" event per changed room at most once per interval
+        """
+        if self._typing_task is None and typing_tracker.is_active:
+            self._typing_task = detached_task(self._broadcast_typing())
+
+    async def _broadcast_typing(self):
+        try:
+            while typing_tracker.is_active:
+                await asyncio.sleep(TYPING_INTERVAL)
+                typing_tracker.expire(time.monotonic())
+                for room, users in typing_tracker.pop_changes().items():
+                    await self.emit(
+                        "typing", room=room, data={"room": room, "users": users}
+                    )
+        finally:
+            self._typing_task = None
@@ -1,27 +1,39 @@
 import logging
 from typing import Any
 
-import socketio
 from pydantic import ValidationError
 
+from src.apps.base import BaseNamespace
 from src.helper import send_status
 from src.modules.mod import ClientContainer, Client, Riddle
+from src.modules.persistence import CLIENT, state_store
 from src.schemas.schema import RiddleOnAnswerOut
 
-client_container = ClientContainer()
+NAMESPACE = "/riddle"
+
+client_container = ClientContainer(NAMESPACE)
+state_store.track(client_container)
 logger = logging.getLogger("riddle")
 
 
-class RiddleApp(socketio.AsyncNamespace):
-    async def on_connect(self, sid: str, environ):
+class RiddleApp(BaseNamespace):
+    async def on_connect(self, sid: str, environ, auth=None):
+        if await self.resume_session(sid, auth):
+            logger.info(f"Client {sid} resumed session on {self.__class__.__qualname__}")
+            return
         logger.info(f"Client {sid} connect to {self.__class__.__qualname__}")
-        client = client_container.get_item(sid)
+        client = client_container.connect(sid)
         client.create_game("riddle")
+        self.start_session(sid)
         await send_status(client_container, logger)
 
     async def on_disconnect(self, sid: str):
         client = client_container.get_item(sid)
-        client_container.del_item(sid)
+        if not self.park_session(sid, client):
+            await self.release(sid, client)
+
+    async def release(self, sid: str, client: Client):
+        client_container.disconnect(sid)
         logger.info(
             f"Client {sid} disconnected from {self.__class__.__qualname__},"
             f" connection time is : {client.connection_time()}"
@@ -32,6 +44,7 @@ class RiddleApp(socketio.AsyncNamespace):
         client = client_container.get_item(sid)
         riddle = client.game
         riddle.get_question()
+        state_store.mark(CLIENT, client_container.key(sid), client)
         question = riddle.question
         if question is not None:
             await self.emit("riddle", to=sid, data={"text": question})
@@ -47,8 +60,9 @@ class RiddleApp(socketio.AsyncNamespace):
         riddle = client.game
         answer = riddle.answer
         question = riddle.question
-        if (is_correct := text.lower()) == answer.lower():
+        if is_correct := riddle.check_answer(text):
             riddle.score_increment()
+            state_store.mark(CLIENT, client_container.key(sid), client)
         try:
             msg = RiddleOnAnswerOut(
                 **{
@@ -69,5 +83,6 @@ class RiddleApp(socketio.AsyncNamespace):
         client = client_container.get_item(sid)
         riddle = client.game
         riddle.recreate()
+        state_store.mark(CLIENT, client_container.key(sid), client)
         await self.emit("riddle", to=sid, data={"text": riddle.get_question()})
         logger.info(f"Send question: {riddle.get_question()} to {sid}")
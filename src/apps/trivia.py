@@ -1,108 +1,320 @@
+import asyncio
 import logging
+import time
 from typing import Any
 
-import socketio
 from pydantic import ValidationError
 
-from src.config.config_folder import get_config_folder
+from src.apps.base import BaseNamespace, cancel_tasks
 from src.helper import generate_game_uuid, send_status
-from src.modules.mod import Client, ClientContainer, GameContainer, Trivia, WaitingRoom
-from src.schemas.schema import TriviaOnAnswer, TriviaOnAnswerOut, TriviaOnJoinGame
+from src.modules.actor import ActorClosedError, ActorContainer
+from src.modules.content import content_loader
+from src.modules.matchmaking import Matchmaker, RatingBook
+from src.modules.mod import Client, ClientContainer, GameContainer, Trivia
+from src.modules.persistence import CLIENT, GAME, state_store
+from src.modules.quiz import QuizHub, QuizShow
+from src.modules.tracing import bind, detached_task, span
+from src.schemas.schema import (
+    QuizOnAnswer,
+    TriviaOnAnswer,
+    TriviaOnAnswerOut,
+    TriviaOnJoinGame,
+)
 
-client_container = ClientContainer()
+NAMESPACE = "/trivia"
+MATCH_INTERVAL = 0.5
+QUIZ_LOBBY = 10.0
+QUIZ_DEADLINE = 15.0
+QUIZ_LEADERS = 10
+# yield to the loop between batches of per-player results
+DELTA_BATCH = 500
+PLAYER_ID_LENGTH = 64
+
+client_container = ClientContainer(NAMESPACE)
+state_store.track(client_container)
 game_container = GameContainer()
-waiting_room = WaitingRoom()
+actor_container = ActorContainer()
+matchmaker = Matchmaker()
+rating_book = RatingBook()
+quiz_hub = QuizHub()
 
 logger = logging.getLogger("trivia")
 
 
-class TriviaApp(socketio.AsyncNamespace):
-    async def on_connect(self, sid: str, environ):
+class TriviaApp(BaseNamespace):
+    def __init__(self, namespace=None) -> None:
+        super().__init__(namespace)
+        self._matching_task: asyncio.Task | None = None
+        self._quiz_tasks: dict[str, asyncio.Task] = {}
+
+    async def on_connect(self, sid: str, environ, auth=None):
+        if await self.resume_session(sid, auth):
+            logger.info(f"Client {sid} resumed session on {self.__class__.__qualname__}")
+            return
         logger.info(f"Client {sid} connect to {self.__class__.__qualname__}")
+        client = client_container.connect(sid)
+        if (player_id := get_player_id(auth)) is not None:
+            client.player_id = player_id
+        self.start_session(sid)
         await send_status(client_container, logger)
 
     async def on_get_topics(self, sid: str, data: dict[str, Any]):
         logger.info(f"Client {sid} send data: {data} on {self.__class__.__qualname__}")
-        trivia = game_container.get_item("topics")
-        topics_path = get_config_folder("trivia_topics.csv")
-        trivia.load_topics(topics_path)
+        trivia = game_container.get_item(GameContainer.TOPICS)
+        trivia.load_topics(content_loader.current, matchmaker.waiting_topics())
         topics = trivia.topics
         await self.emit("topics", to=sid, data=topics)
 
     async def on_join_game(self, sid: str, data: dict[str, Any]):
         logger.info(f"Client {sid} send data: {data} on {self.__class__.__qualname__}")
         try:
-            user_msg = TriviaOnJoinGame(**data)
+            with span("validate"):
+                user_msg = TriviaOnJoinGame(**data)
         except ValidationError as err:
             await self.emit("error", to=sid, data={"error": err.json()})
             logger.error(f"Client {sid} message validation error!")
         else:
             set_client_data(data=user_msg, sid=sid)
-            waiting_room.add_sid_to_topic(user_msg.topic_pk, sid)
-            if (
-                    users_per_topic := waiting_room.get_sid_per_topic(user_msg.topic_pk)
-            ) and len(users_per_topic) == 2:
-                uid = generate_game_uuid()
-                trivia = game_container.get_item(uid)
-                for sid in users_per_topic:
-                    trivia.add_user(sid)
-                    client = client_container.get_item(sid)
-                    client.game_uid = uid
-                    await self.enter_room(sid, uid)
-                waiting_room.clear_topic(user_msg.topic_pk)
-                question_path = get_config_folder("trivia_questions.csv")
-                trivia.load_questions(question_path)
-                trivia.topic = user_msg.topic_pk
-                body = create_answer_body(trivia=trivia, uid=uid)
-                if trivia.remaining_question_on_topic(trivia.topic) > 0:
-                    await self.emit("game", room=uid, data=body)
-                    logger.info(
-                        f'Send event "game" on {self.__class__.__qualname__} to {uid}, with body: {body}'
-                    )
-                else:
-                    players = trivia.get_players()
-                    body = {"players": players}
-                    await self.emit("no_question", room=uid, data=body)
-                    logger.info(
-                        f'Send event "no_question" on {self.__class__.__qualname__} to {uid}, with body: {body}'
-                    )
+            rating = rating_book.get(client_container.get_item(sid).player_id)
+            with span("matchmaking.join", topic=user_msg.topic_pk):
+                sids = matchmaker.join(
+                    user_msg.topic_pk, sid, rating, time.monotonic(), self.sessions.parked_sids
+                )
+            if sids:
+                await self._start_game(user_msg.topic_pk, sids)
             else:
+                self._schedule_matching()
                 await self.emit(None, data={})
 
+    def _schedule_matching(self):
+        """
+        Start matching timer if it isn't running, waiting players
+        are matched with widening rating window once per interval
+        """
+        if self._matching_task is None and len(matchmaker):
+            self._matching_task = detached_task(self._run_matching())
+
+    async def _run_matching(self):
+        try:
+            while len(matchmaker):
+                await asyncio.sleep(MATCH_INTERVAL)
+                try:
+                    await self._match_waiting()
+                except Exception as err:
+                    # one failed tick must not leave the queue without timer
+                    logger.error(f"Matching tick failed: {err}")
+        finally:
+            self._matching_task = None
+
+    async def _match_waiting(self):
+        # disconnected players keep their place until resumed or released
+        for topic, sids in matchmaker.tick(time.monotonic(), skip=self.sessions.parked_sids):
+            await self._start_game(topic, sids)
+
+    async def _start_game(self, topic: str, sids: list[str]):
+        uid = generate_game_uuid()
+        trivia = game_container.get_item(uid)
+        actor_container.open(uid)
+        for sid in sids:
+            trivia.add_user(sid)
+            client = client_container.get_item(sid)
+            client.game_uid = uid
+            state_store.mark(CLIENT, client_container.key(sid), client)
+            await self.enter_room(sid, uid)
+        with span("game.load_questions"):
+            trivia.load_questions(content_loader.current)
+        trivia.topic = topic
+        with span("encode"):
+            body = create_answer_body(trivia=trivia, uid=uid)
+        state_store.mark(GAME, uid, trivia)
+        if trivia.remaining_question_on_topic(trivia.topic) > 0:
+            await self.emit("game", room=uid, data=body)
+            logger.info(
+                f'Send event "game" on {self.__class__.__qualname__} to {uid}, with body: {body}'
+            )
+        else:
+            players = trivia.get_players(client_container)
+            body = {"players": players}
+            await self.emit("no_question", room=uid, data=body)
+            logger.info(
+                f'Send event "no_question" on {self.__class__.__qualname__} to {uid}, with body: {body}'
+            )
+
     async def on_answer(self, sid: str, data: dict[str, Any]):
         logger.info(f"Client {sid} send data: {data} on {self.__class__.__qualname__}")
         client = client_container.get_item(sid)
         uid = client.game_uid
         try:
-            msg = TriviaOnAnswer(**data)
+            with span("validate"):
+                msg = TriviaOnAnswer(**data)
         except ValidationError as err:
             await self.emit("error", to=sid, data={"error": err.json()})
             logger.error(f"Client {sid} message validation error!")
         else:
-            trivia = game_container.get_item(uid)
+            try:
+                if (actor := actor_container.get_item(uid)) is None:
+                    raise ActorClosedError(f"Game {uid} has no actor")
+                await actor.send(bind(self._process_answer, "game.actor"), sid, uid, msg)
+            except ActorClosedError:
+                # game is over, answers queued behind the last one are dropped
+                await self.emit("error", to=sid, data={"error": "The game isn't running"})
+                logger.error(f"Client {sid} answer to not running game {uid}")
+
+    async def _process_answer(self, sid: str, uid: str, msg: TriviaOnAnswer):
+        """
+        Apply player answer to the game, run inside game actor
+        so answers for one game never interleave
+        """
+        trivia = game_container.get_item(uid)
+        if not trivia.is_current(msg.question_count):
+            logger.info(f"Client {sid} answer to previous question of game {uid} is dropped")
+            return
+        with span("game.add_answer"):
             trivia.add_game_answer(msg.index, sid)
-            if len(answers := trivia.get_game_answers()) > 1:
+            state_store.mark(GAME, uid, trivia)
+        if len(answers := trivia.get_game_answers()) > 1:
+            with span("game.check_answers"):
                 check_answers(correct_answer=int(trivia.answer), answers=answers)
-                if (trivia.remaining_question_on_topic(trivia.topic)) > 0:
-                    body = create_answer_body(trivia=trivia, uid=uid)
-                    await self.emit("game", room=uid, data=body)
-                    logger.info(
-                        f'Send event "game" on {self.__class__.__qualname__} to {uid}, with body: {body}'
-                    )
-                else:
-                    players = trivia.get_players()
-                    body = {"players": players}
-                    await self.emit("over", room=uid, data=body)
-                    logger.info(
-                        f'Send event "over" on {self.__class__.__qualname__} to {uid}, with body: {body}'
+                for player in trivia.users:
+                    state_store.mark(
+                        CLIENT, client_container.key(player), client_container.get_item(player)
                     )
+            if (trivia.remaining_question_on_topic(trivia.topic)) > 0:
+                with span("encode"):
+                    body = create_answer_body(trivia=trivia, uid=uid)
+                await self.emit("game", room=uid, data=body)
+                logger.info(
+                    f'Send event "game" on {self.__class__.__qualname__} to {uid}, with body: {body}'
+                )
+            else:
+                players = trivia.get_players(client_container)
+                body = {"players": players}
+                actor_container.del_item(uid)
+                ratings = record_ratings(trivia)
+                logger.info(f"Game {uid} over, new ratings: {ratings}")
+                await self.emit("over", room=uid, data=body)
+                logger.info(
+                    f'Send event "over" on {self.__class__.__qualname__} to {uid}, with body: {body}'
+                )
+
+    async def on_join_quiz(self, sid: str, data: dict[str, Any]):
+        logger.info(f"Client {sid} send data: {data} on {self.__class__.__qualname__}")
+        try:
+            with span("validate"):
+                user_msg = TriviaOnJoinGame(**data)
+        except ValidationError as err:
+            await self.emit("error", to=sid, data={"error": err.json()})
+            logger.error(f"Client {sid} message validation error!")
+        else:
+            await self._join_quiz(sid, user_msg)
+
+    async def _join_quiz(self, sid: str, user_msg: TriviaOnJoinGame):
+        questions = content_loader.current.questions_for(user_msg.topic_pk)
+        if not questions:
+            await self.emit("no_question", to=sid, data={"players": []})
+            return
+        client = client_container.get_item(sid)
+        client.name = user_msg.name
+        state_store.mark(CLIENT, client_container.key(sid), client)
+        matchmaker.leave(sid)
+        show = quiz_hub.join(
+            user_msg.topic_pk, f"quiz-{generate_game_uuid()}", questions, sid, user_msg.name
+        )
+        await self.enter_room(sid, show.room)
+        self._schedule_quiz(show)
+        await self.emit(
+            "quiz",
+            to=sid,
+            data={"topic": show.topic, "players": len(show), "round": show.round},
+        )
+
+    async def on_quiz_answer(self, sid: str, data: dict[str, Any]):
+        # thousands of answers per round, no info log per answer
+        try:
+            with span("validate"):
+                msg = QuizOnAnswer(**data)
+        except ValidationError as err:
+            await self.emit("error", to=sid, data={"error": err.json()})
+            logger.error(f"Client {sid} message validation error!")
+        else:
+            show = quiz_hub.show_of(sid)
+            accepted = show is not None and show.record(sid, msg.index, msg.round)
+            logger.debug(f"Client {sid} quiz answer {msg}, accepted: {accepted}")
+            return {"accepted": accepted}
+
+    async def stop(self):
+        await super().stop()
+        # tasks cancelled before their first step don't run their finally blocks
+        await cancel_tasks([self._matching_task, *self._quiz_tasks.values()])
+        self._matching_task = None
+        self._quiz_tasks.clear()
+        quiz_hub.reset()
+
+    def _schedule_quiz(self, show: QuizShow):
+        """
+        Start rounds of new show after lobby time
+        """
+        if show.topic not in self._quiz_tasks:
+            self._quiz_tasks[show.topic] = detached_task(self._run_quiz(show))
+
+    async def _run_quiz(self, show: QuizShow):
+        try:
+            await asyncio.sleep(QUIZ_LOBBY)
+            while len(show) and (question := show.next_question()) is not None:
+                body = {
+                    "round": show.round,
+                    "remaining": show.remaining,
+                    "deadline": QUIZ_DEADLINE,
+                    "current_question": {"text": question.text, "options": question.options},
+                }
+                await self.emit("quiz_question", room=show.room, data=body)
+                await asyncio.sleep(QUIZ_DEADLINE)
+                await self._send_quiz_result(show)
+            body = {"leaders": show.leaders(QUIZ_LEADERS), "players": len(show)}
+            await self.emit("quiz_over", room=show.room, data=body)
+            logger.info(f"Quiz {show} over, leaders: {body['leaders']}")
+        finally:
+            quiz_hub.close(show.topic)
+            self._quiz_tasks.pop(show.topic, None)
+            await self.close_room(show.room)
+
+    async def _send_quiz_result(self, show: QuizShow):
+        """
+        Score the round, broadcast answer distribution once
+        and send every answered player his points
+        """
+        started = time.perf_counter()
+        result = show.score_round()
+        elapsed = time.perf_counter() - started
+        summary = result.summary(len(show))
+        await self.emit("quiz_result", room=show.room, data=summary)
+        logger.info(f"Quiz {show} round scored in {elapsed * 1000:.2f}ms: {summary}")
+        for count, (sid, delta, score) in enumerate(show.deltas(result), 1):
+            await self.emit("quiz_score", to=sid, data={"delta": delta, "score": score})
+            if count % DELTA_BATCH == 0:
+                await asyncio.sleep(0)
 
     async def on_release_queue(self, sid: str, data: dict[str, Any]):
         logger.info(f"Client {sid} send data: {data} on {self.__class__.__qualname__}")
-        waiting_room.remove_sid_from_waiting_room(sid)
+        matchmaker.leave(sid)
 
     async def on_disconnect(self, sid: str):
         client = client_container.get_item(sid)
+        if not self.park_session(sid, client):
+            await self.release(sid, client)
+
+    async def session_resumed(self, old_sid: str, sid: str, client: Client):
+        matchmaker.replace_sid(old_sid, sid)
+        quiz_hub.replace_sid(old_sid, sid)
+        if (uid := client.game_uid) and uid in game_container.objects:
+            trivia = game_container.get_item(uid)
+            trivia.replace_user(old_sid, sid)
+            state_store.mark(GAME, uid, trivia)
+            # games restored after restart get their actor back
+            if trivia.topic and trivia.remaining_question_on_topic(trivia.topic) > 0:
+                actor_container.open(uid)
+
+    async def release(self, sid: str, client: Client):
         logger.info(
             f"Client {sid} disconnected from {self.__class__.__qualname__},"
             f" connection time is : {client.connection_time()}"
@@ -136,7 +348,7 @@ def create_answer_body(*, trivia: Trivia, uid: str | None):
             **{
                 "uid": uid,
                 "question_count": count,
-                "players": trivia.get_players(),
+                "players": trivia.get_players(client_container),
                 "answer": trivia.answer,
                 "current_question": {
                     "text": trivia.question,
@@ -150,11 +362,39 @@ def create_answer_body(*, trivia: Trivia, uid: str | None):
         return msg.model_dump()
 
 
+def record_ratings(trivia: Trivia) -> dict[str, float]:
+    """
+    Update ratings of game players by their final scores
+    :param trivia: finished game
+    :return: player name with player id to new rating
+    """
+    clients = [client_container.get_item(sid) for sid in trivia.users]
+    ratings = rating_book.record_game(
+        {client.player_id: client.game.score for client in clients}
+    )
+    return {f"{client.name} ({client.player_id})": ratings[client.player_id] for client in clients}
+
+
+def get_player_id(auth: Any) -> str | None:
+    """
+    Player id kept by the browser, rating outlive connections by it
+    :param auth: auth data of connect event
+    :return: player id or None if not sent or invalid
+    """
+    player_id = auth.get("player") if isinstance(auth, dict) else None
+    if isinstance(player_id, str) and 0 < len(player_id) <= PLAYER_ID_LENGTH:
+        return player_id
+    return None
+
+
 def run_clear_on_disconnect(client: Client, sid: str):
-    waiting_room.remove_sid_from_waiting_room(sid)
+    matchmaker.leave(sid)
+    quiz_hub.leave(sid)
     uid = client.game_uid
     game_container.del_item(uid)
-    client_container.del_item(sid)
+    actor_container.del_item(uid)
+    client_container.disconnect(sid)
+    state_store.mark_deleted(GAME, uid)
     del client
     del uid
 
@@ -167,3 +407,4 @@ def set_client_data(*, data: TriviaOnJoinGame, sid: str) -> None:
     client = client_container.get_item(sid)
     client.create_game("trivia")
     client.name = data.name
+    state_store.mark(CLIENT, client_container.key(sid), client)
@@ -1,11 +1,26 @@
-from aiohttp import web
+import logging
 
-from src.app import init_app
+from src.modules.startup import startup
 
 
 def run():
-    app = init_app()
-    web.run_app(app, port=8080, shutdown_timeout=3)
+    with startup.phase("imports"):
+        from aiohttp import web
+        from aiohttp.log import access_logger
+
+        from src.app import init_app, setup_logging
+        from src.modules.tuning import get_port, get_profile, install_event_loop
+    setup_logging()
+    # event loop policy must be set before run_app create the loop
+    profile = get_profile()
+    loop = install_event_loop(profile)
+    logging.getLogger("tuning").info(f"Tuning profile {profile.name!r}, {loop} event loop")
+    web.run_app(
+        init_app(profile),
+        port=get_port(),
+        shutdown_timeout=3,
+        access_log=access_logger if profile.access_log else None,
+    )
 
 
 if __name__ == "__main__":
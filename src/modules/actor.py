@@ -0,0 +1,132 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from src.modules.mod import Container
+from src.modules.tracing import detached_task
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class ActorClosedError(RuntimeError):
+    """
+    Message is sent to or queued in the closed game actor
+    """
+
+
+class GameActor:
+    """
+    Per-game mailbox, run submitted handlers one by one in arrival order.
+    A worker task exists only while the mailbox isn't empty, idle actor hold no task
+    """
+
+    def __init__(self) -> None:
+        self._mailbox: deque[tuple[Handler, tuple, asyncio.Future]] = deque()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def is_idle(self) -> bool:
+        return self._task is None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __len__(self) -> int:
+        return len(self._mailbox)
+
+    async def send(self, handler: Handler, *args: Any) -> Any:
+        """
+        Put handler to the mailbox and wait for their result
+        :param handler: coroutine function which change game state
+        :param args: handler arguments
+        :return: handler result
+        """
+        if self._closed:
+            raise ActorClosedError("The game actor is closed!")
+        future = asyncio.get_running_loop().create_future()
+        self._mailbox.append((handler, args, future))
+        if self._task is None:
+            self._task = detached_task(self._run())
+        return await future
+
+    async def _run(self) -> None:
+        try:
+            while self._mailbox:
+                handler, args, future = self._mailbox.popleft()
+                if not future.done():
+                    await self._deliver(handler, args, future)
+        except asyncio.CancelledError:
+            # worker is cancelled on shutdown, senders of queued messages must not wait forever
+            while self._mailbox:
+                self._mailbox.popleft()[2].cancel()
+            raise
+        finally:
+            self._task = None
+
+    @staticmethod
+    async def _deliver(handler: Handler, args: tuple, future: asyncio.Future) -> None:
+        try:
+            result = await handler(*args)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            if not future.done():
+                future.set_exception(err)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    def close(self) -> None:
+        """
+        Reject new messages and queued ones, the running handler is finished.
+        Game is over after close, so queued messages must not change it
+        """
+        self._closed = True
+        while self._mailbox:
+            future = self._mailbox.popleft()[2]
+            if not future.done():
+                future.set_exception(ActorClosedError("The game actor is closed!"))
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__qualname__}(mailbox={len(self._mailbox)}, "
+            f"idle={self.is_idle}, closed={self._closed})"
+        )
+
+
+class ActorContainer(Container):
+    """
+    Container, return game actor by game UID
+    """
+
+    def __init__(self) -> None:
+        self.objects: dict[str, GameActor] = {}
+
+    def open(self, uid: str) -> GameActor:
+        """
+        Get actor of the game, create actor if not exist, call when the game starts
+        :param uid: Game UID
+        :return: GameActor
+        """
+        if (actor := self.objects.get(uid)) is None:
+            actor = self.objects[uid] = GameActor()
+        return actor
+
+    def get_item(self, uid) -> GameActor | None:
+        """
+        Get actor from container by game UID
+        :param uid: Game UID
+        :return: GameActor, None if the game isn't running
+        """
+        return self.objects.get(uid)
+
+    def del_item(self, uid) -> None:
+        """
+        Close and delete actor from container by game UID
+        :param uid: Game UID
+        """
+        if (actor := self.objects.pop(uid, None)) is not None:
+            actor.close()
@@ -0,0 +1,102 @@
+import re
+from typing import Iterable
+
+# "ё" and "е" are the same letter in everyday writing
+_TRANSLATE = str.maketrans({"ё": "е"})
+_WORDS = re.compile(r"[^\W_]+")
+SHORT_ANSWER = 4
+LONG_ANSWER = 8
+
+
+def normalize_answer(text: str) -> str:
+    """
+    Canonical form of answer: casefold, "ё" as "е", without whitespace and punctuation
+    :param text: answer text
+    :return: normalized text
+    """
+    return "".join(_WORDS.findall(text.casefold().translate(_TRANSLATE)))
+
+
+def allowed_typos(length: int) -> int:
+    """
+    Accepted edit distance for answer of length, short answers must be exact
+    :param length: normalized answer length
+    """
+    if length < SHORT_ANSWER:
+        return 0
+    if length < LONG_ANSWER:
+        return 1
+    return 2
+
+
+def _band_row(previous: list[int], char: str, second: str, row: int, limit: int) -> list[int]:
+    over = limit + 1
+    current = [over] * len(previous)
+    current[0] = row if row <= limit else over
+    for j in range(max(1, row - limit), min(len(second), row + limit) + 1):
+        # comparisons instead of min() calls, the loop is the hot path
+        cost = previous[j - 1] + (char != second[j - 1])
+        if previous[j] < cost:
+            cost = previous[j] + 1
+        if current[j - 1] < cost:
+            cost = current[j - 1] + 1
+        current[j] = cost
+    return current
+
+
+def within_distance(first: str, second: str, limit: int) -> bool:
+    """
+    Check that Levenshtein distance is not greater than limit.
+    Only the diagonal band of 2 * limit + 1 cells is computed per row,
+    the check stops as soon as a whole row exceeds the limit
+    :param first: first string
+    :param second: second string
+    :param limit: max edit distance
+    """
+    if abs(len(first) - len(second)) > limit:
+        return False
+    if len(first) > len(second):
+        first, second = second, first
+    row = [j if j <= limit else limit + 1 for j in range(len(second) + 1)]
+    for i, char in enumerate(first, 1):
+        row = _band_row(row, char, second, i, limit)
+        if min(row) > limit:
+            return False
+    return row[-1] <= limit
+
+
+class AnswerMatcher:
+    """
+    Accepted forms of riddle answer, normalized once when content is loaded.
+    Exact match is a set lookup, otherwise answer may differ by a few typos
+    """
+
+    __slots__ = ("answer", "_exact", "_forms")
+
+    def __init__(self, answer: str, synonyms: Iterable[str] = ()) -> None:
+        self.answer = answer
+        self._exact = frozenset(
+            form for text in (answer, *synonyms) if (form := normalize_answer(text))
+        )
+        self._forms = tuple((form, allowed_typos(len(form))) for form in sorted(self._exact))
+
+    @property
+    def forms(self) -> frozenset[str]:
+        return self._exact
+
+    def matches(self, text: str) -> bool:
+        """
+        Check player answer
+        :param text: player answer
+        :return: True if answer is accepted
+        """
+        if not (text := normalize_answer(text)):
+            return False
+        if text in self._exact:
+            return True
+        return any(
+            within_distance(text, form, limit) for form, limit in self._forms if limit
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__qualname__}(answer={self.answer!r}, forms={sorted(self._exact)})"
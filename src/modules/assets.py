@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import logging
+import mimetypes
+from contextlib import suppress
+from pathlib import Path
+
+logger = logging.getLogger("assets")
+
+SRC_FOLDER = Path(__file__).parent.parent.resolve()
+TEMPLATES_FOLDER = SRC_FOLDER / "templates"
+STATIC_FOLDER = SRC_FOLDER / "static"
+WATCH_INTERVAL = 2.0
+
+Stamp = tuple[tuple[str, int, int], ...]
+
+
+class Asset:
+    """
+    File body with validators for conditional requests
+    """
+
+    __slots__ = ("body", "content_type", "etag", "last_modified")
+
+    def __init__(self, body: bytes, content_type: str, last_modified: float) -> None:
+        self.body = body
+        self.content_type = content_type
+        self.etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        self.last_modified = last_modified
+
+
+def _read_folder(folder: Path) -> dict[str, Asset]:
+    assets = {}
+    for path in sorted(folder.rglob("*")):
+        if path.is_file():
+            content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            assets[path.relative_to(folder).as_posix()] = Asset(
+                path.read_bytes(), content_type, path.stat().st_mtime
+            )
+    return assets
+
+
+def _stamp(*folders: Path) -> Stamp:
+    return tuple(
+        (path.as_posix(), (stat := path.stat()).st_mtime_ns, stat.st_size)
+        for folder in folders
+        for path in sorted(folder.rglob("*"))
+        if path.is_file()
+    )
+
+
+class AssetCache:
+    """
+    Site templates and static files in memory, loaded on startup
+    and reloaded by polling watcher when files change
+    """
+
+    def __init__(self, templates: Path = TEMPLATES_FOLDER, static: Path = STATIC_FOLDER) -> None:
+        self._templates_folder = templates
+        self._static_folder = static
+        self._templates: dict[str, Asset] = {}
+        self._static: dict[str, Asset] = {}
+        self._stamp: Stamp = ()
+        self._watcher: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._templates) + len(self._static)
+
+    @property
+    def size(self) -> int:
+        return sum(len(asset.body) for asset in (*self._templates.values(), *self._static.values()))
+
+    async def preload(self) -> None:
+        """
+        Read templates and static files in worker threads
+        """
+        self._stamp, self._templates, self._static = await asyncio.gather(
+            asyncio.to_thread(_stamp, self._templates_folder, self._static_folder),
+            asyncio.to_thread(_read_folder, self._templates_folder),
+            asyncio.to_thread(_read_folder, self._static_folder),
+        )
+
+    async def reload(self) -> bool:
+        """
+        Read files again if any of them changed, added or removed
+        :return: True if files were reloaded
+        """
+        stamp = await asyncio.to_thread(_stamp, self._templates_folder, self._static_folder)
+        if stamp == self._stamp:
+            return False
+        await self.preload()
+        logger.info(f"Site assets reloaded: {len(self)} files")
+        return True
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload()
+            except OSError as err:
+                logger.error(f"Site assets not available: {err}")
+
+    async def start(self, interval: float = WATCH_INTERVAL) -> None:
+        """
+        Preload files and start polling watcher
+        :param interval: polling interval in seconds
+        """
+        await self.preload()
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch(interval))
+
+    async def stop(self) -> None:
+        """
+        Stop polling watcher
+        """
+        if self._watcher is not None:
+            self._watcher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._watcher
+            self._watcher = None
+
+    def template(self, page: str) -> Asset | None:
+        """
+        Index template of site page
+        :param page: page path, e.g. "/chat" or "/"
+        """
+        return self._templates.get(f"{page.strip('/')}/index.html".lstrip("/"))
+
+    def static(self, path: str) -> Asset | None:
+        """
+        Static file
+        :param path: path relative to static folder
+        """
+        return self._static.get(path)
+
+
+asset_cache = AssetCache()
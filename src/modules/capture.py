@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import socketio
+
+from src.apps.base import CallNext
+from src.modules.jsonl import FLUSH_INTERVAL, JsonLinesWriter
+
+logger = logging.getLogger("capture")
+
+CAPTURE_FILE_ENV = "CAPTURE_FILE"
+CONNECT = "connect"
+DISCONNECT = "disconnect"
+
+
+def get_capture_file() -> str | None:
+    return os.environ.get(CAPTURE_FILE_ENV) or None
+
+
+class CapturedEvent(NamedTuple):
+    at: float
+    client: int
+    namespace: str
+    event: str
+    data: Any
+
+
+class TrafficRecorder:
+    """
+    Namespace middleware, record incoming events to JSONL capture file.
+    One line per event: {"t": seconds from start, "c": client, "ns", "e", "d"},
+    client is a counter per engine.io connection, so SIDs and environ never leave the server
+    """
+
+    def __init__(self, path: str | Path, interval: float = FLUSH_INTERVAL) -> None:
+        self._writer = JsonLinesWriter(path, interval)
+        self._started = time.monotonic()
+        self._clients: dict[str, int] = {}
+        self.recorded = 0
+
+    def _client(self, namespace: socketio.AsyncNamespace, sid: str) -> int:
+        eio_sid = namespace.server.manager.eio_sid_from_sid(sid, namespace.namespace) or sid
+        if (client := self._clients.get(eio_sid)) is None:
+            client = self._clients[eio_sid] = len(self._clients)
+        return client
+
+    def record(self, namespace: socketio.AsyncNamespace, event: str, args: tuple) -> None:
+        """
+        Add event to write buffer
+        :param namespace: namespace handler
+        :param event: event name
+        :param args: handler arguments, SID first
+        """
+        data = args[1] if event not in (CONNECT, DISCONNECT) and len(args) > 1 else None
+        line = {
+            "t": round(time.monotonic() - self._started, 4),
+            "c": self._client(namespace, args[0]),
+            "ns": namespace.namespace,
+            "e": event,
+            "d": data,
+        }
+        self._writer.append(json.dumps(line, ensure_ascii=False, separators=(",", ":")))
+        self.recorded += 1
+
+    async def middleware(
+            self, namespace: socketio.AsyncNamespace, event: str, args: tuple, call_next: CallNext
+    ) -> Any:
+        """
+        Namespace middleware, record event before handler run
+        """
+        if args:
+            self.record(namespace, event, args)
+        return await call_next()
+
+    def start(self) -> None:
+        self._started = time.monotonic()
+        self._writer.start()
+        logger.info(f"Capture traffic to {self._writer.path}")
+
+    async def stop(self) -> None:
+        await self._writer.stop()
+
+
+def read_capture(path: str | Path) -> dict[int, list[CapturedEvent]]:
+    """
+    Read capture file
+    :param path: JSONL capture file
+    :return: events per captured client ordered by time
+    """
+    clients: dict[int, list[CapturedEvent]] = {}
+    with Path(path).open(encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            event = CapturedEvent(row["t"], row["c"], row["ns"], row["e"], row["d"])
+            clients.setdefault(event.client, []).append(event)
+    for events in clients.values():
+        events.sort(key=lambda item: item.at)
+    return clients
@@ -0,0 +1,236 @@
+import asyncio
+import csv
+import logging
+import os
+from contextlib import suppress
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Generator, Generic, Mapping, NamedTuple, TypeVar
+
+from pydantic import ValidationError
+
+from src.config.config_folder import get_config_folder
+from src.modules.answers import AnswerMatcher
+from src.schemas.schema import RiddleRow, TriviaQuestionRow, TriviaTopicRow
+
+logger = logging.getLogger("content")
+
+TOPICS_FILE = "trivia_topics.csv"
+QUESTIONS_FILE = "trivia_questions.csv"
+RIDDLES_FILE = "riddles.csv"
+WATCH_INTERVAL = 5.0
+
+Pack = TypeVar("Pack")
+
+
+class TriviaQuestion(NamedTuple):
+    text: str
+    answer: int
+    options: tuple[str, ...]
+
+
+class RiddleItem(NamedTuple):
+    question: str
+    answer: str
+    synonyms: tuple[str, ...] = ()
+
+
+class ContentPack:
+    """
+    Immutable version of game content: trivia topics, questions and riddles
+    """
+
+    __slots__ = ("_version", "_topics", "_questions", "_riddles", "_matchers")
+
+    def __init__(
+            self,
+            *,
+            version: int,
+            topics: tuple[Mapping[str, str], ...],
+            questions: Mapping[str, tuple[TriviaQuestion, ...]],
+            riddles: tuple[RiddleItem, ...],
+    ) -> None:
+        self._version = version
+        self._topics = topics
+        self._questions = MappingProxyType(dict(questions))
+        self._riddles = riddles
+        # answers are normalized once per pack, not on every player answer
+        self._matchers = {
+            item.question: AnswerMatcher(item.answer, item.synonyms) for item in riddles
+        }
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def topics(self) -> tuple[Mapping[str, str], ...]:
+        return self._topics
+
+    @property
+    def riddles(self) -> tuple[RiddleItem, ...]:
+        return self._riddles
+
+    def answer_matcher(self, question: str | None) -> AnswerMatcher | None:
+        """
+        Provide answer matcher for riddle
+        :param question: riddle question
+        :return: AnswerMatcher, None if riddle unknown
+        """
+        return self._matchers.get(question)  # type: ignore[arg-type]
+
+    def questions_for(self, topic: str | None) -> tuple[TriviaQuestion, ...]:
+        """
+        Provide questions for topic
+        :param topic: topic number
+        :return: tuple with questions, empty if topic unknown
+        """
+        return self._questions.get(str(topic), ())
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__qualname__}(version={self._version}, topics={len(self._topics)}, "
+            f"questions={sum(map(len, self._questions.values()))}, riddles={len(self._riddles)})"
+        )
+
+
+def _read_csv(path: Path) -> Generator[dict[str, Any], None, None]:
+    """
+    CSV reader
+    :param path: path to file
+    :return: Generator
+    """
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        yield from csv.DictReader(file)
+
+
+def _strip(row: dict[str, Any]) -> dict[str, Any]:
+    return {k: v.strip() if isinstance(v, str) else v for k, v in row.items()}
+
+
+def parse_content(folder: Path, version: int) -> ContentPack:
+    """
+    Parse and validate content files, blocking, must run in worker thread
+    :param folder: folder with content files
+    :param version: version number for new pack
+    :return: ContentPack
+    :raise ValueError: content files is invalid
+    """
+    try:
+        topics = tuple(
+            MappingProxyType(TriviaTopicRow(**_strip(row)).model_dump())
+            for row in _read_csv(folder / TOPICS_FILE)
+        )
+        questions: dict[str, list[TriviaQuestion]] = {}
+        for row in map(_strip, _read_csv(folder / QUESTIONS_FILE)):
+            item = TriviaQuestionRow(
+                topic=row.get("topic"),
+                text=row.get("text"),
+                options=[row.get(str(i)) for i in range(1, 5)],
+                answer=row.get("answer"),
+            )
+            questions.setdefault(item.topic, []).append(
+                TriviaQuestion(item.text, item.answer, tuple(item.options))
+            )
+        riddles = tuple(
+            RiddleItem(**RiddleRow(**_strip(row)).model_dump())
+            for row in _read_csv(folder / RIDDLES_FILE)
+        )
+    except (OSError, ValidationError) as err:
+        raise ValueError(f"Content pack is invalid: {err}") from err
+    if unknown := set(questions) - {topic["pk"] for topic in topics}:
+        raise ValueError(f"Questions refer to unknown topics: {sorted(unknown)}")
+    return ContentPack(
+        version=version,
+        topics=topics,
+        questions={k: tuple(v) for k, v in questions.items()},
+        riddles=riddles,
+    )
+
+
+class ContentLoader(Generic[Pack]):
+    """
+    Hold current content pack, reload it in worker thread when files changed.
+    Games take the pack on start and keep it until the end,
+    reload only swap the reference for new games
+    """
+
+    def __init__(
+            self,
+            folder: Path | None = None,
+            files: tuple[str, ...] = (TOPICS_FILE, QUESTIONS_FILE, RIDDLES_FILE),
+            parse: Callable[[Path, int], Pack] = parse_content,  # type: ignore[assignment]
+    ) -> None:
+        self._folder = folder or get_config_folder("")
+        self._files = files
+        self._parse = parse
+        self._pack: Pack | None = None
+        self._stamp: tuple[float, ...] | None = None
+        self._watcher: asyncio.Task | None = None
+
+    @property
+    def current(self) -> Pack:
+        """
+        Current content pack. Server load it on startup,
+        outside the server (tests, scripts) it's loaded on first access
+        """
+        if self._pack is None:
+            self._swap(self._stat(), self._parse(self._folder, 1))
+        return self._pack  # type: ignore[return-value]
+
+    def _stat(self) -> tuple[float, ...]:
+        return tuple(os.stat(self._folder / name).st_mtime for name in self._files)
+
+    def _swap(self, stamp: tuple[float, ...], pack: Pack) -> None:
+        self._stamp = stamp
+        self._pack = pack
+        logger.info(f"Content pack loaded: {pack}")
+
+    async def reload(self, force: bool = False) -> bool:
+        """
+        Parse content files in worker thread and swap current pack if files changed
+        :param force: reload even if files didn't change
+        :return: True if new pack was swapped in
+        """
+        stamp = await asyncio.to_thread(self._stat)
+        if not force and stamp == self._stamp:
+            return False
+        version = self._pack.version + 1 if self._pack else 1
+        try:
+            pack = await asyncio.to_thread(self._parse, self._folder, version)
+        except ValueError as err:
+            self._stamp = stamp
+            logger.error(f"Content pack reload failed, keep current one. Error: {err}")
+            return False
+        self._swap(stamp, pack)
+        return True
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload()
+            except OSError as err:
+                logger.error(f"Content files not available: {err}")
+
+    async def start(self, interval: float = WATCH_INTERVAL) -> None:
+        """
+        Load content and start polling watcher
+        :param interval: polling interval in seconds
+        """
+        await self.reload(force=self._pack is None)
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch(interval))
+
+    async def stop(self) -> None:
+        """
+        Stop polling watcher
+        """
+        if self._watcher is not None:
+            self._watcher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._watcher
+            self._watcher = None
+
+
+content_loader: ContentLoader[ContentPack] = ContentLoader()
@@ -0,0 +1,199 @@
+import re
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from heapq import merge
+from typing import Any, Iterator
+
+from src.modules.mod import Container
+
+HISTORY_LIMIT = 100_000
+MIN_PREFIX = 2
+_COMPACT_MIN = 32
+_TOKEN_RE = re.compile(r"\w+")
+_QUERY_RE = re.compile(r"(\w+)(\*?)")
+
+
+def normalize(text: str) -> str:
+    return text.casefold().replace("ё", "е")
+
+
+def tokenize(text: str) -> set[str]:
+    """
+    Split text to normalized tokens, Cyrillic aware: casefold and ё -> е
+    :param text: message text
+    :return: unique tokens
+    """
+    return set(_TOKEN_RE.findall(normalize(text)))
+
+
+class _Term:
+    """
+    Posting lists matched by one query term, exact term has a single list
+    """
+
+    __slots__ = ("postings", "size")
+
+    def __init__(self, postings: list[list[int]]) -> None:
+        self.postings = postings
+        self.size = sum(map(len, postings))
+
+    def __contains__(self, msg_id: int) -> bool:
+        for posting in self.postings:
+            i = bisect_left(posting, msg_id)
+            if i < len(posting) and posting[i] == msg_id:
+                return True
+        return False
+
+    def below(self, cursor: int) -> Iterator[int]:
+        """
+        Message ids lower than cursor, newest first
+        """
+        return merge(
+            *(
+                (p[i] for i in range(bisect_left(p, cursor) - 1, -1, -1))
+                for p in self.postings
+            ),
+            reverse=True,
+        )
+
+
+class MessageHistory:
+    """
+    Bounded room history with incrementally maintained inverted index.
+    Messages live in a ring buffer, the oldest message and its postings
+    are evicted when the limit is reached
+    """
+
+    def __init__(self, limit: int = HISTORY_LIMIT) -> None:
+        self._limit = limit
+        self._messages: list[dict[str, Any]] = []
+        self._next_id = 0
+        self._index: dict[str, list[int]] = {}
+        self._vocabulary: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    @property
+    def first_id(self) -> int:
+        return self._next_id - len(self._messages)
+
+    def add_message(self, message: dict[str, Any]) -> int:
+        """
+        Add message to history and index
+        :param message: message with text and author
+        :return: message id
+        """
+        msg_id = self._next_id
+        self._next_id += 1
+        if len(self._messages) < self._limit:
+            self._messages.append(message)
+        else:
+            slot = msg_id % self._limit
+            evicted, self._messages[slot] = self._messages[slot], message
+            self._evict(evicted)
+        for token in tokenize(message.get("text") or ""):
+            if (posting := self._index.get(token)) is None:
+                posting = self._index[token] = []
+                insort(self._vocabulary, token)
+            posting.append(msg_id)
+        return msg_id
+
+    def _evict(self, message: dict[str, Any]) -> None:
+        first_id = self.first_id
+        for token in tokenize(message.get("text") or ""):
+            posting = self._index[token]
+            stale = bisect_left(posting, first_id)
+            if stale == len(posting):
+                del self._index[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+            elif stale > _COMPACT_MIN and stale * 2 > len(posting):
+                del posting[:stale]
+
+    def get_message(self, msg_id: int) -> dict[str, Any] | None:
+        """
+        Get message by id
+        :param msg_id: message id
+        :return: message or None if evicted
+        """
+        if not self.first_id <= msg_id < self._next_id:
+            return None
+        return self._messages[msg_id % self._limit]
+
+    def get_messages(self, count: int) -> list[dict[str, Any]]:
+        """
+        Latest messages, oldest first
+        :param count: count of messages
+        :return: list of messages
+        """
+        start = max(self.first_id, self._next_id - count)
+        return [self._messages[i % self._limit] for i in range(start, self._next_id)]
+
+    def _term(self, word: str, prefix: bool) -> _Term | None:
+        if prefix:
+            if len(word) < MIN_PREFIX:
+                return None
+            start = bisect_left(self._vocabulary, word)
+            end = bisect_right(self._vocabulary, word + "\uffff", lo=start)
+            return _Term([self._index[t] for t in self._vocabulary[start:end]])
+        return _Term([self._index[word]] if word in self._index else [])
+
+    def search(
+            self, query: str, before: int | None = None, limit: int = 20
+    ) -> tuple[list[tuple[int, dict[str, Any]]], int | None]:
+        """
+        Find messages containing all query terms, term ended with * is a prefix
+        :param query: search query
+        :param before: return messages older than this id (cursor from previous page)
+        :param limit: page size
+        :return: list of (id, message) newest first and cursor for next page
+        """
+        terms = [
+            self._term(word, bool(star))
+            for word, star in _QUERY_RE.findall(normalize(query))
+        ]
+        if not terms or any(t is None for t in terms):
+            return [], None
+        terms.sort(key=lambda t: t.size)
+        first, rest = terms[0], terms[1:]
+        cursor = self._next_id if before is None else before
+        found: list[tuple[int, dict[str, Any]]] = []
+        for msg_id in first.below(cursor):
+            if msg_id < self.first_id:
+                break
+            if all(msg_id in t for t in rest):
+                if len(found) == limit:
+                    return found, found[-1][0]
+                found.append((msg_id, self._messages[msg_id % self._limit]))
+        return found, None
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__qualname__}(messages={len(self._messages)}, "
+            f"tokens={len(self._index)}, limit={self._limit})"
+        )
+
+
+class HistoryContainer(Container):
+    """
+    Container, return room history by room name
+    """
+
+    def __init__(self) -> None:
+        self.objects = defaultdict(MessageHistory)
+
+    def get_item(self, room) -> MessageHistory:
+        """
+        Get history from container by room name
+        :param room: room name
+        :return: MessageHistory
+        """
+        return self.objects[room]
+
+    def del_item(self, room) -> None:
+        """
+        Delete history from container by room name
+        :param room: room name
+        """
+        if room in self.objects.keys():
+            del self.objects[room]
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from contextlib import suppress
+from pathlib import Path
+
+logger = logging.getLogger("jsonl")
+
+FLUSH_INTERVAL = 1.0
+
+
+class JsonLinesWriter:
+    """
+    Append-only JSON lines file, lines are buffered in memory
+    and written in a worker thread once per interval
+    """
+
+    def __init__(self, path: str | Path, interval: float = FLUSH_INTERVAL) -> None:
+        self.path = Path(path)
+        self._interval = interval
+        self._lines: list[str] = []
+        self._task: asyncio.Task | None = None
+
+    def append(self, line: str) -> None:
+        self._lines.append(line)
+
+    def _write(self, lines: list[str]) -> None:
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    async def flush(self) -> None:
+        if self._lines:
+            lines, self._lines = self._lines, []
+            await asyncio.to_thread(self._write, lines)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.flush()
+            except OSError as err:
+                logger.error(f"Write to {self.path} failed: {err}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
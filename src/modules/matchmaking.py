@@ -0,0 +1,264 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict, defaultdict
+from itertools import islice
+from typing import Container
+
+from src.modules.mod import SingletonsConstructor
+
+DEFAULT_RATING = 1500.0
+ELO_K = 32.0
+BAND_WIDTH = 50
+BASE_WINDOW = 50.0
+WIDEN_RATE = 25.0
+MAX_WINDOW = 1000.0
+TICK_BUDGET = 1000
+BAND_SCAN = 16
+# ratings of players not seen for longest are dropped above this size
+RATING_BOOK_SIZE = 100_000
+
+
+class RatingBook(metaclass=SingletonsConstructor):
+    """
+    Elo rating of trivia players by player id kept by the browser,
+    bounded to RATING_BOOK_SIZE recently seen players
+    """
+
+    def __init__(self, size: int = RATING_BOOK_SIZE) -> None:
+        self._size = size
+        self._ratings: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._ratings)
+
+    def get(self, player_id: str | None) -> float:
+        if not player_id or (rating := self._ratings.get(player_id)) is None:
+            return DEFAULT_RATING
+        self._ratings.move_to_end(player_id)
+        return rating
+
+    def reset(self) -> None:
+        """
+        Drop all ratings, between tests
+        """
+        self._ratings.clear()
+
+    def record_game(self, scores: dict[str, int]) -> dict[str, float]:
+        """
+        Update ratings by final game scores, every pair of players is one Elo match
+        :param scores: player id to game score
+        :return: new ratings of the players
+        """
+        ratings = {name: self.get(name) for name in scores}
+        deltas = dict.fromkeys(scores, 0.0)
+        names = list(scores)
+        for i, first in enumerate(names):
+            for second in names[i + 1:]:
+                expected = 1 / (1 + 10 ** ((ratings[second] - ratings[first]) / 400))
+                actual = 0.5 if scores[first] == scores[second] else float(
+                    scores[first] > scores[second]
+                )
+                deltas[first] += ELO_K * (actual - expected)
+                deltas[second] -= ELO_K * (actual - expected)
+        for name, delta in deltas.items():
+            self._ratings[name] = ratings[name] + delta
+            self._ratings.move_to_end(name)
+        while len(self._ratings) > self._size:
+            self._ratings.popitem(last=False)
+        return {name: ratings[name] + deltas[name] for name in names}
+
+
+class Ticket:
+    """
+    Waiting player
+    """
+
+    __slots__ = ("sid", "rating", "since")
+
+    def __init__(self, sid: str, rating: float, since: float) -> None:
+        self.sid = sid
+        self.rating = rating
+        self.since = since
+
+    @property
+    def band(self) -> int:
+        return int(self.rating // BAND_WIDTH)
+
+    def window(self, now: float) -> float:
+        """
+        Accepted rating difference, widening with wait time
+        :param now: current time
+        """
+        return min(BASE_WINDOW + WIDEN_RATE * (now - self.since), MAX_WINDOW)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__qualname__}(sid={self.sid}, rating={self.rating:.0f})"
+
+
+class RatingQueue:
+    """
+    Waiting players of one topic bucketed by rating band.
+    Bands are FIFO dicts, non-empty band numbers are kept sorted,
+    so the nearest band is found by bisect
+    """
+
+    def __init__(self) -> None:
+        self._bands: dict[int, dict[str, Ticket]] = {}
+        self._band_ids: list[int] = []
+        self._tickets: dict[str, Ticket] = {}
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def __contains__(self, sid: str) -> bool:
+        return sid in self._tickets
+
+    def oldest(self, limit: int) -> list[Ticket]:
+        return list(islice(self._tickets.values(), limit))
+
+    def add(self, ticket: Ticket) -> None:
+        self._tickets[ticket.sid] = ticket
+        if (band := self._bands.get(ticket.band)) is None:
+            band = self._bands[ticket.band] = {}
+            insort(self._band_ids, ticket.band)
+        band[ticket.sid] = ticket
+
+    def remove(self, sid: str) -> Ticket | None:
+        if (ticket := self._tickets.pop(sid, None)) is None:
+            return None
+        band = self._bands[ticket.band]
+        del band[sid]
+        if not band:
+            del self._bands[ticket.band]
+            del self._band_ids[bisect_left(self._band_ids, ticket.band)]
+        return ticket
+
+    def _nearest_bands(self, band: int, distance: int) -> list[int]:
+        lo = bisect_left(self._band_ids, band - distance)
+        hi = bisect_right(self._band_ids, band + distance)
+        return sorted(self._band_ids[lo:hi], key=lambda band_id: abs(band_id - band))
+
+    def find(self, ticket: Ticket, now: float, skip: Container[str] = ()) -> Ticket | None:
+        """
+        Oldest player in the nearest band within windows of both players,
+        at most BAND_SCAN players are checked per band
+        :param ticket: ticket looking for opponent
+        :param now: current time
+        :param skip: SIDs which can't be matched now, e.g. disconnected players
+        :return: opponent ticket or None
+        """
+        window = ticket.window(now)
+        for band_id in self._nearest_bands(ticket.band, int(window // BAND_WIDTH) + 1):
+            for other in islice(self._bands[band_id].values(), BAND_SCAN):
+                if other is ticket or other.sid in skip:
+                    continue
+                if abs(other.rating - ticket.rating) <= min(window, other.window(now)):
+                    return other
+        return None
+
+
+class Matchmaker(metaclass=SingletonsConstructor):
+    """
+    Rating based matchmaking, one RatingQueue per topic.
+    New player is matched on join, the rest are matched on ticks
+    with the oldest tickets first, at most TICK_BUDGET tickets per topic
+    """
+
+    def __init__(self) -> None:
+        self._queues: defaultdict[str, RatingQueue] = defaultdict(RatingQueue)
+        self._topics: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    def waiting_topics(self) -> set[str]:
+        return set(self._queues)
+
+    def reset(self) -> None:
+        """
+        Drop all waiting players, between tests
+        """
+        self._queues.clear()
+        self._topics.clear()
+
+    def _match(
+            self, queue: RatingQueue, ticket: Ticket, now: float, skip: Container[str]
+    ) -> list[str] | None:
+        if (other := queue.find(ticket, now, skip)) is None:
+            return None
+        for sid in (ticket.sid, other.sid):
+            queue.remove(sid)
+            del self._topics[sid]
+        return [other.sid, ticket.sid]
+
+    def join(
+            self, topic: str, sid: str, rating: float, now: float, skip: Container[str] = ()
+    ) -> list[str] | None:
+        """
+        Add player to topic queue and try to match him at once
+        :param topic: topic_id
+        :param sid: player SID
+        :param rating: player rating
+        :param now: current time
+        :param skip: SIDs of waiting players which can't be matched now
+        :return: SID of matched players or None if player is waiting
+        """
+        self.leave(sid)
+        ticket = Ticket(sid, rating, now)
+        self._queues[topic].add(ticket)
+        self._topics[sid] = topic
+        sids = self._match(self._queues[topic], ticket, now, skip)
+        self._drop_empty(topic)
+        return sids
+
+    def leave(self, sid: str) -> bool:
+        """
+        Remove player from waiting queue
+        :param sid: player SID
+        :return: True if player was waiting
+        """
+        if (topic := self._topics.pop(sid, None)) is None:
+            return False
+        self._queues[topic].remove(sid)
+        self._drop_empty(topic)
+        return True
+
+    def _drop_empty(self, topic: str) -> None:
+        if not self._queues[topic]:
+            del self._queues[topic]
+
+    def replace_sid(self, old_sid: str, sid: str) -> None:
+        """
+        Keep player place in queue after reconnect
+        :param old_sid: previous player SID
+        :param sid: new player SID
+        """
+        if (topic := self._topics.pop(old_sid, None)) is None:
+            return
+        queue = self._queues[topic]
+        ticket = queue.remove(old_sid)
+        ticket.sid = sid
+        queue.add(ticket)
+        self._topics[sid] = topic
+
+    def tick(
+            self, now: float, budget: int = TICK_BUDGET, skip: Container[str] = ()
+    ) -> list[tuple[str, list[str]]]:
+        """
+        Match waiting players with widened windows
+        :param now: current time
+        :param budget: max tickets checked per topic
+        :param skip: SIDs which keep their place but can't be matched now
+        :return: list of topic and SID of matched players
+        """
+        matches = []
+        for topic, queue in list(self._queues.items()):
+            for ticket in queue.oldest(budget):
+                if ticket.sid not in queue or ticket.sid in skip:
+                    continue
+                if sids := self._match(queue, ticket, now, skip):
+                    matches.append((topic, sids))
+            self._drop_empty(topic)
+        return matches
+
+    def __repr__(self) -> str:
+        return f"{type(self).__qualname__}(waiting={len(self)}, topics={len(self._queues)})"
@@ -0,0 +1,225 @@
+import asyncio
+import gc
+import random
+import sys
+import tracemalloc
+from collections import Counter
+from types import BuiltinFunctionType, FrameType, FunctionType, MethodType, ModuleType
+from typing import Any, Iterable
+
+from src.modules.content import content_loader
+from src.modules.history import HistoryContainer
+from src.modules.mod import (
+    ClientContainer,
+    Container,
+    GameContainer,
+    SingletonsConstructor,
+)
+
+SAMPLE_SIZE = 100
+MAX_OBJECTS = 100_000
+TRACE_FRAMES = 10
+# shared by every object, not retained by one
+_SKIP_TYPES = (
+    type,
+    ModuleType,
+    FunctionType,
+    BuiltinFunctionType,
+    MethodType,
+    FrameType,
+    asyncio.AbstractEventLoop,
+)
+
+
+def deep_size(obj: Any, seen: set[int], limit: int = MAX_OBJECTS) -> int:
+    """
+    Approximate retained size, sum of sys.getsizeof over referents graph
+    :param obj: root object
+    :param seen: id of objects already counted, updated in place
+    :param limit: max objects to visit
+    :return: size in bytes
+    """
+    size, stack = 0, [obj]
+    while stack and limit > 0:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SKIP_TYPES):
+            continue
+        seen.add(id(item))
+        limit -= 1
+        size += sys.getsizeof(item)
+        stack.extend(gc.get_referents(item))
+    return size
+
+
+def _shared_objects() -> tuple[set[int], int]:
+    # content pack is shared by all games, count it once separately
+    seen: set[int] = set()
+    return seen, deep_size(content_loader.current, seen)
+
+
+def _items(instance: Any) -> list[Any] | None:
+    if isinstance(instance, ClientContainer):
+        return [client for _, client in instance]
+    if isinstance(instance, Container):
+        return list(instance.objects.values())
+    return None
+
+
+def _sampled_size(shell: int, items: list[Any], shared: set[int]) -> int:
+    sample = random.sample(items, min(len(items), SAMPLE_SIZE))
+    if not sample:
+        return shell
+    sizes = [deep_size(item, set(shared)) for item in sample]
+    return shell + sum(sizes) * len(items) // len(sample)
+
+
+def container_stats(instance: Any, items: list[Any] | None, shared: set[int]) -> dict[str, Any]:
+    """
+    Object count and approximate retained size of singleton container,
+    size of containers is extrapolated from a sample of items
+    :param instance: container instance
+    :param items: items of container listed by list_containers
+    :param shared: id of objects shared between containers
+    :return: container stats
+    """
+    # repr of containers dump every item, name them by class and namespace
+    name = type(instance).__qualname__
+    if namespace := getattr(instance, "namespace", None):
+        name = f"{name}({namespace})"
+    stats: dict[str, Any] = {"name": name}
+    if items is None:
+        stats["objects"] = len(instance) if hasattr(instance, "__len__") else None
+        stats["bytes"] = deep_size(instance, set(shared))
+        return stats
+    shell = deep_size(instance, {*shared, *map(id, items)})
+    stats["objects"] = len(items)
+    stats["bytes"] = _sampled_size(shell, items, shared)
+    if isinstance(instance, GameContainer):
+        stats["orphans"] = len(instance.orphans())
+    if isinstance(instance, HistoryContainer):
+        stats["rooms"] = {room: len(history) for room, history in instance.objects.items()}
+    return stats
+
+
+Listing = list[tuple[Any, list[Any] | None]]
+
+
+def list_containers() -> Listing:
+    """
+    Living singletons with a copy of their items, call on the event loop,
+    so the worker thread walking their sizes doesn't iterate changing dicts
+    :return: list of container and its items, None for singletons without items
+    """
+    return [
+        (instance, _items(instance))
+        for instances in list(SingletonsConstructor._instances.values())
+        for instance in list(instances.values())
+    ]
+
+
+def containers_report(shared: set[int], containers: Listing) -> list[dict[str, Any]]:
+    """
+    Stats of every living singleton: client, game, actor and history containers, matchmaker
+    :param shared: id of objects shared between containers
+    :param containers: containers listed by list_containers
+    """
+    return [container_stats(instance, items, shared) for instance, items in containers]
+
+
+def type_counts(limit: int) -> dict[str, int]:
+    """
+    Most common types of objects tracked by gc
+    :param limit: count of types
+    """
+    counts = Counter(type(obj).__qualname__ for obj in gc.get_objects())
+    return dict(counts.most_common(limit))
+
+
+def memory_report(limit: int, containers: Listing | None = None) -> dict[str, Any]:
+    """
+    Containers stats, content size, most common types and gc state.
+    Walks the whole heap, the server runs it in worker thread
+    :param limit: count of types
+    :param containers: containers listed by list_containers, listed now if None
+    """
+    shared, content_bytes = _shared_objects()
+    return {
+        "containers": containers_report(
+            shared, list_containers() if containers is None else containers
+        ),
+        "content_bytes": content_bytes,
+        "types": type_counts(limit),
+        "gc": {"counts": gc.get_count(), "garbage": len(gc.garbage)},
+        "tracing": AllocationTracker.is_tracing(),
+    }
+
+
+def _filters() -> list[tracemalloc.Filter]:
+    return [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ]
+
+
+class AllocationTracker:
+    """
+    tracemalloc snapshot diffing: start tracing with a baseline snapshot,
+    later compare current snapshot to the baseline grouped by allocation site.
+    Tracing slows allocations, so it runs only between start and stop
+    """
+
+    _baseline: tracemalloc.Snapshot | None = None
+    # tracing started outside (PYTHONTRACEMALLOC, -X tracemalloc) is left running
+    _owns_tracing = False
+
+    @classmethod
+    def is_tracing(cls) -> bool:
+        return tracemalloc.is_tracing()
+
+    @classmethod
+    def start(cls, frames: int = TRACE_FRAMES) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            cls._owns_tracing = True
+        cls._baseline = tracemalloc.take_snapshot().filter_traces(_filters())
+
+    @classmethod
+    def stop(cls) -> None:
+        cls._baseline = None
+        if cls._owns_tracing:
+            tracemalloc.stop()
+            cls._owns_tracing = False
+
+    @classmethod
+    def diff(cls, limit: int, group: str = "lineno") -> dict[str, Any]:
+        """
+        Allocations grown since baseline
+        :param limit: count of allocation sites
+        :param group: "lineno", "filename" or "traceback"
+        :raise RuntimeError: tracing isn't started
+        :return: traced memory and top allocation sites by size difference
+        """
+        if cls._baseline is None or not tracemalloc.is_tracing():
+            raise RuntimeError("Allocation tracing isn't started!")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_filters())
+        stats = snapshot.compare_to(cls._baseline, group)[:limit]
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced": current,
+            "peak": peak,
+            "top": [_site(stat) for stat in stats],
+        }
+
+
+def _site(stat: tracemalloc.StatisticDiff) -> dict[str, Any]:
+    return {
+        "site": _frames(stat.traceback),
+        "size": stat.size,
+        "size_diff": stat.size_diff,
+        "count": stat.count,
+        "count_diff": stat.count_diff,
+    }
+
+
+def _frames(traceback: Iterable[tracemalloc.Frame]) -> list[str]:
+    return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
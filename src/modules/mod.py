@@ -1,11 +1,15 @@
-import csv
+import inspect
+import uuid
 from collections import defaultdict
 from datetime import datetime
 from numbers import Number
-from typing import Any, Generator
+from typing import Any, Callable, Collection, Iterator
 from weakref import WeakKeyDictionary
 from zoneinfo import ZoneInfo
 
+from src.modules.answers import AnswerMatcher
+from src.modules.content import ContentPack, RiddleItem, TriviaQuestion, content_loader
+
 
 class Messages:
     """
@@ -38,6 +42,11 @@ class Client:
         self.game_uid: str | None = None
         self.name: str | None = None
         self.room: str | None = None
+        # names aren't unique, ratings are kept by player id,
+        # browser sends its own one to keep the rating across connections
+        self.player_id: str = uuid.uuid4().hex
+        # games keep players by SID, restored ones are moved to the new SID
+        self.sid: str | None = None
         self._start: datetime = datetime.now()
         self._end: datetime | None = None
         self._messages: defaultdict[str, Messages] = defaultdict(Messages)
@@ -69,6 +78,37 @@ class Client:
             case _:
                 raise ValueError(f"The game {name}, not found!")
 
+    def to_state(self) -> list[Any]:
+        """
+        Compact client state for persistence, chat messages aren't included
+        :return: list with client state
+        """
+        game = type(self.game).__name__.lower() if self.game is not None else None
+        return [
+            self.name,
+            self.room,
+            self.game_uid,
+            game,
+            self.game.to_state() if self.game is not None else None,
+            self.player_id,
+            self.sid,
+        ]
+
+    def load_state(self, state: list[Any]) -> None:
+        """
+        Restore client state created by to_state
+        :param state: list with client state
+        """
+        self.name, self.room, self.game_uid, game, game_state = state[:5]
+        # states written before player id and SID were added miss them
+        if len(state) > 5:
+            self.player_id = state[5]
+        if len(state) > 6:
+            self.sid = state[6]
+        if game is not None:
+            self.create_game(game)
+            self.game.load_state(game_state)
+
     def __repr__(self) -> str:
         return f"{type(self).__qualname__}(name={self.name}, room={self.room}\
             ,messages={self._messages}, start={self._start}, end={self._end}, game={self.game}, game_uid={self.game_uid})"
@@ -76,18 +116,29 @@ class Client:
 
 class SingletonsConstructor(type):
     """
-    Singletons metaclass
+    Singletons metaclass, one instance per class and constructor arguments
     """
 
     _instances: WeakKeyDictionary = WeakKeyDictionary()
+    _signatures: WeakKeyDictionary = WeakKeyDictionary()
 
     def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            instance = super().__call__(*args, **kwargs)
-            cls._instances[cls] = instance
-        else:
-            instance = cls._instances[cls]
-        return instance
+        instances = cls._instances.setdefault(cls, {})
+        key = cls._key(args, kwargs)
+        if key not in instances:
+            instances[key] = super().__call__(*args, **kwargs)
+        return instances[key]
+
+    def _key(cls, args: tuple, kwargs: dict) -> tuple:
+        """
+        Constructor arguments bound by name, so positional, keyword and
+        default values of the same argument give the same instance
+        """
+        if (signature := cls._signatures.get(cls)) is None:
+            signature = cls._signatures[cls] = inspect.signature(cls.__init__)
+        bound = signature.bind(None, *args, **kwargs)
+        bound.apply_defaults()
+        return tuple(bound.arguments.items())[1:]
 
     def __repr__(cls) -> str:
         return f"{type(cls).__qualname__}(_instances={cls._instances})"
@@ -103,13 +154,82 @@ class Container(metaclass=SingletonsConstructor):
         return f"{type(self).__qualname__}(container={self.objects})"
 
 
+ClientHook = Callable[[str, "Client"], None]
+
+
 class ClientContainer(Container):
     """
-    Container, return information about Client by their SID
+    Container, return information about Client by their SID.
+    One container per namespace, clients split into shards by SID
     """
 
-    def __init__(self) -> None:
-        self.objects = defaultdict(Client)
+    SHARDS = 16
+
+    def __init__(self, namespace: str) -> None:
+        self.namespace = namespace
+        self._shards: list[dict[str, Client]] = [{} for _ in range(self.SHARDS)]
+        self._connect_hooks: list[ClientHook] = []
+        self._disconnect_hooks: list[ClientHook] = []
+        # SID to session token, persisted state is keyed by token
+        self._sessions: dict[str, str] = {}
+
+    def _shard(self, sid) -> dict[str, Client]:
+        return self._shards[hash(sid) % self.SHARDS]
+
+    def __len__(self) -> int:
+        return sum(map(len, self._shards))
+
+    def __iter__(self) -> Iterator[tuple[str, Client]]:
+        for shard in self._shards:
+            yield from shard.items()
+
+    def key(self, sid) -> str | None:
+        """
+        Client key unique across namespaces and stable across restarts
+        :param sid: client SID
+        :return: namespace and session token, None if SID has no session
+        """
+        if (token := self._sessions.get(sid)) is None:
+            return None
+        return f"{self.namespace} {token}"
+
+    def bind_session(self, sid, token: str) -> None:
+        """
+        Set session token of SID, client state is stored by it
+        :param sid: client SID
+        :param token: session token
+        """
+        self._sessions[sid] = token
+
+    def add_connect_hook(self, hook: ClientHook) -> None:
+        self._connect_hooks.append(hook)
+
+    def add_disconnect_hook(self, hook: ClientHook) -> None:
+        self._disconnect_hooks.append(hook)
+
+    def connect(self, sid) -> Client:
+        """
+        Create client for connected SID and run connect hooks
+        :param sid: client SID
+        :return: Client
+        """
+        client = self._shard(sid)[sid] = Client()
+        client.sid = sid
+        for hook in self._connect_hooks:
+            hook(sid, client)
+        return client
+
+    def disconnect(self, sid) -> Client | None:
+        """
+        Run disconnect hooks and delete client
+        :param sid: client SID
+        :return: deleted Client or None if not exist
+        """
+        if (client := self._shard(sid).pop(sid, None)) is not None:
+            for hook in self._disconnect_hooks:
+                hook(sid, client)
+        self._sessions.pop(sid, None)
+        return client
 
     def get_item(self, sid) -> Client:
         """
@@ -117,15 +237,39 @@ class ClientContainer(Container):
         :param sid: client SID
         :return: container
         """
-        return self.objects[sid]
+        shard = self._shard(sid)
+        if (client := shard.get(sid)) is None:
+            client = shard[sid] = Client()
+            client.sid = sid
+        return client
+
+    def set_item(self, sid, client: Client) -> None:
+        """
+        Put client object to container, used on restore
+        :param sid: client SID
+        :param client: Client
+        """
+        self._shard(sid)[sid] = client
+        client.sid = sid
 
     def del_item(self, sid) -> None:
         """
         Delete client object from container by their SID
         :param sid: client SID
         """
-        if sid in self.objects.keys():
-            del self.objects[sid]
+        self._shard(sid).pop(sid, None)
+        self._sessions.pop(sid, None)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Namespace statistic
+        :return: clients count in total and per shard
+        """
+        shards = [len(shard) for shard in self._shards]
+        return {"namespace": self.namespace, "clients": sum(shards), "shards": shards}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__qualname__}(namespace={self.namespace}, clients={len(self)})"
 
 
 class GameContainer(Container):
@@ -133,6 +277,8 @@ class GameContainer(Container):
     Container, return information about Trivia instance by their UID
     """
 
+    TOPICS = "topics"
+
     def __init__(self) -> None:
         self.objects = defaultdict(Trivia)
 
@@ -152,6 +298,13 @@ class GameContainer(Container):
         if uid in self.objects.keys():
             del self.objects[uid]
 
+    def orphans(self) -> list[str]:
+        """
+        Games without players, e.g. created by get_item on unknown UID
+        :return: list of game UID
+        """
+        return [uid for uid, game in self.objects.items() if uid != self.TOPICS and not game.users]
+
 
 class Game:
     """
@@ -182,6 +335,20 @@ class Game:
     def score_decrement(self):
         self._score -= 1
 
+    def to_state(self) -> list[Any]:
+        """
+        Compact game state for persistence
+        :return: list with game state
+        """
+        return [self._question, self._answer, self._score]
+
+    def load_state(self, state: list[Any]) -> None:
+        """
+        Restore game state created by to_state
+        :param state: list with game state
+        """
+        self._question, self._answer, self._score = state[:3]
+
     def __repr__(self) -> str:
         return f"{type(self).__name__}(questions={self._questions},answer={self._answer},question={self._question},\
         score={self._score})"
@@ -192,25 +359,43 @@ class Riddle(Game):
     Class store riddle game actions
     """
 
-    _QUESTIONS: list[tuple[str, str]] = [
-        ("Висит груша нельзя скушать?", "лампочка"),
-        ("Зимой и летом одним цветом", "Ёлка"),
-    ]
-
-    def __init__(self) -> None:
+    def __init__(self, pack: ContentPack | None = None) -> None:
         super().__init__()
+        self._pack = pack or content_loader.current
 
     def get_question(self):
         if not self._questions:
-            self._questions = list(Riddle._QUESTIONS)
+            self._questions = list(self._pack.riddles)
         if self._questions:
-            self._question, self._answer = self._questions.pop()
+            item = self._questions.pop()
+            self._question, self._answer = item.question, item.answer
         else:
             self._answer = None
             self._question = None
 
+    def check_answer(self, text: str) -> bool:
+        """
+        Check player answer to current riddle
+        :param text: player answer
+        :return: True if answer is accepted
+        """
+        if self._answer is None:
+            return False
+        if (matcher := self._pack.answer_matcher(self._question)) is None:
+            # riddle restored from state may be missing in the current pack
+            matcher = AnswerMatcher(self._answer)
+        return matcher.matches(text)
+
     def recreate(self):
-        self._questions += list(Riddle._QUESTIONS)
+        self._questions += list(self._pack.riddles)
+
+    def to_state(self) -> list[Any]:
+        return [*super().to_state(), [list(i) for i in self._questions or ()]]
+
+    def load_state(self, state: list[Any]) -> None:
+        super().load_state(state)
+        # states saved before synonyms have question and answer only
+        self._questions = [RiddleItem(i[0], i[1], tuple(i[2]) if len(i) > 2 else ()) for i in state[3]]
 
 
 class Trivia(Game):
@@ -222,57 +407,37 @@ class Trivia(Game):
 
     def __init__(self) -> None:
         super().__init__()
-        self._options: list[str] | None = None
+        self._options: tuple[str, ...] | None = None
         self._users: list = []
         self._topic: str | None = None
         self._players_answers: list[dict] = []
 
-    @staticmethod
-    def _read_csv(path) -> Generator[dict[str, Any], None, None]:
-        """
-        CSV reader
-        :param path: path to file
-        :return: Generator
-        """
-        with open(path, "r") as file:
-            csv_reader = csv.DictReader(file)
-            for row in csv_reader:
-                yield row
-
     @classmethod
-    def load_topics(cls, path) -> None:
+    def load_topics(cls, pack: ContentPack, waiting: Collection[str] = ()) -> None:
         """
-        Load Trivia topics from provided path
-        :param path: topic file
+        Load Trivia topics from content pack
+        :param pack: content pack
+        :param waiting: topics with waiting players
         :return:
         """
         cls._topics = []
-        for i in Trivia._read_csv(path):
-            topic = i.get("pk")
-            waiting_room = WaitingRoom()
-            if topic and waiting_room.get_sid_per_topic(str(topic)):
-                i["has_players"] = True
-            cls._topics.append(i)
+        for i in pack.topics:
+            topic = dict(i)
+            if topic["pk"] in waiting:
+                topic["has_players"] = True
+            cls._topics.append(topic)
 
-    def load_questions(self, path) -> None:
+    def load_questions(self, pack: ContentPack) -> None:
         """
-        Load Trivia questions from provided path
-        :param path: questions file
+        Load Trivia questions from content pack, game keep the pack until the end
+        :param pack: content pack
         """
         if not self._questions:
             self._questions = defaultdict(list)
-        for i in Trivia._read_csv(path):
-            self._questions[i["topic"]].append(
-                {
-                    "text": i["text"],
-                    "answer": i["answer"],
-                    "options": [v for k, v in i.items() if k in ["1", "2", "3", "4"]],
-                }
-            )
-
-    def _questions_per_topic(
-            self, topic: str
-    ) -> list[dict[str, int | str | list[str]]] | None:
+        for topic in pack.topics:
+            self._questions[topic["pk"]].extend(pack.questions_for(topic["pk"]))
+
+    def _questions_per_topic(self, topic: str) -> list[TriviaQuestion] | None:
         """
         Provide question for topics
         :param topic: topic number
@@ -285,7 +450,7 @@ class Trivia(Game):
         return Trivia._topics
 
     @property
-    def options(self) -> list[str] | None:
+    def options(self) -> tuple[str, ...] | None:
         return self._options
 
     @property
@@ -296,6 +461,17 @@ class Trivia(Game):
         if sid not in self.users:
             self._users.append(sid)
 
+    def replace_user(self, old_sid: str, sid: str) -> None:
+        """
+        Move player and his answer to new SID after reconnect
+        :param old_sid: previous player SID
+        :param sid: new player SID
+        """
+        self._users = [sid if user == old_sid else user for user in self._users]
+        for answer in self._players_answers:
+            if answer["sid"] == old_sid:
+                answer["sid"] = sid
+
     @property
     def topic(self) -> str | None:
         return self._topic
@@ -304,15 +480,15 @@ class Trivia(Game):
     def topic(self, topic: str | Number):
         self._topic = str(topic)
 
-    def get_players(self) -> list[dict]:
+    def get_players(self, container: ClientContainer) -> list[dict]:
         """
         Get players with their scores
+        :param container: clients of the game namespace
         :return: score for players
         """
         players = []
         if self.users:
             for sid in self._users:
-                container = ClientContainer()
                 client = container.get_item(sid)
                 trivia = client.game
                 players.append({"name": client.name, "score": trivia.score})
@@ -326,12 +502,9 @@ class Trivia(Game):
         data = self._questions_per_topic(topic)
         if data:
             current = data.pop()
-            indx = current.get("answer")
-            self._answer = (
-                int(indx) if isinstance(indx, int) or isinstance(indx, str) else None
-            )
-            self._options = current.get("options")
-            self._question = current.get("text")
+            self._answer = current.answer
+            self._options = current.options
+            self._question = current.text
         else:
             self._answer = None
             self._options = None
@@ -349,6 +522,15 @@ class Trivia(Game):
             return len(question)
         return 0
 
+    def is_current(self, question_count: int) -> bool:
+        """
+        Check answer is sent for the current question, not for a previous one
+        :param question_count: question count of the game event the answer is sent for
+        """
+        return self._question is not None and (
+            question_count == self.remaining_question_on_topic(self._topic) + 1
+        )
+
     def add_game_answer(self, index: int, sid: str) -> None:
         """
         Add player answer
@@ -375,74 +557,35 @@ class Trivia(Game):
         """
         return self._players_answers
 
+    def to_state(self) -> list[Any]:
+        # remaining questions are stored, restored game keeps the pack it started with;
+        # only the game topic is asked, other topics are left out
+        questions = {
+            topic: [[item.text, item.answer, list(item.options)] for item in items]
+            for topic, items in (self._questions or {}).items()
+            if topic == self._topic
+        }
+        return [
+            *super().to_state(),
+            questions,
+            list(self._options) if self._options else None,
+            self._users,
+            self._topic,
+            self._players_answers,
+        ]
+
+    def load_state(self, state: list[Any]) -> None:
+        super().load_state(state)
+        questions, options, self._users, self._topic, self._players_answers = state[3:]
+        self._questions = defaultdict(list)
+        for topic, items in questions.items():
+            # states saved with question count only can't be matched to their pack
+            if isinstance(items, list):
+                self._questions[topic] = [TriviaQuestion(i[0], i[1], tuple(i[2])) for i in items]
+        self._options = tuple(options) if options else None
+
     def __repr__(self) -> str:
         return (
             f"{super().__repr__()},topics={self._topics},options={self._options},users={self._users},"
             f"topic={self._topic},players_answers={self._players_answers}"
         )
-
-
-class WaitingRoom(metaclass=SingletonsConstructor):
-    """
-    Class realise waiting room
-    """
-
-    def __init__(self) -> None:
-        self._waiting_room: defaultdict[str, list[str]] = defaultdict(list)
-
-    def add_sid_to_topic(self, topic: str, sid: str) -> None:
-        """
-        Add client SID to topic
-        :param topic: topic_id
-        :param sid: client sid
-        :return:
-        """
-        if sid not in (topic_wr := self._waiting_room[topic]):
-            topic_wr.append(sid)
-
-    def remove_sid_from_topic(self, topic: str) -> None:
-        """
-        Remove client SID from topic
-        :param topic: topic_id
-        :return:
-        """
-        if topic in self._waiting_room.keys():
-            if user_per_topic := self.get_sid_per_topic(topic):
-                for sid in user_per_topic:
-                    self._waiting_room[topic].remove(sid)
-        else:
-            raise ValueError("Topic not found!")
-
-    def clear_topic(self, topic: str) -> None:
-        """
-        Clear topic
-        :param topic: topic_id
-        :return:
-        """
-        if topic in self._waiting_room.keys():
-            del self._waiting_room[topic]
-        else:
-            raise ValueError("Topic not found!")
-
-    def get_sid_per_topic(self, topic: str) -> list[str] | None:
-        """
-        Get users sid for topic
-        :param topic: topic_id
-        :return: return list of sid per topic
-        """
-        if not topic:
-            raise AttributeError("Topic not provided!")
-        return self._waiting_room.get(topic)
-
-    def remove_sid_from_waiting_room(self, sid: str) -> None:
-        """
-        Remove user SID from waiting room
-        :param sid: user SID
-        :return:
-        """
-        for topic, sids in self._waiting_room.items():
-            if (players := self._waiting_room.get(topic)) and sid in players:
-                players.remove(sid)
-
-    def __repr__(self) -> str:
-        return f"{type(self).__qualname__}(waiting_room={self._waiting_room})"
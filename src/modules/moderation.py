@@ -0,0 +1,295 @@
+import csv
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Any, Iterable, Mapping, NamedTuple, Sequence
+
+import socketio
+import yaml
+from pydantic import ValidationError
+
+from src.apps.base import CallNext
+from src.modules.content import ContentLoader
+from src.schemas.schema import ModerationConfig, ModerationTermRow
+
+logger = logging.getLogger("moderation")
+
+TERMS_FILE = "moderation_terms.csv"
+POLICIES_FILE = "moderation.yaml"
+MODERATED_EVENT = "send_message"
+# actions by severity, the most severe action of matched terms wins
+FLAG = "flag"
+MASK = "mask"
+DROP = "drop"
+SEVERITY = {FLAG: 1, MASK: 2, DROP: 3}
+MASK_CHAR = "*"
+# dropped inside words, "с.п.а.м" matches "спам"
+SEPARATORS = frozenset(".-_*~'\"`\u00ad\u200b\u200c\u200d")
+# latin letters and digits looking like cyrillic ones, ё as е
+HOMOGLYPHS = {
+    "a": "а", "b": "в", "c": "с", "e": "е", "h": "н", "k": "к", "m": "м", "o": "о",
+    "p": "р", "t": "т", "x": "х", "y": "у", "0": "о", "3": "з", "6": "б", "@": "а",
+    "ё": "е",
+}
+_TRANSLATE = str.maketrans(HOMOGLYPHS)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase text and replace look-alike characters, one output character
+    per input character, so match positions point into the original text
+    :param text: message text
+    :return: normalized text
+    """
+    if len(lower := text.lower()) != len(text):
+        # a few characters lowercase to two, only these keep their case
+        lower = "".join(low if len(low := char.lower()) == 1 else char for char in text)
+    return lower.translate(_TRANSLATE)
+
+
+class Term(NamedTuple):
+    text: str
+    category: str
+    whole_word: bool
+
+
+class Match(NamedTuple):
+    start: int
+    end: int
+    term: Term
+
+
+def _is_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not text[index].isalnum()
+
+
+def _accepted(term: Term, text: str, start: int, end: int) -> bool:
+    return not term.whole_word or (_is_boundary(text, start - 1) and _is_boundary(text, end))
+
+
+class Automaton:
+    """
+    Aho-Corasick automaton over normalized terms. Transitions of all states
+    are kept in one dict by (state, char), outputs are merged along failure links,
+    so a scan is one pass over the text whatever the count of terms
+    """
+
+    __slots__ = ("_goto", "_fail", "_out", "terms")
+
+    def __init__(self, terms: Iterable[Term]) -> None:
+        self._goto: dict[tuple[int, str], int] = {}
+        self.terms = 0
+        children: list[list[tuple[str, int]]] = [[]]
+        own: list[tuple[tuple[int, Term], ...]] = [()]
+        for term in terms:
+            state = 0
+            for char in term.text:
+                if (child := self._goto.get((state, char))) is None:
+                    child = self._goto[state, char] = len(children)
+                    children[state].append((char, child))
+                    children.append([])
+                    own.append(())
+                state = child
+            if state:
+                own[state] += ((len(term.text), term),)
+                self.terms += 1
+        self._fail = [0] * len(children)
+        self._out: dict[int, tuple[tuple[int, Term], ...]] = {}
+        self._link(children, own)
+
+    def _link(
+            self, children: list[list[tuple[str, int]]], own: list[tuple[tuple[int, Term], ...]]
+    ) -> None:
+        # breadth-first, failure target of a state is always shallower than the state
+        queue = deque(child for _, child in children[0])
+        while queue:
+            state = queue.popleft()
+            if matches := own[state] + self._out.get(self._fail[state], ()):
+                self._out[state] = matches
+            for char, child in children[state]:
+                fail = self._fail[state]
+                while (target := self._goto.get((fail, char))) is None and fail:
+                    fail = self._fail[fail]
+                self._fail[child] = target or 0
+                queue.append(child)
+
+    def __len__(self) -> int:
+        return len(self._fail)
+
+    def find(self, text: str) -> list[Match]:
+        """
+        Find terms in normalized text, separators inside words are skipped
+        :param text: normalized text
+        :return: matches with positions in text
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state, positions, found = 0, [], []
+        for index, char in enumerate(text):
+            if char in SEPARATORS:
+                continue
+            positions.append(index)
+            while (target := goto.get((state, char))) is None and state:
+                state = fail[state]
+            state = target or 0
+            for length, term in out.get(state, ()):
+                if _accepted(term, text, start := positions[-length], index + 1):
+                    found.append(Match(start, index + 1, term))
+        return found
+
+
+class Verdict(NamedTuple):
+    action: str | None
+    text: str
+    categories: tuple[str, ...]
+
+
+class ModerationRules:
+    """
+    Immutable version of moderation lists: terms automaton and room policies.
+    Policy maps term category to action, categories missing in policy are allowed
+    """
+
+    __slots__ = ("_version", "_automaton", "_policies", "_rooms", "_default")
+
+    def __init__(
+            self,
+            *,
+            version: int,
+            terms: Iterable[Term],
+            policies: Mapping[str, Mapping[str, str]],
+            rooms: Mapping[str, str],
+            default: str,
+    ) -> None:
+        self._version = version
+        self._automaton = Automaton(terms)
+        self._policies = policies
+        self._rooms = rooms
+        self._default = default
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def policy_for(self, room: str | None) -> Mapping[str, str]:
+        """
+        Policy of the room, rooms without own policy get the default one
+        :param room: room name
+        :return: category to action
+        """
+        return self._policies.get(self._rooms.get(room, self._default), {})  # type: ignore[arg-type]
+
+    def moderate(self, room: str | None, text: str) -> Verdict:
+        """
+        Check message text by room policy
+        :param room: room name
+        :param text: message text
+        :return: Verdict, text is masked when action is "mask"
+        """
+        if not text or not (policy := self.policy_for(room)):
+            return Verdict(None, text, ())
+        matches = [
+            (match, action)
+            for match in self._automaton.find(normalize_text(text))
+            if (action := policy.get(match.term.category))
+        ]
+        if not matches:
+            return Verdict(None, text, ())
+        action = max((action for _, action in matches), key=SEVERITY.__getitem__)
+        categories = tuple(sorted({match.term.category for match, _ in matches}))
+        if action == MASK:
+            text = _mask(text, [match for match, item in matches if item == MASK])
+        return Verdict(action, text, categories)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__qualname__}(version={self._version}, terms={self._automaton.terms}, "
+            f"states={len(self._automaton)}, policies={sorted(self._policies)})"
+        )
+
+
+def _mask(text: str, matches: Sequence[Match]) -> str:
+    chars = list(text)
+    for match in matches:
+        for index in range(match.start, match.end):
+            # whitespace and separators between term letters stay visible
+            if not chars[index].isspace() and chars[index] not in SEPARATORS:
+                chars[index] = MASK_CHAR
+    return "".join(chars)
+
+
+def _read_terms(path: Path) -> Iterable[Term]:
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        for row in csv.DictReader(file):
+            item = ModerationTermRow(**row)
+            text = "".join(c for c in normalize_text(item.term) if c not in SEPARATORS)
+            yield Term(text, item.category, item.match == "word")
+
+
+def parse_moderation(folder: Path, version: int) -> ModerationRules:
+    """
+    Parse and validate moderation files and build automaton, blocking, must run in worker thread
+    :param folder: folder with moderation files
+    :param version: version number for new rules
+    :return: ModerationRules
+    :raise ValueError: moderation files is invalid
+    """
+    try:
+        with open(folder / POLICIES_FILE, encoding="utf-8") as file:
+            config = ModerationConfig(**yaml.safe_load(file))
+        return ModerationRules(
+            version=version,
+            terms=_read_terms(folder / TERMS_FILE),
+            policies=config.policies,
+            rooms=config.rooms,
+            default=config.default_policy,
+        )
+    except (OSError, TypeError, yaml.YAMLError, ValidationError) as err:
+        raise ValueError(f"Moderation lists are invalid: {err}") from err
+
+
+class Moderator:
+    """
+    Chat middleware, check "send_message" text by the room policy before the handler:
+    "mask" replace matched terms, "drop" reject the message, "flag" only log it
+    """
+
+    def __init__(self, loader: ContentLoader[ModerationRules]) -> None:
+        self.loader = loader
+        self.stats = dict.fromkeys(SEVERITY, 0)
+
+    def report(self) -> dict[str, Any]:
+        """
+        Moderated messages per action since start and version of moderation lists
+        """
+        return {"version": self.loader.current.version, "actions": dict(self.stats)}
+
+    async def middleware(
+            self, namespace: socketio.AsyncNamespace, event: str, args: tuple, call_next: CallNext
+    ) -> Any:
+        if event != MODERATED_EVENT or len(args) < 2 or not isinstance(args[1], dict):
+            return await call_next()
+        sid, data = args[0], args[1]
+        if not isinstance(text := data.get("text"), str):
+            return await call_next()
+        room = namespace.clients.get_item(sid).room
+        verdict = self.loader.current.moderate(room, text)
+        if verdict.action is None:
+            return await call_next()
+        self.stats[verdict.action] += 1
+        logger.warning(
+            f"Client {sid} message on room {room}, action: {verdict.action}, "
+            f"categories: {verdict.categories}"
+        )
+        if verdict.action == DROP:
+            await namespace.emit(
+                "moderated", to=sid, data={"action": DROP, "categories": verdict.categories}
+            )
+            return None
+        data["text"] = verdict.text
+        return await call_next()
+
+
+moderation_loader: ContentLoader[ModerationRules] = ContentLoader(
+    files=(TERMS_FILE, POLICIES_FILE), parse=parse_moderation
+)
+moderator = Moderator(moderation_loader)
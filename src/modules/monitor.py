@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from contextlib import suppress
+from typing import Any
+
+import socketio
+
+from src.apps.base import CallNext
+from src.modules.mod import ClientContainer
+
+logger = logging.getLogger("monitor")
+
+SAMPLE_INTERVAL = 0.5
+MAX_LAG = 0.25
+SLOW_HANDLER = 0.1
+LAG_SMOOTHING = 0.3
+MAX_CLIENTS: dict[str, int] = {
+    "/chat": 10_000,
+    "/riddle": 10_000,
+    "/trivia": 10_000,
+}
+
+
+class LoopMonitor:
+    """
+    Measure event loop scheduling delay and slow event handlers.
+    Lag is smoothed with EWMA, so one long callback doesn't flip readiness
+    """
+
+    def __init__(
+            self,
+            interval: float = SAMPLE_INTERVAL,
+            max_lag: float = MAX_LAG,
+            slow_handler: float = SLOW_HANDLER,
+    ) -> None:
+        self._interval = interval
+        self.max_lag = max_lag
+        self._slow_handler = slow_handler
+        self.lag = 0.0
+        self.peak_lag = 0.0
+        self._active: Counter[str] = Counter()
+        self.slow_handlers: Counter[str] = Counter()
+        self.lag_culprits: Counter[str] = Counter()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def overloaded(self) -> bool:
+        return self.lag > self.max_lag
+
+    def _observe(self, lag: float) -> None:
+        self.lag += LAG_SMOOTHING * (lag - self.lag)
+        self.peak_lag = max(self.peak_lag, lag)
+        if lag > self.max_lag:
+            # handlers in flight while the loop was late
+            self.lag_culprits.update(self._active.keys())
+            logger.warning(
+                f"Event loop lag {lag:.3f}s, handlers in flight: {list(self._active)}"
+            )
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self._interval)
+            self._observe(max(loop.time() - started - self._interval, 0.0))
+
+    async def middleware(
+            self, namespace: socketio.AsyncNamespace, event: str, args: tuple, call_next: CallNext
+    ) -> Any:
+        """
+        Namespace middleware, time handler and track handlers in flight
+        """
+        name = f"{namespace.namespace}:{event}"
+        self._active[name] += 1
+        started = time.perf_counter()
+        try:
+            return await call_next()
+        finally:
+            if (duration := time.perf_counter() - started) > self._slow_handler:
+                self.slow_handlers[name] += 1
+                logger.warning(f"Slow handler {name}: {duration:.3f}s")
+            self._active[name] -= 1
+            if not self._active[name]:
+                del self._active[name]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "lag": round(self.lag, 4),
+            "peak_lag": round(self.peak_lag, 4),
+            "max_lag": self.max_lag,
+            "slow_handlers": dict(self.slow_handlers.most_common(10)),
+            "lag_culprits": dict(self.lag_culprits.most_common(10)),
+        }
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+class AdmissionController:
+    """
+    Refuse new connections when the loop is lagging or namespace is full
+    """
+
+    def __init__(self, monitor: LoopMonitor, max_clients: dict[str, int] | None = None) -> None:
+        self._monitor = monitor
+        self._max_clients = MAX_CLIENTS if max_clients is None else max_clients
+        self.refused: Counter[str] = Counter()
+
+    def reason(self, namespace: str) -> str | None:
+        """
+        Why namespace doesn't accept connections
+        :param namespace: namespace name
+        :return: reason or None if connection is allowed
+        """
+        if self._monitor.overloaded:
+            return "overloaded"
+        limit = self._max_clients.get(namespace)
+        if limit is not None and len(ClientContainer(namespace)) >= limit:
+            return "full"
+        return None
+
+    @property
+    def ready(self) -> bool:
+        return not self._monitor.overloaded
+
+    async def middleware(
+            self, namespace: socketio.AsyncNamespace, event: str, args: tuple, call_next: CallNext
+    ) -> Any:
+        """
+        Namespace middleware, refuse "connect" event when not admitted
+        :raise ConnectionRefusedError: connection isn't admitted
+        """
+        if event == "connect" and (reason := self.reason(namespace.namespace)):
+            self.refused[f"{namespace.namespace}:{reason}"] += 1
+            raise socketio.exceptions.ConnectionRefusedError(reason)
+        return await call_next()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "clients": {
+                namespace: {**ClientContainer(namespace).stats(), "limit": limit}
+                for namespace, limit in self._max_clients.items()
+            },
+            "refused": dict(self.refused),
+        }
+
+
+loop_monitor = LoopMonitor()
+admission = AdmissionController(loop_monitor)
@@ -0,0 +1,256 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Iterable
+
+from src.modules.mod import Client, ClientContainer, GameContainer, Trivia
+
+logger = logging.getLogger("persistence")
+
+STATE_DB_ENV = "STATE_DB"
+STATE_DB = "state.db"
+FLUSH_INTERVAL = 1.0
+STATE_TTL = 3600.0
+COLLECT_CHUNK = 1000
+
+# clients are stored by session token, rows of old "client" kind were keyed by SID
+CLIENT = "session"
+GAME = "game"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data BLOB NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID
+"""
+
+Row = tuple[str, str, bytes, float]
+
+
+def get_state_db() -> str:
+    return os.environ.get(STATE_DB_ENV) or STATE_DB
+
+
+def encode_state(state: list[Any]) -> bytes:
+    return json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def decode_state(data: bytes) -> list[Any]:
+    return json.loads(data)
+
+
+class SQLiteBackend:
+    """
+    Blocking SQLite access, all methods must run in one worker thread
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # path is resolved on first use, so STATE_DB can be set after import
+            self._conn = sqlite3.connect(self._path or get_state_db())
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(_SCHEMA)
+        return self._conn
+
+    def write(self, upserts: list[Row], deletes: list[tuple[str, str]]) -> None:
+        with self.conn:
+            if upserts:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO state (kind, key, data, updated) VALUES (?, ?, ?, ?)",
+                    upserts,
+                )
+            if deletes:
+                self.conn.executemany(
+                    "DELETE FROM state WHERE kind = ? AND key = ?", deletes
+                )
+
+    def read(self, since: float) -> list[tuple[str, str, bytes]]:
+        with self.conn:
+            self.conn.execute("DELETE FROM state WHERE updated < ?", (since,))
+        return self.conn.execute("SELECT kind, key, data FROM state").fetchall()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class StateStore:
+    """
+    Write-behind store for clients and trivia games.
+    Handlers mark changed objects, object written once per flush interval
+    no matter how many times it changed, SQLite work run in background thread
+    """
+
+    def __init__(self, path: str | Path | None = None, ttl: float = STATE_TTL) -> None:
+        self._backend = SQLiteBackend(path)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state")
+        self._ttl = ttl
+        self._dirty: dict[tuple[str, str], Any] = {}
+        self._flusher: asyncio.Task | None = None
+        self._running = False
+
+    def __len__(self) -> int:
+        return len(self._dirty)
+
+    def mark(self, kind: str, key: str | None, obj: Any) -> None:
+        """
+        Mark object as changed
+        :param kind: CLIENT or GAME
+        :param key: client key (ClientContainer.key) or game UID, None is ignored
+        :param obj: object with to_state method
+        """
+        if self._running and key:
+            self._dirty[(kind, key)] = obj
+
+    def track(self, container: ClientContainer) -> None:
+        """
+        Mark clients of container as deleted on disconnect
+        :param container: namespace clients
+        """
+        container.add_disconnect_hook(
+            lambda sid, _: self.mark_deleted(CLIENT, container.key(sid))
+        )
+
+    def mark_deleted(self, kind: str, key: str | None) -> None:
+        """
+        Mark object as deleted
+        :param kind: CLIENT or GAME
+        :param key: client key (ClientContainer.key) or game UID
+        """
+        if self._running and key:
+            self._dirty[(kind, key)] = None
+
+    @staticmethod
+    def _collect(
+            dirty: list[tuple[tuple[str, str], Any]], now: float
+    ) -> tuple[list[Row], list[tuple[str, str]]]:
+        upserts: list[Row] = []
+        deletes: list[tuple[str, str]] = []
+        for (kind, key), obj in dirty:
+            if obj is None:
+                deletes.append((kind, key))
+            else:
+                upserts.append((kind, key, encode_state(obj.to_state()), now))
+        return upserts, deletes
+
+    async def _run(self, func, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    async def flush(self) -> int:
+        """
+        Write all dirty objects in one transaction.
+        Objects are serialized on the event loop in chunks, so state is consistent
+        and big flushes don't block other handlers. A failed batch is merged back,
+        changes marked during the flush win
+        :return: count of written rows
+        :raise sqlite3.Error: write failed, batch is retried on next flush
+        """
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = list(self._dirty.items()), {}
+        try:
+            now = time.time()
+            upserts: list[Row] = []
+            deletes: list[tuple[str, str]] = []
+            for i in range(0, len(dirty), COLLECT_CHUNK):
+                chunk_upserts, chunk_deletes = self._collect(dirty[i: i + COLLECT_CHUNK], now)
+                upserts += chunk_upserts
+                deletes += chunk_deletes
+                await asyncio.sleep(0)
+            await self._run(self._backend.write, upserts, deletes)
+        except (sqlite3.Error, asyncio.CancelledError):
+            self._dirty = {**dict(dirty), **self._dirty}
+            raise
+        return len(upserts) + len(deletes)
+
+    async def restore(self) -> list[tuple[str, str, list[Any]]]:
+        """
+        Read all states not older than TTL, expired states are purged
+        :return: list of kind, key, state
+        """
+        rows = await self._run(self._backend.read, time.time() - self._ttl)
+        return [(kind, key, decode_state(data)) for kind, key, data in rows]
+
+    async def _flush_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except sqlite3.Error as err:
+                logger.error(f"State flush failed: {err}")
+
+    async def start(self, interval: float = FLUSH_INTERVAL) -> list[tuple[str, str, Client]]:
+        """
+        Restore games into containers and start flushing.
+        Rows of unknown kind can't be resumed and are deleted
+        :param interval: flush interval in seconds
+        :return: restored clients as namespace, session token, Client
+        """
+        started = time.perf_counter()
+        states = await self.restore()
+        sessions = restore_containers(states)
+        logger.info(
+            f"Restored {len(states)} states in {time.perf_counter() - started:.3f}s"
+        )
+        self._running = True
+        for kind, key, _ in states:
+            if kind not in (CLIENT, GAME):
+                self.mark_deleted(kind, key)
+        self._flusher = asyncio.create_task(self._flush_loop(interval))
+        return sessions
+
+    async def stop(self) -> None:
+        """
+        Stop flushing, write remaining changes and close database.
+        Changes after stop are ignored, so server shutdown doesn't wipe the state
+        """
+        self._running = False
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        await self.flush()
+        await self._run(self._backend.close)
+
+
+def restore_containers(states: Iterable[tuple[str, str, list[Any]]]) -> list[tuple[str, str, Client]]:
+    """
+    Put restored games into container, clients wait for their session to be resumed
+    :param states: list of kind, key, state
+    :return: restored clients as namespace, session token, Client
+    """
+    game_container = GameContainer()
+    sessions = []
+    for kind, key, state in states:
+        if kind == CLIENT:
+            namespace, token = key.split(" ", 1)
+            client = Client()
+            client.load_state(state)
+            sessions.append((namespace, token, client))
+        elif kind == GAME:
+            trivia = Trivia()
+            trivia.load_state(state)
+            game_container.objects[key] = trivia
+    return sessions
+
+
+state_store = StateStore()
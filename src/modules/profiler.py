@@ -0,0 +1,217 @@
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Iterable
+
+import socketio
+
+MAX_DURATION = 60.0
+MIN_INTERVAL = 0.001
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+def _stack(frame: FrameType | None) -> tuple[str, ...]:
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return tuple(reversed(names))
+
+
+class StackSampler:
+    """
+    Statistical profiler, sample stack of the event loop thread from a helper thread.
+    Nothing is installed into the loop, so the loop has no overhead outside a session
+    """
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self._thread_id = thread_id
+        self._interval = max(interval, MIN_INTERVAL)
+        self._stacks: Counter[tuple[str, ...]] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            if (frame := sys._current_frames().get(self._thread_id)) is not None:
+                self._stacks[_stack(frame)] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def samples(self) -> int:
+        return sum(self._stacks.values())
+
+    def collapsed(self) -> str:
+        """
+        Stacks in collapsed format, input for flamegraph.pl or speedscope
+        :return: one "frame;frame;frame count" line per stack
+        """
+        return "\n".join(
+            f"{';'.join(stack)} {count}" for stack, count in self._stacks.most_common()
+        )
+
+    def top(self, limit: int) -> list[dict[str, Any]]:
+        """
+        Functions with the most samples
+        :param limit: count of functions
+        :return: list with self and total samples per function
+        """
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        for stack, count in self._stacks.items():
+            own[stack[-1]] += count
+            for name in set(stack):
+                total[name] += count
+        samples = self.samples or 1
+        return [
+            {
+                "function": name,
+                "self": count,
+                "self_percent": round(count * 100 / samples, 2),
+                "total": total[name],
+                "total_percent": round(total[name] * 100 / samples, 2),
+            }
+            for name, count in own.most_common(limit)
+        ]
+
+
+class EventProfiler:
+    """
+    Deterministic profiler for one socketio event name.
+    Wrap trigger_event of namespace handlers only while session is active.
+    Profiler is enabled across handler awaits, so the result may include
+    other coroutines which ran in between
+    """
+
+    def __init__(self, event: str, namespaces: Iterable[socketio.AsyncNamespace]) -> None:
+        self.event = event
+        self._namespaces = list(namespaces)
+        self._profile = cProfile.Profile()
+        self.calls = 0
+
+    def _wrap(self, namespace: socketio.AsyncNamespace):
+        original = namespace.trigger_event
+
+        async def trigger_event(event, *args):
+            if event != self.event:
+                return await original(event, *args)
+            self.calls += 1
+            self._profile.enable()
+            try:
+                return await original(event, *args)
+            finally:
+                self._profile.disable()
+
+        return trigger_event
+
+    def install(self) -> None:
+        for namespace in self._namespaces:
+            namespace.trigger_event = self._wrap(namespace)  # type: ignore[method-assign]
+
+    def uninstall(self) -> None:
+        for namespace in self._namespaces:
+            vars(namespace).pop("trigger_event", None)
+
+    def report(self, limit: int) -> str:
+        """
+        Cumulative time table
+        :param limit: count of functions
+        :return: pstats text report
+        """
+        if not self.calls:
+            return ""
+        stream = io.StringIO()
+        pstats.Stats(self._profile, stream=stream).sort_stats("cumulative").print_stats(
+            limit
+        )
+        return stream.getvalue()
+
+
+class ProfileSession:
+    """
+    Time bounded profiling session, only one session can run at a time
+    """
+
+    _running = False
+
+    def __init__(
+            self,
+            *,
+            duration: float,
+            interval: float,
+            event: str | None = None,
+            namespaces: Iterable[socketio.AsyncNamespace] = (),
+    ) -> None:
+        if not 0 < duration <= MAX_DURATION:
+            raise ValueError(f"Duration must be in (0, {MAX_DURATION}] seconds")
+        self._duration = duration
+        self._sampler = StackSampler(threading.get_ident(), interval)
+        self._event = EventProfiler(event, namespaces) if event else None
+        self.elapsed = 0.0
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return cls._running
+
+    async def run(self) -> "ProfileSession":
+        """
+        Sample the event loop for duration seconds
+        :raise RuntimeError: another session is running
+        """
+        if ProfileSession._running:
+            raise RuntimeError("Profile session is already running!")
+        ProfileSession._running = True
+        started = time.perf_counter()
+        self._sampler.start()
+        if self._event:
+            self._event.install()
+        try:
+            await asyncio.sleep(self._duration)
+        finally:
+            if self._event:
+                self._event.uninstall()
+            await asyncio.to_thread(self._sampler.stop)
+            self.elapsed = time.perf_counter() - started
+            ProfileSession._running = False
+        return self
+
+    def collapsed(self) -> str:
+        return self._sampler.collapsed()
+
+    def report(self, limit: int) -> dict[str, Any]:
+        """
+        Session result
+        :param limit: count of rows in tables
+        :return: samples, top functions, event profile and collapsed stacks
+        """
+        event = None
+        if self._event:
+            event = {
+                "name": self._event.event,
+                "calls": self._event.calls,
+                "stats": self._event.report(limit),
+            }
+        return {
+            "duration": round(self.elapsed, 3),
+            "samples": self._sampler.samples,
+            "top": self._sampler.top(limit),
+            "event": event,
+            "collapsed": self.collapsed(),
+        }
@@ -0,0 +1,256 @@
+from array import array
+from heapq import nlargest
+from operator import add
+from typing import Any, NamedTuple, Sequence
+
+from src.modules.content import TriviaQuestion
+from src.modules.mod import SingletonsConstructor
+from src.schemas.schema import OPTIONS
+
+POINTS = 1
+NO_ANSWER = 0
+
+
+def _counters() -> array:
+    # slot 0 counts nothing, options are numbered from 1
+    return array("L", bytes(array("L").itemsize * (OPTIONS + 1)))
+
+
+class QuizResult(NamedTuple):
+    round: int
+    answer: int
+    distribution: list[int]
+    answers: bytearray
+    deltas: bytes
+
+    def summary(self, players: int) -> dict[str, Any]:
+        return {
+            "round": self.round,
+            "answer": self.answer,
+            "distribution": self.distribution,
+            "answered": sum(self.distribution),
+            "players": players,
+        }
+
+
+class QuizShow:
+    """
+    Broadcast trivia game, every player of the room answers the same question
+    before the deadline. Player gets a fixed slot on join: answers of a round
+    are one byte per slot plus per-option counters, scores are an array by slot,
+    so recording and scoring an answer allocate nothing per player
+    """
+
+    def __init__(self, topic: str, room: str, questions: Sequence[TriviaQuestion]) -> None:
+        self.topic = topic
+        self.room = room
+        self.round = 0
+        self.question: TriviaQuestion | None = None
+        self._questions = list(questions)
+        self._slots: dict[str, int] = {}
+        self._names: list[str | None] = []
+        self._scores = array("l")
+        self._answers = bytearray()
+        self._counts = _counters()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, sid: str) -> bool:
+        return sid in self._slots
+
+    @property
+    def sids(self) -> list[str]:
+        return list(self._slots)
+
+    @property
+    def remaining(self) -> int:
+        return len(self._questions)
+
+    def add_player(self, sid: str, name: str) -> int:
+        """
+        Give player a slot, players joined during a round may answer it
+        :param sid: player SID
+        :param name: player name
+        :return: player slot
+        """
+        if (slot := self._slots.get(sid)) is not None:
+            return slot
+        slot = self._slots[sid] = len(self._names)
+        self._names.append(name)
+        self._scores.append(0)
+        self._answers.append(NO_ANSWER)
+        return slot
+
+    def remove_player(self, sid: str) -> bool:
+        """
+        Free player slot, slots aren't reused until the show is over
+        :param sid: player SID
+        :return: True if player was in the show
+        """
+        if (slot := self._slots.pop(sid, None)) is None:
+            return False
+        self._names[slot] = None
+        if answer := self._answers[slot]:
+            self._counts[answer] -= 1
+            self._answers[slot] = NO_ANSWER
+        return True
+
+    def replace_sid(self, old_sid: str, sid: str) -> None:
+        """
+        Keep player slot after reconnect
+        :param old_sid: previous player SID
+        :param sid: new player SID
+        """
+        if (slot := self._slots.pop(old_sid, None)) is not None:
+            self._slots[sid] = slot
+
+    def next_question(self) -> TriviaQuestion | None:
+        """
+        Open next round
+        :return: question, None if questions are over
+        """
+        self.question = self._questions.pop() if self._questions else None
+        if self.question is not None:
+            self.round += 1
+        return self.question
+
+    def record(self, sid: str, index: int, round_number: int) -> bool:
+        """
+        Record player answer, only the first answer to the open round counts
+        :param sid: player SID
+        :param index: option number from 1
+        :param round_number: round the answer is for
+        :return: True if answer is accepted
+        """
+        if self.question is None or round_number != self.round or not 0 < index <= OPTIONS:
+            return False
+        if (slot := self._slots.get(sid)) is None or self._answers[slot]:
+            return False
+        self._answers[slot] = index
+        self._counts[index] += 1
+        return True
+
+    def score_round(self) -> QuizResult | None:
+        """
+        Close the round and add points for the correct answer to score vector
+        :return: QuizResult, None if no round is open
+        """
+        if (question := self.question) is None:
+            return None
+        self.question = None
+        table = bytearray(256)
+        table[question.answer] = POINTS
+        # answer bytes map to point bytes, scores are added element-wise in C
+        deltas = self._answers.translate(table)
+        self._scores = array("l", map(add, self._scores, deltas))
+        result = QuizResult(
+            self.round, question.answer, self._counts.tolist()[1:], self._answers, deltas
+        )
+        self._answers = bytearray(len(self._answers))
+        self._counts = _counters()
+        return result
+
+    def deltas(self, result: QuizResult) -> list[tuple[str, int, int]]:
+        """
+        Per-player result of players answered the round
+        :param result: round result
+        :return: list of SID, points and total score
+        """
+        answers, deltas, scores = result.answers, result.deltas, self._scores
+        return [
+            (sid, deltas[slot], scores[slot])
+            for sid, slot in self._slots.items()
+            if answers[slot]
+        ]
+
+    def leaders(self, limit: int) -> list[dict[str, Any]]:
+        """
+        Top players of the show
+        :param limit: count of players
+        """
+        slots = nlargest(limit, self._slots.values(), key=self._scores.__getitem__)
+        return [{"name": self._names[slot], "score": self._scores[slot]} for slot in slots]
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__qualname__}(topic={self.topic}, players={len(self)}, "
+            f"round={self.round}, remaining={self.remaining})"
+        )
+
+
+class QuizHub(metaclass=SingletonsConstructor):
+    """
+    Running quiz shows, one per topic
+    """
+
+    def __init__(self) -> None:
+        self._shows: dict[str, QuizShow] = {}
+        self._players: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._shows)
+
+    def join(
+            self, topic: str, room: str, questions: Sequence[TriviaQuestion], sid: str, name: str
+    ) -> QuizShow:
+        """
+        Add player to the show of topic, open the show if it isn't running
+        :param topic: topic_id
+        :param room: room name for new show
+        :param questions: questions for new show
+        :param sid: player SID
+        :param name: player name
+        :return: QuizShow
+        """
+        if self._players.get(sid) == topic and (show := self._shows.get(topic)):
+            return show
+        self.leave(sid)
+        if (show := self._shows.get(topic)) is None:
+            show = self._shows[topic] = QuizShow(topic, room, questions)
+        show.add_player(sid, name)
+        self._players[sid] = topic
+        return show
+
+    def show_of(self, sid: str) -> QuizShow | None:
+        if (topic := self._players.get(sid)) is None:
+            return None
+        return self._shows.get(topic)
+
+    def leave(self, sid: str) -> bool:
+        """
+        Remove player from his show
+        :param sid: player SID
+        :return: True if player was in a show
+        """
+        if (topic := self._players.pop(sid, None)) is None:
+            return False
+        if (show := self._shows.get(topic)) is not None:
+            show.remove_player(sid)
+        return True
+
+    def replace_sid(self, old_sid: str, sid: str) -> None:
+        if (topic := self._players.pop(old_sid, None)) is None:
+            return
+        self._players[sid] = topic
+        if (show := self._shows.get(topic)) is not None:
+            show.replace_sid(old_sid, sid)
+
+    def close(self, topic: str) -> None:
+        """
+        Remove finished show and its players
+        :param topic: topic_id
+        """
+        if (show := self._shows.pop(topic, None)) is not None:
+            for sid in show.sids:
+                self._players.pop(sid, None)
+
+    def reset(self) -> None:
+        """
+        Drop all shows and players, on shutdown and between tests
+        """
+        self._shows.clear()
+        self._players.clear()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__qualname__}(shows={len(self)}, players={len(self._players)})"
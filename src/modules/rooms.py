@@ -0,0 +1,166 @@
+from typing import Any, Iterable
+
+
+class RoomRegistry:
+    """
+    Chat rooms with their members.
+    Static rooms always exist, dynamic rooms are removed when last member left
+    """
+
+    def __init__(self, rooms: Iterable[str] = ()) -> None:
+        self._static: frozenset[str] = frozenset(rooms)
+        self._rooms: dict[str, set[str]] = {room: set() for room in rooms}
+        self._snapshot: list[dict[str, Any]] | None = None
+        self._changed: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    def __contains__(self, room: str) -> bool:
+        return room in self._rooms
+
+    def create(self, room: str) -> bool:
+        """
+        Create room if not exist
+        :param room: room name
+        :return: True if room was created
+        """
+        if not room:
+            raise AttributeError("The room doesn't pass!")
+        if room in self._rooms:
+            return False
+        self._rooms[room] = set()
+        self._snapshot = None
+        return True
+
+    def join(self, room: str, sid: str) -> None:
+        """
+        Add member to room, room created if not exist
+        :param room: room name
+        :param sid: client SID
+        """
+        self.create(room)
+        if sid not in (members := self._rooms[room]):
+            members.add(sid)
+            self._touch(room)
+
+    def leave(self, room: str | None, sid: str) -> None:
+        """
+        Remove member from room
+        :param room: room name
+        :param sid: client SID
+        """
+        if not room or sid not in (members := self._rooms.get(room, set())):
+            return
+        members.remove(sid)
+        self._touch(room)
+        if not members and room not in self._static:
+            del self._rooms[room]
+
+    def count(self, room: str) -> int:
+        """
+        Count of members in room
+        :param room: room name
+        :return: members count, 0 if room not exist
+        """
+        return len(self._rooms.get(room, ()))
+
+    def _touch(self, room: str) -> None:
+        self._snapshot = None
+        self._changed.add(room)
+
+    def rooms_snapshot(self) -> list[dict[str, Any]]:
+        """
+        Rooms with their occupancy. The list is rebuilt only after membership changes
+        and shared between calls, socketio still encodes it on every emit
+        :return: list of rooms, must not be modified
+        """
+        if self._snapshot is None:
+            self._snapshot = [
+                {"name": room, "members": len(members)}
+                for room, members in self._rooms.items()
+            ]
+        return self._snapshot
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self._changed)
+
+    def pop_changes(self) -> dict[str, int]:
+        """
+        Rooms changed since last call with their current occupancy
+        :return: room name to members count
+        """
+        changes = {room: self.count(room) for room in self._changed}
+        self._changed.clear()
+        return changes
+
+    def __repr__(self) -> str:
+        return f"{type(self).__qualname__}(rooms={self.rooms_snapshot()})"
+
+
+class TypingTracker:
+    """
+    Who is typing per room. Repeated pings only extend user expiry,
+    room marked as changed only when the set of typing users changed
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self._timeout = timeout
+        self._typing: dict[str, dict[str, tuple[str, float]]] = {}
+        self._changed: set[str] = set()
+
+    def __len__(self) -> int:
+        return sum(map(len, self._typing.values()))
+
+    def ping(self, room: str, sid: str, name: str | None, now: float) -> None:
+        """
+        Mark user as typing until now + timeout
+        :param room: room name
+        :param sid: client SID
+        :param name: client name
+        :param now: monotonic time
+        """
+        users = self._typing.setdefault(room, {})
+        if sid not in users:
+            self._changed.add(room)
+        users[sid] = (name or sid, now + self._timeout)
+
+    def stop(self, room: str | None, sid: str) -> None:
+        """
+        Mark user as not typing
+        :param room: room name
+        :param sid: client SID
+        """
+        if room and (users := self._typing.get(room)) and users.pop(sid, None):
+            self._changed.add(room)
+            if not users:
+                del self._typing[room]
+
+    def expire(self, now: float) -> None:
+        """
+        Remove users whose typing expired
+        :param now: monotonic time
+        """
+        for room, users in list(self._typing.items()):
+            for sid in [sid for sid, (_, until) in users.items() if until <= now]:
+                self.stop(room, sid)
+
+    @property
+    def is_active(self) -> bool:
+        return bool(self._typing or self._changed)
+
+    def pop_changes(self) -> dict[str, list[str]]:
+        """
+        Rooms changed since last call with names of typing users
+        :return: room name to typing user names
+        """
+        changes = {
+            room: sorted(name for name, _ in self._typing.get(room, {}).values())
+            for room in self._changed
+        }
+        self._changed.clear()
+        return changes
+
+    def __repr__(self) -> str:
+        return f"{type(self).__qualname__}(typing={self._typing})"
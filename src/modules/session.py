@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import secrets
+import time
+from collections import defaultdict, deque
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, Collection, Iterable
+
+from src.modules.tracing import detached_task
+
+logger = logging.getLogger("session")
+
+GRACE_PERIOD = 30.0
+BUFFER_SIZE = 100
+SWEEP_INTERVAL = 1.0
+
+
+class ParkedSession:
+    """
+    State of disconnected client waiting for reconnect
+    """
+
+    __slots__ = ("token", "sid", "client", "rooms", "expires", "events")
+
+    def __init__(
+            self, token: str, sid: str, client: Any, rooms: list[str], expires: float
+    ) -> None:
+        self.token = token
+        self.sid = sid
+        self.client = client
+        self.rooms = rooms
+        self.expires = expires
+        self.events: deque[tuple[str, Any]] = deque(maxlen=BUFFER_SIZE)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__qualname__}(sid={self.sid}, rooms={self.rooms}, "
+            f"events={len(self.events)})"
+        )
+
+
+class SessionManager:
+    """
+    Resumable sessions of one namespace.
+    Disconnected client is parked for grace period with a bounded buffer of
+    events sent to its rooms, expired sessions are released by one shared sweeper.
+    Resumed session is held by new SID until missed events are replayed,
+    events sent meanwhile are queued after them
+    """
+
+    def __init__(
+            self,
+            release: Callable[[ParkedSession], Awaitable[None]],
+            grace: float = GRACE_PERIOD,
+    ) -> None:
+        self._release = release
+        self._grace = grace
+        self._tokens: dict[str, str] = {}
+        self._parked: dict[str, ParkedSession] = {}
+        self._parked_sids: set[str] = set()
+        self._held: dict[str, ParkedSession] = {}
+        self._rooms: defaultdict[str, set[str]] = defaultdict(set)
+        self._sweeper: asyncio.Task | None = None
+
+    @property
+    def buffering(self) -> bool:
+        return bool(self._parked or self._held)
+
+    @property
+    def parked_sids(self) -> Collection[str]:
+        """
+        SIDs of disconnected clients waiting for reconnect, live view
+        """
+        return self._parked_sids
+
+    def __len__(self) -> int:
+        return len(self._parked)
+
+    def issue(self, sid: str) -> str:
+        """
+        Issue new session token for connected SID
+        :param sid: client SID
+        :return: session token
+        """
+        token = self._tokens[sid] = secrets.token_urlsafe(16)
+        return token
+
+    def park(self, sid: str, client: Any, rooms: Iterable[str]) -> bool:
+        """
+        Park client of disconnected SID until grace period expire
+        :param sid: client SID
+        :param client: client state
+        :param rooms: rooms client was in, SID room included
+        :return: False if SID has no session
+        """
+        if (token := self._tokens.pop(sid, None)) is None:
+            return False
+        session = ParkedSession(token, sid, client, list(rooms), time.monotonic() + self._grace)
+        if (held := self._held.pop(sid, None)) is not None:
+            # disconnected during replay, rooms and events not delivered yet are kept
+            session.rooms.extend(room for room in held.rooms if room not in (held.sid, sid))
+            session.events.extend(held.events)
+        self._park(session)
+        return True
+
+    def restore(self, token: str, client: Any, rooms: Iterable[str]) -> None:
+        """
+        Park client restored after restart, token is used as its SID
+        :param token: session token of restored client
+        :param client: client state
+        :param rooms: rooms client was in
+        """
+        self._park(ParkedSession(token, token, client, list(rooms), time.monotonic() + self._grace))
+
+    def _park(self, session: ParkedSession) -> None:
+        self._parked[session.token] = session
+        self._parked_sids.add(session.sid)
+        for room in session.rooms:
+            self._rooms[room].add(session.token)
+        if self._sweeper is None:
+            self._sweeper = detached_task(self._sweep())
+
+    def _unpark(self, token: str) -> ParkedSession | None:
+        if (session := self._parked.pop(token, None)) is not None:
+            self._parked_sids.discard(session.sid)
+            for room in session.rooms:
+                tokens = self._rooms[room]
+                tokens.discard(token)
+                if not tokens:
+                    del self._rooms[room]
+        return session
+
+    def resume(self, token: str | None, sid: str) -> ParkedSession | None:
+        """
+        Take parked session by token and hold it by new SID until replay ends
+        :param token: session token
+        :param sid: new client SID
+        :return: parked session or None if unknown or expired
+        """
+        if not token or (session := self._unpark(token)) is None:
+            return None
+        self._held[sid] = session
+        return session
+
+    def is_held(self, sid: Any) -> bool:
+        """
+        Check if events to SID have to wait for the replay of missed ones
+        :param sid: emit target
+        """
+        return isinstance(sid, str) and sid in self._held
+
+    def next_event(self, sid: str) -> tuple[str, Any] | None:
+        """
+        Take the oldest event to replay for held SID
+        :param sid: new client SID
+        :return: event name and data or None if nothing is left
+        """
+        if (session := self._held.get(sid)) is None or not session.events:
+            return None
+        return session.events.popleft()
+
+    def release_hold(self, sid: str) -> ParkedSession | None:
+        """
+        End replay of held SID, following events are sent live
+        :param sid: new client SID
+        :return: resumed session or None if SID isn't held anymore
+        """
+        return self._held.pop(sid, None)
+
+    def record(self, room: str | None, event: str, data: Any) -> None:
+        """
+        Buffer event for parked sessions of the room
+        :param room: room name or SID, None for broadcast
+        :param event: event name
+        :param data: event data
+        """
+        tokens = self._parked.keys() if room is None else self._rooms.get(room, ())
+        for token in tokens:
+            self._parked[token].events.append((event, data))
+        for sid, session in self._held.items():
+            if room is None or room == sid or room in session.rooms:
+                session.events.append((event, data))
+
+    async def _sweep(self) -> None:
+        try:
+            while self._parked:
+                await asyncio.sleep(SWEEP_INTERVAL)
+                now = time.monotonic()
+                for token in [t for t, s in self._parked.items() if s.expires <= now]:
+                    if (session := self._unpark(token)) is not None:
+                        await self._release_safe(session)
+        finally:
+            self._sweeper = None
+
+    async def _release_safe(self, session: ParkedSession) -> None:
+        try:
+            await self._release(session)
+        except Exception as err:
+            logger.error(f"Release of session {session} failed: {err}")
+
+    async def stop(self) -> None:
+        """
+        Stop sweeper and release all parked sessions
+        """
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._sweeper
+        for token in list(self._parked):
+            if (session := self._unpark(token)) is not None:
+                await self._release_safe(session)
+        self._held.clear()
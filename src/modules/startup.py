@@ -0,0 +1,51 @@
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+logger = logging.getLogger("startup")
+
+
+class StartupReport:
+    """
+    Per-phase startup timing and readiness flag,
+    the node is warm when all preloading is done
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, dict[str, float | int]] = {}
+        self.warm = False
+        self._warm_at: float | None = None
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time startup phase, count modules imported during it
+        :param name: phase name
+        """
+        started, modules = time.perf_counter(), len(sys.modules)
+        try:
+            yield
+        finally:
+            self.phases[name] = {
+                "seconds": round(time.perf_counter() - started, 4),
+                "modules": len(sys.modules) - modules,
+            }
+            logger.info(f"Startup phase {name}: {self.phases[name]['seconds']:.3f}s")
+
+    def set_warm(self, warm: bool) -> None:
+        self.warm = warm
+        if warm:
+            self._warm_at = time.perf_counter()
+            logger.info(f"Warm in {self._warm_at - self._started:.3f}s")
+
+    def stats(self) -> dict[str, Any]:
+        warm_in = None
+        if self._warm_at is not None:
+            warm_in = round(self._warm_at - self._started, 4)
+        return {"warm": self.warm, "warm_in": warm_in, "phases": self.phases}
+
+
+startup = StartupReport()
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from contextlib import AbstractContextManager, nullcontext
+from contextvars import ContextVar, copy_context
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Coroutine
+
+import socketio
+
+from src.modules.jsonl import FLUSH_INTERVAL, JsonLinesWriter
+
+logger = logging.getLogger("tracing")
+
+TRACE_FILE_ENV = "TRACE_FILE"
+TRACE_SAMPLE_ENV = "TRACE_SAMPLE"
+SAMPLE_RATE = 0.1
+SERVICE_NAME = "aiohttp-socketio"
+# OTLP span kinds and status codes
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+STATUS_ERROR = 2
+
+CallNext = Callable[[], Awaitable[Any]]
+
+_current: ContextVar["Span | None"] = ContextVar("span", default=None)
+_NOOP = nullcontext()
+
+
+def get_trace_file() -> str | None:
+    return os.environ.get(TRACE_FILE_ENV) or None
+
+
+def get_sample_rate() -> float:
+    try:
+        return float(os.environ.get(TRACE_SAMPLE_ENV, SAMPLE_RATE))
+    except ValueError:
+        logger.error(f"{TRACE_SAMPLE_ENV} must be a number, use {SAMPLE_RATE}")
+        return SAMPLE_RATE
+
+
+def _attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Span:
+    """
+    Timed operation of one traced event, context manager
+    which makes the span current for nested spans
+    """
+
+    __slots__ = (
+        "tracer", "trace_id", "span_id", "parent_id", "name", "kind",
+        "attributes", "start", "end", "error", "_token",
+    )
+
+    def __init__(
+            self,
+            tracer: "Tracer",
+            name: str,
+            parent: "Span | None" = None,
+            kind: int = KIND_INTERNAL,
+            **attributes: Any,
+    ) -> None:
+        self.tracer = tracer
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start = 0
+        self.end = 0
+        self.error: str | None = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        self.start = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end = time.time_ns()
+        _current.reset(self._token)
+        if exc is not None:
+            self.error = repr(exc)
+        self.tracer.export(self)
+
+    def to_otlp(self) -> dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [_attribute(key, value) for key, value in self.attributes.items()],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error:
+            span["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return span
+
+
+def span(name: str, **attributes: Any) -> AbstractContextManager:
+    """
+    Child span of the current span, no-op when the event isn't sampled
+    :param name: operation name
+    :param attributes: span attributes
+    """
+    if (parent := _current.get()) is None:
+        return _NOOP
+    return Span(parent.tracer, name, parent, **attributes)
+
+
+def bind(handler: Callable[..., Awaitable[Any]], name: str) -> Callable[..., Awaitable[Any]]:
+    """
+    Carry current trace into handler which runs in another task, e.g. game actor
+    :param handler: coroutine function
+    :param name: span name of the handler run
+    :return: handler itself when the event isn't sampled
+    """
+    if (parent := _current.get()) is None:
+        return handler
+
+    async def traced(*args: Any) -> Any:
+        token = _current.set(parent)
+        try:
+            with span(name):
+                return await handler(*args)
+        finally:
+            _current.reset(token)
+
+    return traced
+
+
+def detached_task(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """
+    Start background task outside of the current trace. Tasks copy the context
+    they are created in, so a long-lived task started by a sampled event
+    would attach its later spans to the already finished event
+    :param coro: coroutine of the task
+    :return: Task
+    """
+    context = copy_context()
+    context.run(_current.set, None)
+    return asyncio.create_task(coro, context=context)
+
+
+def _encode_request(spans: list[Span]) -> str:
+    request = {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [
+                    {"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}
+                ],
+            }
+        ]
+    }
+    return json.dumps(request, ensure_ascii=False, separators=(",", ":"))
+
+
+class FileSpanExporter(JsonLinesWriter):
+    """
+    Write finished spans to a file as OTLP/JSON lines,
+    one ExportTraceServiceRequest per flush
+    """
+
+    def __init__(self, path: str | Path, interval: float = FLUSH_INTERVAL) -> None:
+        super().__init__(path, interval)
+        self._spans: list[Span] = []
+        self.exported = 0
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    async def flush(self) -> None:
+        if self._spans:
+            spans, self._spans = self._spans, []
+            # spans are encoded in worker thread, the loop only collects them
+            self.append(await asyncio.to_thread(_encode_request, spans))
+            self.exported += len(spans)
+        await super().flush()
+
+
+class Tracer:
+    """
+    Head-based sampling: the decision is made once per incoming event
+    in the namespace middleware, spans of not sampled events are no-op
+    """
+
+    def __init__(self, exporter: FileSpanExporter, sample_rate: float = SAMPLE_RATE) -> None:
+        self.exporter = exporter
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+
+    def export(self, span: Span) -> None:
+        self.exporter.export(span)
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    async def middleware(
+            self, namespace: socketio.AsyncNamespace, event: str, args: tuple, call_next: CallNext
+    ) -> Any:
+        """
+        Namespace middleware, start root span of sampled event
+        """
+        if not self.sampled():
+            return await call_next()
+        root = Span(
+            self,
+            f"{namespace.namespace}:{event}",
+            kind=KIND_SERVER,
+            namespace=namespace.namespace,
+            event=event,
+        )
+        with root:
+            return await call_next()
+
+    def start(self) -> None:
+        self.exporter.start()
+        logger.info(f"Export {self.sample_rate:.0%} of events to {self.exporter.path}")
+
+    async def stop(self) -> None:
+        await self.exporter.stop()
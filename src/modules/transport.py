@@ -0,0 +1,44 @@
+import logging
+import os
+
+try:
+    import msgpack
+except ImportError:  # optional dependency, JSON packets are used without it
+    msgpack = None
+
+logger = logging.getLogger("transport")
+
+SERIALIZER_ENV = "SOCKETIO_SERIALIZER"
+JSON = "default"
+MSGPACK = "msgpack"
+# browser codec, loaded by pages only when the deployment uses MessagePack packets
+MSGPACK_SCRIPT = "https://cdn.jsdelivr.net/npm/@msgpack/msgpack@2.8.0/dist.es5+umd/msgpack.min.js"
+
+
+def get_serializer() -> str:
+    """
+    Socket.IO packet serializer of the deployment, JSON text packets by default,
+    "msgpack" for binary MessagePack packets when msgpack package is installed
+    :return: serializer name for socketio.AsyncServer
+    """
+    serializer = os.environ.get(SERIALIZER_ENV) or JSON
+    if serializer not in (JSON, MSGPACK):
+        logger.error(f"{SERIALIZER_ENV} must be {JSON!r} or {MSGPACK!r}, use JSON packets")
+        return JSON
+    if serializer == MSGPACK and msgpack is None:
+        logger.error("msgpack package isn't installed, use JSON packets")
+        return JSON
+    return serializer
+
+
+def client_config(serializer: str) -> str:
+    """
+    Script for browser pages, tell socketio.js which packet parser to use.
+    With MessagePack packets the codec script is written into the page
+    while it is parsed, so it runs before socketio.js
+    :param serializer: serializer of the server
+    """
+    config = f'window.SOCKETIO_SERIALIZER = "{serializer}";\n'
+    if serializer == MSGPACK:
+        config += f"document.write('<script src=\"{MSGPACK_SCRIPT}\"><\\/script>');\n"
+    return config
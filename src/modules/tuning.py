@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import os
+from typing import Any, NamedTuple
+
+logger = logging.getLogger("tuning")
+
+PROFILE_ENV = "TUNING_PROFILE"
+PORT_ENV = "PORT"
+PORT = 8080
+DEFAULT_PROFILE = "default"
+
+
+class Profile(NamedTuple):
+    """
+    Runtime knobs fixed at startup, defaults are aiohttp and Engine.IO defaults
+    """
+
+    name: str
+    uvloop: bool = False
+    access_log: bool = True
+    ping_interval: float = 25.0
+    ping_timeout: float = 20.0
+    transports: tuple[str, ...] = ("polling", "websocket")
+    # long-polling responses bigger than threshold are compressed
+    http_compression: bool = True
+    compression_threshold: int = 1024
+
+
+PROFILES: dict[str, Profile] = {
+    profile.name: profile
+    for profile in (
+        Profile(DEFAULT_PROFILE),
+        Profile("quiet", access_log=False),
+        Profile("uvloop", uvloop=True, access_log=False),
+        Profile("websocket", access_log=False, transports=("websocket",)),
+        Profile("idle", access_log=False, ping_interval=60.0, ping_timeout=30.0),
+        Profile("no-compression", access_log=False, http_compression=False),
+        Profile(
+            "throughput",
+            uvloop=True,
+            access_log=False,
+            ping_interval=60.0,
+            ping_timeout=30.0,
+            transports=("websocket",),
+            compression_threshold=8192,
+        ),
+    )
+}
+
+
+def get_profile() -> Profile:
+    """
+    Tuning profile selected by TUNING_PROFILE environment variable
+    :return: Profile, default one if the name is unknown
+    """
+    name = os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE
+    if (profile := PROFILES.get(name)) is None:
+        logger.error(f"Unknown {PROFILE_ENV} {name!r}, use {DEFAULT_PROFILE!r} of {sorted(PROFILES)}")
+        return PROFILES[DEFAULT_PROFILE]
+    return profile
+
+
+def get_port() -> int:
+    try:
+        return int(os.environ.get(PORT_ENV, PORT))
+    except ValueError:
+        logger.error(f"{PORT_ENV} must be a number, use {PORT}")
+        return PORT
+
+
+def install_event_loop(profile: Profile) -> str:
+    """
+    Set event loop policy before the loop is created, uvloop is optional
+    :param profile: tuning profile
+    :return: name of event loop implementation
+    """
+    if not profile.uvloop:
+        return "asyncio"
+    try:
+        import uvloop
+    except ImportError:
+        logger.error("uvloop package isn't installed, use asyncio event loop")
+        return "asyncio"
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return "uvloop"
+
+
+def server_options(profile: Profile) -> dict[str, Any]:
+    """
+    Engine.IO options of socketio.AsyncServer
+    :param profile: tuning profile
+    """
+    return {
+        "ping_interval": profile.ping_interval,
+        "ping_timeout": profile.ping_timeout,
+        "transports": list(profile.transports),
+        "http_compression": profile.http_compression,
+        "compression_threshold": profile.compression_threshold,
+    }
@@ -1,9 +1,81 @@
+import asyncio
+
 from aiohttp import web
 
+from src import admin
+from src.modules.assets import TEMPLATES_FOLDER, Asset, asset_cache
+from src.modules.moderation import moderator
+from src.modules.monitor import admission, loop_monitor
+from src.modules.startup import startup
+from src.modules.transport import client_config
+
+
+def asset_response(request: web.Request, asset: Asset) -> web.Response:
+    """
+    Response from cached asset, 304 when browser copy is still valid
+    :param request: request with optional If-None-Match or If-Modified-Since
+    :param asset: cached file
+    """
+    if request.if_none_match is not None:
+        not_modified = any(tag.value in (asset.etag, "*") for tag in request.if_none_match)
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and int(asset.last_modified) <= since.timestamp()
+    response = web.Response(
+        status=304 if not_modified else 200,
+        body=None if not_modified else asset.body,
+        content_type=asset.content_type,
+    )
+    response.etag = asset.etag
+    response.last_modified = asset.last_modified
+    # browsers revalidate on every load and get 304 until the file changes
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
 
 async def index(request):
     path = request.path
-    return web.FileResponse(f"templates/{path}/index.html")
+    if (asset := asset_cache.template(path)) is not None:
+        return asset_response(request, asset)
+    return web.FileResponse(TEMPLATES_FOLDER / path.strip("/") / "index.html")
+
+
+async def static(request):
+    """
+    Static files from memory, preloaded on startup and reloaded on change
+    """
+    if (asset := asset_cache.static(request.match_info["path"])) is None:
+        raise web.HTTPNotFound()
+    return asset_response(request, asset)
+
+
+async def transport(request):
+    """
+    Packet serializer for socketio.js, loaded by pages before it
+    """
+    return web.Response(
+        text=client_config(request.app["serializer"]), content_type="application/javascript"
+    )
+
+
+async def ready(request):
+    """
+    Readiness for load balancer, 503 until the node is warm
+    and when the event loop is overloaded
+    """
+    is_ready = startup.warm and admission.ready
+    body = {
+        **admission.stats(),
+        "ready": is_ready,
+        "loop": loop_monitor.stats(),
+        "startup": startup.stats(),
+        "moderation": moderator.report(),
+        "tuning": {
+            "profile": request.app["profile"].name,
+            "loop": type(asyncio.get_running_loop()).__module__.split(".")[0],
+        },
+    }
+    return web.json_response(body, status=200 if is_ready else 503)
 
 
 def setup_routes(app: web.Application):
@@ -11,4 +83,9 @@ def setup_routes(app: web.Application):
     app.router.add_route("GET", "/riddle", index)
     app.router.add_route("GET", "/chat", index)
     app.router.add_route("GET", "/trivia", index)
-    app.router.add_static(prefix="/src/static", path="static")
+    app.router.add_route("GET", "/ready", ready)
+    app.router.add_route("GET", "/transport.js", transport)
+    app.router.add_route("GET", "/admin/profile", admin.profile)
+    app.router.add_route("GET", "/admin/memory", admin.memory)
+    app.router.add_route("GET", "/admin/memory/trace", admin.memory_trace)
+    app.router.add_route("GET", "/src/static/{path:.+}", static)
@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import (
     UUID4,
@@ -6,8 +6,12 @@ from pydantic import (
     Field,
     PlainSerializer,
     PlainValidator,
+    model_validator,
 )
 
+# answer options of a trivia question, content rows and quiz answers share it
+OPTIONS = 4
+
 
 class ChatOnJoin(BaseModel):
     """
@@ -18,6 +22,24 @@ class ChatOnJoin(BaseModel):
     room: str = Field(str)
 
 
+class ChatOnCreateRoom(BaseModel):
+    """
+    Validation "create_room" event chat messages
+    """
+
+    room: str = Field(min_length=1, max_length=30)
+
+
+class ChatOnSearch(BaseModel):
+    """
+    Validation "search" event chat messages
+    """
+
+    query: str = Field(min_length=1, max_length=100)
+    before: int | None = Field(default=None, ge=0)
+    limit: int = Field(default=20, ge=1, le=50)
+
+
 class RiddleOnAnswerOut(BaseModel):
     """
     Serializer for "answer" event riddle messages
@@ -49,6 +71,17 @@ class TriviaOnAnswer(BaseModel):
 
     index: int = Field(ge=0)
     game_uid: UUID4
+    # question_count of the game event the answer is sent for
+    question_count: int = Field(ge=1)
+
+
+class QuizOnAnswer(BaseModel):
+    """
+    Quiz show client answer body In
+    """
+
+    index: int = Field(ge=1, le=OPTIONS)
+    round: int = Field(ge=1)
 
 
 class TriviaCurrentQuestion(BaseModel):
@@ -66,3 +99,65 @@ class TriviaOnAnswerOut(BaseModel):
     players: list[dict]
     answer: int
     current_question: TriviaCurrentQuestion
+
+
+class TriviaTopicRow(BaseModel):
+    """
+    Trivia topic row of content pack
+    """
+
+    pk: Annotated[str, Field(min_length=1)]
+    name: Annotated[str, Field(min_length=1)]
+
+
+class TriviaQuestionRow(BaseModel):
+    """
+    Trivia question row of content pack
+    """
+
+    topic: Annotated[str, Field(min_length=1)]
+    text: Annotated[str, Field(min_length=1)]
+    options: Annotated[list[str], Field(min_length=OPTIONS, max_length=OPTIONS)]
+    answer: Annotated[int, Field(ge=1, le=OPTIONS)]
+
+
+class RiddleRow(BaseModel):
+    """
+    Riddle row of content pack
+    """
+
+    question: Annotated[str, Field(min_length=1)]
+    answer: Annotated[str, Field(min_length=1)]
+    # accepted alternative answers separated by "|", column is optional
+    synonyms: Annotated[
+        tuple[str, ...],
+        PlainValidator(
+            lambda i: tuple(item.strip() for item in (i or "").split("|") if item.strip())
+        ),
+    ] = ()
+
+
+class ModerationTermRow(BaseModel):
+    """
+    Moderation term row, "word" terms match whole words only, "part" anywhere in text
+    """
+
+    term: Annotated[str, Field(min_length=1)]
+    category: Annotated[str, Field(min_length=1)]
+    match: Literal["word", "part"] = "word"
+
+
+class ModerationConfig(BaseModel):
+    """
+    Moderation policies: category to action per policy, room to policy
+    """
+
+    default_policy: str
+    policies: dict[str, dict[str, Literal["flag", "mask", "drop"]]]
+    rooms: dict[str, str] = {}
+
+    @model_validator(mode="after")
+    def check_policies(self) -> "ModerationConfig":
+        if unknown := {self.default_policy, *self.rooms.values()} - set(self.policies):
+            raise ValueError(f"Unknown policies: {sorted(unknown)}")
+        return self
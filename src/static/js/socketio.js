@@ -4,6 +4,29 @@
  * for outgoing requests, streamlining the development of real-time, interactive applications.
  */
 
+/**
+ * Socket.IO parser with MessagePack packets, the same format as python-socketio "msgpack" serializer
+ */
+function msgpackParser(MessagePack) {
+
+  class Encoder {
+    encode(packet) { return [MessagePack.encode(packet)] }
+  }
+
+  class Decoder {
+    constructor() { this.listeners = [] }
+    on(event, fn) { if (event === 'decoded') { this.listeners.push(fn) } }
+    off(event, fn) { this.listeners = fn ? this.listeners.filter((item) => item !== fn) : [] }
+    add(chunk) {
+      const packet = MessagePack.decode(new Uint8Array(chunk))
+      this.listeners.forEach((fn) => fn(packet))
+    }
+    destroy() { this.listeners = [] }
+  }
+
+  return {Encoder, Decoder}
+}
+
 function socketio({store, container, pages, url}) {
 
   if (!window.Handlebars) { throw new Error('Handlebars should be loaded to document'); }
@@ -14,7 +37,31 @@ function socketio({store, container, pages, url}) {
   this.pages = pages // all app pages
   this.handlers = {} // all handlers
   this.url = url
-  this.socket = io.connect(this.url, {transports: ['websocket', 'polling']});
+  // session token let the server reattach state after a short disconnect
+  this.sessionKey = `session:${this.url}`
+  // player id outlive sessions and tabs, trivia rating is kept by it
+  if (!localStorage.getItem('player')) {
+    // randomUUID exists only in secure context
+    const id = window.crypto?.randomUUID?.() ?? `${Date.now().toString(36)}${Math.random().toString(36).slice(2)}`
+    localStorage.setItem('player', id)
+  }
+  const options = {
+    transports: ['websocket', 'polling'],
+    auth: (cb) => cb({
+      session: sessionStorage.getItem(this.sessionKey),
+      player: localStorage.getItem('player'),
+    }),
+  }
+  // packet serializer of the server, set by /transport.js
+  if (window.SOCKETIO_SERIALIZER === 'msgpack') {
+    if (!window.MessagePack) { throw new Error('MessagePack should be loaded to document'); }
+    options.parser = msgpackParser(window.MessagePack)
+  }
+  this.socket = io.connect(this.url, options);
+  this.socket.on('session', (data) => {
+    sessionStorage.setItem(this.sessionKey, data.token)
+    console.log(`Session ${data.resumed ? 'resumed' : 'started'}`)
+  });
 
   this.render = function(template, container=null) {
 
@@ -1,4 +1,5 @@
 import asyncio
+import os
 
 import pytest
 import pytest_asyncio
@@ -7,6 +8,7 @@ from aiohttp import web
 from pytest_asyncio import is_async_test
 
 from src.app import init_app
+from src.modules.persistence import STATE_DB_ENV
 
 
 # https://pytest-asyncio.readthedocs.io/en/latest/how-to-guides/run_session_tests_in_same_loop.html
@@ -18,7 +20,9 @@ def pytest_collection_modifyitems(items):
 
 
 @pytest_asyncio.fixture(scope="session")
-async def server():
+async def server(tmp_path_factory):
+    # keep test clients out of the working state database
+    os.environ[STATE_DB_ENV] = str(tmp_path_factory.mktemp("state") / "state.db")
     app = await init_app()
     runner = web.AppRunner(app, shutdown_timeout=3)
     await runner.setup()
@@ -67,13 +71,11 @@ def init_chat(sio):
     async def on_connect():
         EXPECTED_CHAT_DATA.append("connected")
 
-    @sio.on("message", namespace="/chat")
-    async def on_message(data):
+    async def on_data(data):
         EXPECTED_CHAT_DATA.append(data)
 
-    @sio.on("rooms", namespace="/chat")
-    async def on_rooms(data):
-        EXPECTED_CHAT_DATA.append(data)
+    for event in ("message", "rooms", "presence", "typing", "search_results"):
+        sio.on(event, on_data, namespace="/chat")
 
 
 def init_riddle(sio):
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from src.apps import trivia as trivia_app
+from src.helper import generate_game_uuid
+from src.modules.actor import ActorClosedError, ActorContainer, GameActor
+from src.modules.content import content_loader
+
+
+async def test_actor_serialize_handlers():
+    actor = GameActor()
+    events = []
+
+    async def handler(name):
+        events.append(f"{name}-start")
+        await asyncio.sleep(0.01)
+        events.append(f"{name}-end")
+        return name
+
+    result = await asyncio.gather(*(actor.send(handler, i) for i in range(3)))
+    assert result == [0, 1, 2]
+    assert events == ["0-start", "0-end", "1-start", "1-end", "2-start", "2-end"]
+    assert actor.is_idle
+
+
+async def test_actor_propagate_error():
+    actor = GameActor()
+
+    async def handler():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await actor.send(handler)
+    assert actor.is_idle
+
+
+async def test_actor_container_reclaim():
+    container = ActorContainer()
+    assert container.get_item(None) is None
+    actor = container.open("uid")
+    assert container.get_item("uid") is actor
+    container.del_item("uid")
+    assert actor.closed
+    assert "uid" not in container.objects
+    # finished game doesn't get a new actor
+    assert container.get_item("uid") is None
+    with pytest.raises(ActorClosedError):
+        await actor.send(asyncio.sleep, 0)
+
+
+async def test_actor_cancel_queued_on_shutdown():
+    actor = GameActor()
+    started = asyncio.Event()
+
+    async def handler():
+        started.set()
+        await asyncio.sleep(10)
+
+    running = asyncio.create_task(actor.send(handler))
+    queued = asyncio.create_task(actor.send(handler))
+    await started.wait()
+    actor._task.cancel()
+    results = await asyncio.wait_for(
+        asyncio.gather(running, queued, return_exceptions=True), timeout=1
+    )
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert actor.is_idle
+    assert len(actor) == 0
+
+
+async def test_actor_close_reject_queued():
+    actor = GameActor()
+
+    async def handler():
+        actor.close()
+        return "done"
+
+    running = asyncio.create_task(actor.send(handler))
+    queued = asyncio.create_task(actor.send(asyncio.sleep, 0, "late"))
+    results = await asyncio.gather(running, queued, return_exceptions=True)
+    assert results[0] == "done"
+    assert isinstance(results[1], ActorClosedError)
+    assert len(actor) == 0
+
+
+async def test_trivia_answer_after_game_over():
+    namespace = trivia_app.TriviaApp("/trivia-over")
+    events = []
+
+    async def emit(event, data=None, to=None, room=None, **kwargs):
+        events.append(event)
+
+    namespace.emit = emit
+    pack = content_loader.current
+    topic = next(t["pk"] for t in pack.topics if pack.questions_for(t["pk"]))
+    uid = generate_game_uuid()
+    trivia = trivia_app.game_container.get_item(uid)
+    trivia.load_questions(pack)
+    trivia.topic = topic
+    # the last question of the game is asked
+    while trivia.remaining_question_on_topic(topic):
+        trivia.get_question(topic)
+    assert trivia.is_current(1)
+    assert not trivia.is_current(2)
+    for sid in ("over-a", "over-b"):
+        trivia.add_user(sid)
+        client = trivia_app.client_container.get_item(sid)
+        client.create_game("trivia")
+        client.game_uid = uid
+    trivia_app.actor_container.open(uid)
+
+    answer = {"index": int(trivia.answer), "game_uid": uid, "question_count": 1}
+    await asyncio.gather(
+        namespace.on_answer("over-a", answer),
+        namespace.on_answer("over-b", answer),
+        # repeat answer queued behind the one which ends the game
+        namespace.on_answer("over-a", answer),
+    )
+    scores = [trivia_app.client_container.get_item(sid).game.score for sid in trivia.users]
+    assert events == ["over", "error"]
+    assert scores == [1, 1]
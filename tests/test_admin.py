@@ -0,0 +1,54 @@
+import asyncio
+
+import socketio
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src import admin
+
+
+class EchoApp(socketio.AsyncNamespace):
+    async def on_echo(self, sid, data):
+        return sum(i * i for i in range(10_000))
+
+
+def make_app(token: str | None) -> web.Application:
+    app = web.Application()
+    app["admin_token"] = token
+    app["sio"] = socketio.AsyncServer(async_mode="aiohttp")
+    app["sio"].register_namespace(EchoApp("/echo"))
+    app.router.add_route("GET", "/admin/profile", admin.profile)
+    return app
+
+
+async def test_profile_forbidden_without_token():
+    async with TestClient(TestServer(make_app(None))) as client:
+        response = await client.get("/admin/profile", headers={"Authorization": "Bearer "})
+        assert response.status == 403
+    async with TestClient(TestServer(make_app("secret"))) as client:
+        response = await client.get("/admin/profile")
+        assert response.status == 403
+
+
+async def test_profile_report():
+    app = make_app("secret")
+    namespace = app["sio"].namespace_handlers["/echo"]
+    async with TestClient(TestServer(app)) as client:
+        request = asyncio.create_task(
+            client.get(
+                "/admin/profile",
+                params={"seconds": "0.3", "interval": "0.002", "event": "echo"},
+                headers={"Authorization": "Bearer secret"},
+            )
+        )
+        await asyncio.sleep(0.1)
+        for _ in range(3):
+            await namespace.trigger_event("echo", "sid", {})
+        response = await request
+        assert response.status == 200
+        report = await response.json()
+    assert report["samples"] > 0
+    assert report["top"]
+    assert report["event"]["calls"] == 3
+    assert "on_echo" in report["event"]["stats"]
+    assert "trigger_event" not in vars(namespace)
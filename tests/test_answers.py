@@ -0,0 +1,54 @@
+import pytest
+
+from src.modules.answers import AnswerMatcher, normalize_answer, within_distance
+from src.modules.content import ContentPack, RiddleItem
+from src.modules.mod import Riddle
+
+
+def test_normalize_answer():
+    assert normalize_answer("  Ёлка! ") == "елка"
+    assert normalize_answer("Электрическая, лампочка.") == "электрическаялампочка"
+    assert normalize_answer("?!") == ""
+
+
+@pytest.mark.parametrize(
+    "first, second, limit, expected",
+    [
+        ("лампочка", "лампочка", 0, True),
+        ("лампочка", "лампочкa", 0, False),
+        ("лампочка", "лампчка", 1, True),
+        ("лампочка", "ламопчка", 1, False),
+        ("лампочка", "ламопчка", 2, True),
+        ("лампочка", "лам", 2, False),
+        ("", "ab", 2, True),
+    ],
+)
+def test_within_distance(first, second, limit, expected):
+    assert within_distance(first, second, limit) is expected
+    assert within_distance(second, first, limit) is expected
+
+
+def test_answer_matcher():
+    matcher = AnswerMatcher("Ёлка", ["ель", "новогодняя ёлка"])
+    assert matcher.forms == {"елка", "ель", "новогодняяелка"}
+    assert matcher.matches("ЕЛКА!")
+    assert matcher.matches("елкв")
+    assert matcher.matches("Новогодняя игрушка") is False
+    assert matcher.matches("Новогодня ёлка")
+    # short answers must be exact
+    assert matcher.matches("ел") is False
+    assert matcher.matches("") is False
+
+
+def test_riddle_check_answer():
+    item = RiddleItem("Зимой и летом одним цветом", "Ёлка", ("ель",))
+    riddle = Riddle(ContentPack(version=1, topics=(), questions={}, riddles=(item,)))
+    assert riddle.check_answer("ёлка") is False
+    riddle.get_question()
+    assert riddle.check_answer("Ель")
+    assert riddle.check_answer("сосна") is False
+
+    restored = Riddle(ContentPack(version=2, topics=(), questions={}, riddles=()))
+    restored.load_state([*riddle.to_state()[:3], [["Висит груша", "лампочка"]]])
+    restored.get_question()
+    assert restored.check_answer("лампочки")
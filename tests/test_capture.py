@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+from src.modules.capture import TrafficRecorder, read_capture
+
+
+def fake_namespace(name: str):
+    manager = SimpleNamespace(eio_sid_from_sid=lambda sid, namespace: f"eio-{sid[0]}")
+    return SimpleNamespace(namespace=name, server=SimpleNamespace(manager=manager))
+
+
+async def test_capture_roundtrip(tmp_path):
+    path = tmp_path / "capture.jsonl"
+    recorder = TrafficRecorder(path)
+    chat, trivia = fake_namespace("/chat"), fake_namespace("/trivia")
+    calls = []
+
+    async def handler():
+        calls.append(1)
+
+    await recorder.middleware(chat, "connect", ("a1", {"secret": "environ"}), handler)
+    await recorder.middleware(trivia, "connect", ("a2", {}), handler)
+    await recorder.middleware(chat, "join", ("a1", {"name": "n", "room": "r"}), handler)
+    await recorder.middleware(chat, "connect", ("b1", {}), handler)
+    await recorder.middleware(chat, "disconnect", ("a1",), handler)
+    await recorder.stop()
+
+    assert len(calls) == recorder.recorded == 5
+    assert "secret" not in path.read_text()
+    clients = read_capture(path)
+    assert sorted(clients) == [0, 1]
+    assert [(e.namespace, e.event) for e in clients[0]] == [
+        ("/chat", "connect"),
+        ("/trivia", "connect"),
+        ("/chat", "join"),
+        ("/chat", "disconnect"),
+    ]
+    assert clients[0][2].data == {"name": "n", "room": "r"}
@@ -1,9 +1,10 @@
 import pytest
 from socketio import AsyncClient
 
+from src.apps.chat import PRESENCE_INTERVAL
 from src.apps.trivia import create_answer_body, game_container
-from src.config.config_folder import get_config_folder
 from src.helper import generate_game_uuid
+from src.modules.content import content_loader
 from src.modules.mod import Riddle
 from tests.conftest import (
     EXPECTED_CHAT_DATA,
@@ -17,12 +18,41 @@ from tests.conftest import (
     "event, data, expected",
     [
         ("connected", None, "connected"),
-        ("get_rooms", {}, ["sex", "drugs", "rock'n'roll"]),
+        (
+            "get_rooms",
+            {},
+            [
+                {"name": "sex", "members": 0},
+                {"name": "drugs", "members": 0},
+                {"name": "rock'n'roll", "members": 0},
+            ],
+        ),
         (
             "join",
             {"name": "test_client", "room": "lobby"},
             {"text": "welcome to lobby"},
         ),
+        (
+            "get_rooms",
+            {},
+            [
+                {"name": "sex", "members": 0},
+                {"name": "drugs", "members": 0},
+                {"name": "rock'n'roll", "members": 0},
+                {"name": "lobby", "members": 1},
+            ],
+        ),
+        ("typing", {}, {"room": "lobby", "users": ["test_client"]}),
+        ("send_message", {"text": "hello"}, {"text": "hello", "author": "test_client"}),
+        (
+            "search",
+            {"query": "hel*"},
+            {
+                "query": "hel*",
+                "results": [{"id": 0, "text": "hello", "author": "test_client"}],
+                "next": None,
+            },
+        ),
     ],
     ids=idtype,
 )
@@ -32,6 +62,21 @@ async def test_chat(conn: AsyncClient, event, data, expected):
     assert expected in EXPECTED_CHAT_DATA
 
 
+async def test_chat_presence_coalesced(server):
+    presences = []
+    first, second = AsyncClient(), AsyncClient()
+    first.on("presence", presences.append, namespace="/chat")
+    for sio in (first, second):
+        await sio.connect("http://127.0.0.1:8080", namespaces=["/chat"])
+    # both joins fall into one presence interval
+    await first.emit("join", {"name": "first", "room": "presence"}, namespace="/chat")
+    await second.emit("join", {"name": "second", "room": "presence"}, namespace="/chat")
+    await first.sleep(PRESENCE_INTERVAL * 3)
+    for sio in (first, second):
+        await sio.disconnect()
+    assert presences == [{"room": "presence", "members": 2}]
+
+
 def riddle_game():
     riddle = Riddle()
     riddle.get_question()
@@ -75,8 +120,7 @@ async def test_riddle(conn: AsyncClient, event, data, expected):
 
 def trivia_topics():
     trivia = game_container.get_item("topics")
-    topics_path = get_config_folder("trivia_topics.csv")
-    trivia.load_topics(topics_path)
+    trivia.load_topics(content_loader.current)
     topics = trivia.topics
     return topics
 
@@ -84,8 +128,7 @@ def trivia_topics():
 def trivia_game():
     topic = "5"
     trivia = game_container.get_item("topics")
-    question_path = get_config_folder("trivia_questions.csv")
-    trivia.load_questions(question_path)
+    trivia.load_questions(content_loader.current)
     trivia.topic = topic
     response = create_answer_body(trivia=trivia, uid=generate_game_uuid())
     EXPECTED_TRIVIA_DATA.append(response)
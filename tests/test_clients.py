@@ -0,0 +1,38 @@
+from src.modules.mod import ClientContainer
+
+
+def test_client_container_per_namespace():
+    chat = ClientContainer("/test-chat")
+    riddle = ClientContainer("/test-riddle")
+    assert chat is ClientContainer("/test-chat")
+    assert chat is ClientContainer(namespace="/test-chat")
+    assert chat is not riddle
+
+    chat.connect("sid").name = "chat"
+    riddle.connect("sid").create_game("riddle")
+    riddle.disconnect("sid")
+    assert chat.get_item("sid").name == "chat"
+    assert chat.get_item("sid").game is None
+    assert len(riddle) == 0
+    assert chat.key("sid") is None
+    chat.bind_session("sid", "token")
+    riddle.bind_session("sid", "token")
+    assert chat.key("sid") != riddle.key("sid")
+    riddle.del_item("sid")
+    assert riddle.key("sid") is None
+
+
+def test_client_container_hooks_and_stats():
+    container = ClientContainer("/test-hooks")
+    events = []
+    container.add_connect_hook(lambda sid, _: events.append(("connect", sid)))
+    container.add_disconnect_hook(lambda sid, _: events.append(("disconnect", sid)))
+    for i in range(100):
+        container.connect(f"sid-{i}")
+    container.disconnect("sid-0")
+    container.disconnect("unknown")
+    assert events[0] == ("connect", "sid-0")
+    assert events[-1] == ("disconnect", "sid-0")
+    stats = container.stats()
+    assert stats["clients"] == 99 == len(container) == len(list(container))
+    assert len(stats["shards"]) == ClientContainer.SHARDS
@@ -0,0 +1,58 @@
+import shutil
+
+import pytest
+
+from src.config.config_folder import get_config_folder
+from src.modules.content import (
+    QUESTIONS_FILE,
+    RIDDLES_FILE,
+    TOPICS_FILE,
+    ContentLoader,
+    parse_content,
+)
+from src.modules.mod import Riddle
+
+
+@pytest.fixture
+def content_folder(tmp_path):
+    for name in (TOPICS_FILE, QUESTIONS_FILE, RIDDLES_FILE):
+        shutil.copy(get_config_folder(name), tmp_path / name)
+    return tmp_path
+
+
+def test_parse_content():
+    pack = parse_content(get_config_folder(""), 1)
+    assert [topic["pk"] for topic in pack.topics] == ["5", "6", "7"]
+    assert pack.questions_for("5")[0].answer == 1
+    assert pack.questions_for("unknown") == ()
+    assert len(pack.riddles) == 2
+
+
+def test_parse_content_invalid(content_folder):
+    (content_folder / QUESTIONS_FILE).write_text(
+        "pk,topic,text,1,2,3,4,answer\n1,100,text,a,b,c,d,1\n", encoding="utf-8"
+    )
+    with pytest.raises(ValueError):
+        parse_content(content_folder, 1)
+
+
+async def test_reload_swap_pack(content_folder):
+    loader = ContentLoader(content_folder)
+    await loader.start(interval=60)
+    old_pack = loader.current
+    riddle = Riddle(old_pack)
+
+    (content_folder / RIDDLES_FILE).write_text(
+        "question,answer\nНовая загадка?,ответ\n", encoding="utf-8"
+    )
+    assert await loader.reload(force=True)
+    assert loader.current.version == old_pack.version + 1
+    assert len(loader.current.riddles) == 1
+
+    riddle.get_question()
+    assert riddle.question == old_pack.riddles[-1].question
+
+    (content_folder / RIDDLES_FILE).write_text("question,answer\n,\n", encoding="utf-8")
+    assert not await loader.reload(force=True)
+    assert len(loader.current.riddles) == 1
+    await loader.stop()
@@ -0,0 +1,44 @@
+from src.modules.history import MessageHistory
+
+
+def test_history_search_cyrillic_and_prefix():
+    history = MessageHistory()
+    history.add_message({"text": "Привет, мир!", "author": "alice"})
+    history.add_message({"text": "Ёлка в лесу", "author": "bob"})
+    history.add_message({"text": "привет ёлка", "author": "bob"})
+
+    found, cursor = history.search("ПРИВЕТ")
+    assert [i for i, _ in found] == [2, 0]
+    assert cursor is None
+    assert [i for i, _ in history.search("елка привет")[0]] == [2]
+    assert [i for i, _ in history.search("при*")[0]] == [2, 0]
+    assert history.search("п*") == ([], None)
+
+
+def test_history_search_paging():
+    history = MessageHistory()
+    for i in range(10):
+        history.add_message({"text": f"message {i}", "author": "alice"})
+    found, cursor = history.search("message", limit=4)
+    assert [i for i, _ in found] == [9, 8, 7, 6]
+    found, cursor = history.search("message", before=cursor, limit=4)
+    assert [i for i, _ in found] == [5, 4, 3, 2]
+    found, cursor = history.search("message", before=cursor, limit=4)
+    assert [i for i, _ in found] == [1, 0]
+    assert cursor is None
+
+
+def test_history_evict_index():
+    history = MessageHistory(limit=3)
+    history.add_message({"text": "old unique", "author": "alice"})
+    for i in range(3):
+        history.add_message({"text": f"common {i}", "author": "alice"})
+    assert len(history) == 3
+    assert history.search("unique") == ([], None)
+    assert history.search("uni*") == ([], None)
+    assert [i for i, _ in history.search("common")[0]] == [3, 2, 1]
+    assert history.get_message(0) is None
+    assert history.get_messages(2) == [
+        {"text": "common 1", "author": "alice"},
+        {"text": "common 2", "author": "alice"},
+    ]
@@ -0,0 +1,101 @@
+import pytest
+
+from src.apps.trivia import get_player_id
+from src.modules.matchmaking import (
+    BASE_WINDOW,
+    DEFAULT_RATING,
+    WIDEN_RATE,
+    Matchmaker,
+    RatingBook,
+    RatingQueue,
+    Ticket,
+)
+
+
+@pytest.fixture
+def matchmaker():
+    matchmaker = Matchmaker()
+    matchmaker.reset()
+    yield matchmaker
+    matchmaker.reset()
+
+
+@pytest.fixture
+def book():
+    book = RatingBook()
+    book.reset()
+    yield book
+    book.reset()
+
+
+def test_rating_book_elo(book):
+    ratings = book.record_game({"winner": 3, "loser": 1})
+    assert ratings["winner"] == 1516
+    assert ratings["loser"] == 1484
+    ratings = book.record_game({"winner": 2, "loser": 2})
+    assert ratings["winner"] < 1516
+    assert sum(ratings.values()) == 3000
+
+
+def test_queue_find_nearest_band():
+    queue = RatingQueue()
+    for sid, rating in (("low", 1300), ("near", 1520), ("high", 1700)):
+        queue.add(Ticket(sid, rating, 0))
+    ticket = Ticket("me", 1500, 0)
+    queue.add(ticket)
+    assert queue.find(ticket, 0).sid == "near"
+    queue.remove("near")
+    assert queue.find(ticket, 0) is None
+    # window widens with wait time
+    assert queue.find(ticket, (200 - BASE_WINDOW) / WIDEN_RATE).sid in ("low", "high")
+
+
+def test_matchmaker_join_and_tick(matchmaker):
+    assert matchmaker.join("5", "a", 1500, 0) is None
+    assert matchmaker.join("6", "b", 1500, 0) is None
+    assert matchmaker.join("5", "c", 1900, 0) is None
+    assert matchmaker.join("5", "d", 1510, 1) == ["a", "d"]
+    assert len(matchmaker) == 2
+    assert matchmaker.tick(2) == []
+    assert matchmaker.leave("b")
+    assert matchmaker.join("5", "e", 1600, 2) is None
+    matchmaker.replace_sid("e", "e2")
+    assert matchmaker.tick(20) == [("5", ["e2", "c"])]
+    assert len(matchmaker) == 0
+
+
+def test_queue_find_both_windows():
+    queue = RatingQueue()
+    old = Ticket("old", 1500, 0)
+    queue.add(old)
+    queue.add(Ticket("new", 1700, 10))
+    # old player accepts 300 points difference, new one only BASE_WINDOW
+    assert queue.find(old, 10) is None
+    assert queue.find(old, 10 + (200 - BASE_WINDOW) / WIDEN_RATE).sid == "new"
+
+
+def test_matchmaker_skip_parked(matchmaker):
+    assert matchmaker.join("5", "a", 1500, 0) is None
+    assert matchmaker.join("5", "b", 1500, 0, skip={"a"}) is None
+    assert matchmaker.tick(1, skip={"a"}) == []
+    assert len(matchmaker) == 2
+    assert matchmaker.tick(1) == [("5", ["b", "a"])]
+
+
+def test_rating_book_bounded():
+    book = RatingBook(size=2)
+    book.record_game({"a": 1, "b": 0})
+    assert book.get("a") > DEFAULT_RATING
+    book.record_game({"c": 1, "d": 0})
+    assert len(book) == 2
+    # players not seen for longest are dropped
+    assert book.get("a") == DEFAULT_RATING
+    assert book.get("c") > DEFAULT_RATING
+
+
+def test_player_id_from_auth():
+    assert get_player_id({"session": None, "player": "browser-1"}) == "browser-1"
+    assert get_player_id({"player": ""}) is None
+    assert get_player_id({"player": "x" * 65}) is None
+    assert get_player_id({"player": 1}) is None
+    assert get_player_id(None) is None
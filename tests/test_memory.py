@@ -0,0 +1,79 @@
+import tracemalloc
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src import admin
+from src.modules.memory import AllocationTracker, deep_size, memory_report
+from src.modules.mod import ClientContainer, GameContainer
+
+HEADERS = {"Authorization": "Bearer secret"}
+
+
+def test_deep_size_skip_seen():
+    shared = ["x" * 1000]
+    assert deep_size([shared], set()) > 1000
+    seen: set[int] = set()
+    deep_size(shared, seen)
+    assert deep_size([shared], seen) < 1000
+
+
+def test_memory_report_containers():
+    games = GameContainer()
+    games.get_item("memory-unknown-uid")
+    clients = ClientContainer("/memory")
+    for i in range(10):
+        clients.connect(f"memory-{i}")
+    try:
+        report = memory_report(5)
+    finally:
+        games.del_item("memory-unknown-uid")
+        for i in range(10):
+            clients.disconnect(f"memory-{i}")
+    stats = {item["name"]: item for item in report["containers"]}
+    assert stats["GameContainer"]["orphans"] >= 1
+    assert stats["ClientContainer(/memory)"]["objects"] == 10
+    assert stats["ClientContainer(/memory)"]["bytes"] > 0
+    assert "Matchmaker" in stats
+    assert len(report["types"]) == 5
+
+
+async def test_memory_trace_endpoint():
+    app = web.Application()
+    app["admin_token"] = "secret"
+    app.router.add_route("GET", "/admin/memory", admin.memory)
+    app.router.add_route("GET", "/admin/memory/trace", admin.memory_trace)
+    async with TestClient(TestServer(app)) as client:
+        response = await client.get("/admin/memory/trace", headers=HEADERS)
+        assert response.status == 409
+        response = await client.get(
+            "/admin/memory/trace", params={"action": "start"}, headers=HEADERS
+        )
+        assert response.status == 200
+        leak = [bytearray(1024) for _ in range(1000)]
+        response = await client.get(
+            "/admin/memory/trace", params={"action": "diff", "top": "5"}, headers=HEADERS
+        )
+        diff = await response.json()
+        await client.get("/admin/memory/trace", params={"action": "stop"}, headers=HEADERS)
+        response = await client.get("/admin/memory", headers=HEADERS)
+        assert response.status == 200
+        assert (await response.json())["tracing"] is False
+    assert len(leak) == 1000
+    assert any(
+        "test_memory.py" in site["site"][0] and site["size_diff"] >= 1024 * 1000
+        for site in diff["top"]
+    )
+
+
+def test_allocation_tracker_keep_external_tracing():
+    tracemalloc.start()
+    try:
+        AllocationTracker.start()
+        AllocationTracker.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    AllocationTracker.start()
+    AllocationTracker.stop()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,108 @@
+import asyncio
+import shutil
+
+import aiohttp
+import pytest
+import socketio
+
+from src.config.config_folder import get_config_folder
+from src.modules.content import ContentLoader
+from src.modules.moderation import (
+    DROP,
+    FLAG,
+    MASK,
+    POLICIES_FILE,
+    TERMS_FILE,
+    Automaton,
+    ModerationRules,
+    Term,
+    moderator,
+    normalize_text,
+    parse_moderation,
+)
+
+
+@pytest.fixture
+def moderation_folder(tmp_path):
+    for name in (TERMS_FILE, POLICIES_FILE):
+        shutil.copy(get_config_folder(name), tmp_path / name)
+    return tmp_path
+
+
+def test_automaton_overlapping_terms():
+    automaton = Automaton(Term(text, "test", False) for text in ("he", "she", "his", "hers"))
+    found = [(match.start, match.end, match.term.text) for match in automaton.find("ushers")]
+    assert found == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+    assert automaton.find("") == []
+
+
+def test_normalize_text():
+    assert normalize_text("ЁЛКА") == "елка"
+    # latin look-alikes become cyrillic, positions are kept
+    assert normalize_text("Kaзинo") == "казино"
+    assert len(normalize_text("İstanbul")) == len("İstanbul")
+    # one character without one-to-one lowercase doesn't disable the rest
+    assert normalize_text("ДУРАК İ") == "дурак İ"
+
+
+def test_moderate_by_room_policy():
+    rules = ModerationRules(
+        version=1,
+        terms=[Term("дурак", "insult", True), Term("казино", "spam", False)],
+        policies={"default": {"insult": MASK, "spam": DROP}, "relaxed": {"insult": FLAG}, "off": {}},
+        rooms={"chill": "relaxed", "free": "off"},
+        default="default",
+    )
+    assert rules.moderate("room", "Ты ДУРАК!") == (MASK, "Ты *****!", ("insult",))
+    # whole word terms don't match inside other words
+    assert rules.moderate("room", "дураковатый").action is None
+    assert rules.moderate("room", "ДУРАК İ") == (MASK, "***** İ", ("insult",))
+    assert rules.moderate("room", "д-у-р-а-к, дурак-дурак").text == "*-*-*-*-*, *****-*****"
+    assert rules.moderate("room", "к.а.з.и.н.о").action == DROP
+    assert rules.moderate("room", "дурак в казино").action == DROP
+    assert rules.moderate("chill", "дурак в казино") == (FLAG, "дурак в казино", ("insult",))
+    assert rules.moderate("free", "дурак").action is None
+
+
+def test_parse_moderation_invalid(moderation_folder):
+    (moderation_folder / POLICIES_FILE).write_text(
+        "default_policy: unknown\npolicies: {}\n", encoding="utf-8"
+    )
+    with pytest.raises(ValueError):
+        parse_moderation(moderation_folder, 1)
+
+
+async def test_moderation_reload(moderation_folder):
+    loader = ContentLoader(moderation_folder, (TERMS_FILE, POLICIES_FILE), parse_moderation)
+    await loader.start(interval=60)
+    assert loader.current.moderate(None, "новое слово").action is None
+    (moderation_folder / TERMS_FILE).write_text(
+        "term,category,match\nновое слово,insult,part\n", encoding="utf-8"
+    )
+    assert await loader.reload(force=True)
+    assert loader.current.moderate(None, "новое слово").action == MASK
+    await loader.stop()
+
+
+async def test_chat_moderation(server):
+    received = []
+    moderated = []
+    client = socketio.AsyncClient()
+    client.on("message", lambda data: received.append(data), namespace="/chat")
+    client.on("moderated", lambda data: moderated.append(data), namespace="/chat")
+    actions = dict(moderator.stats)
+    await client.connect("http://127.0.0.1:8080", namespaces=["/chat"])
+    await client.emit("join", {"name": "carol", "room": "drugs"}, namespace="/chat")
+    await client.emit("send_message", {"text": "ты дурак"}, namespace="/chat")
+    await client.emit("send_message", {"text": "лучшее казино"}, namespace="/chat")
+    await asyncio.sleep(0.3)
+    await client.disconnect()
+
+    assert {"text": "ты *****", "author": "carol"} in received
+    assert not [message for message in received if "казино" in message["text"]]
+    assert moderated == [{"action": DROP, "categories": ["spam"]}]
+    async with aiohttp.ClientSession() as session:
+        async with session.get("http://127.0.0.1:8080/ready") as response:
+            report = (await response.json())["moderation"]
+    assert report["actions"][DROP] == actions[DROP] + 1
+    assert report["actions"][MASK] == actions[MASK] + 1
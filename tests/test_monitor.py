@@ -0,0 +1,52 @@
+import pytest
+import socketio
+from aiohttp import ClientSession
+
+from src.apps.base import BaseNamespace
+from src.modules.mod import ClientContainer
+from src.modules.monitor import AdmissionController, LoopMonitor
+
+
+class EchoApp(BaseNamespace):
+    async def on_connect(self, sid, environ):
+        ClientContainer(self.namespace).connect(sid)
+
+    async def on_echo(self, sid, data):
+        return data
+
+
+async def test_admission_refuse_full_namespace():
+    monitor = LoopMonitor()
+    admission = AdmissionController(monitor, {"/test-admission": 1})
+    namespace = EchoApp("/test-admission")
+    namespace.add_middleware(monitor.middleware)
+    namespace.add_middleware(admission.middleware)
+
+    await namespace.trigger_event("connect", "sid-1", {})
+    assert await namespace.trigger_event("echo", "sid-1", "data") == "data"
+    with pytest.raises(socketio.exceptions.ConnectionRefusedError):
+        await namespace.trigger_event("connect", "sid-2", {})
+    assert admission.refused == {"/test-admission:full": 1}
+
+
+async def test_admission_refuse_on_lag():
+    monitor = LoopMonitor(max_lag=0.1)
+    admission = AdmissionController(monitor, {})
+    assert admission.reason("/any") is None
+    for _ in range(10):
+        monitor._observe(1.0)
+    assert monitor.overloaded
+    assert admission.reason("/any") == "overloaded"
+    assert not admission.ready
+
+
+async def test_ready_endpoint(server):
+    async with ClientSession() as session:
+        async with session.get("http://127.0.0.1:8080/ready") as response:
+            assert response.status == 200
+            body = await response.json()
+    assert body["ready"]
+    assert set(body["clients"]) == {"/chat", "/riddle", "/trivia"}
+    chat = body["clients"]["/chat"]
+    assert chat["clients"] == sum(chat["shards"])
+    assert len(chat["shards"]) == ClientContainer.SHARDS
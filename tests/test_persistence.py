@@ -0,0 +1,113 @@
+import sqlite3
+
+import pytest
+
+from src.modules.content import ContentPack, TriviaQuestion, content_loader
+from src.modules.mod import Client, Trivia
+from src.modules.persistence import CLIENT, GAME, StateStore
+
+
+async def test_state_store_round_trip(tmp_path):
+    store = StateStore(tmp_path / "state.db")
+    await store.start(interval=60)
+
+    client = Client()
+    client.name = "player"
+    client.create_game("riddle")
+    client.game.get_question()
+    client.game.score_increment()
+    trivia = Trivia()
+    trivia.topic = "5"
+    trivia.add_user("sid-1")
+    for _ in range(3):
+        store.mark(CLIENT, "/riddle token-1", client)
+    store.mark(GAME, "uid-1", trivia)
+    store.mark(GAME, "uid-2", trivia)
+    store.mark_deleted(GAME, "uid-2")
+    assert len(store) == 3
+    assert await store.flush() == 3
+    await store.stop()
+
+    states = {key: state for _, key, state in await StateStore(tmp_path / "state.db").restore()}
+    assert set(states) == {"/riddle token-1", "uid-1"}
+    restored = Client()
+    restored.load_state(states["/riddle token-1"])
+    assert restored.name == "player"
+    assert restored.game.score == 1
+    assert restored.game.question == client.game.question
+    assert restored.player_id == client.player_id
+    restored_trivia = Trivia()
+    restored_trivia.load_state(states["uid-1"])
+    assert restored_trivia.users == ["sid-1"]
+    assert restored_trivia.topic == "5"
+
+
+async def test_state_store_ignore_marks_after_stop(tmp_path):
+    store = StateStore(tmp_path / "state.db")
+    await store.start(interval=60)
+    await store.stop()
+    store.mark(CLIENT, "sid-1", Client())
+    assert len(store) == 0
+
+
+async def test_state_store_keep_batch_on_failed_write(tmp_path, monkeypatch):
+    store = StateStore(tmp_path / "state.db")
+    await store.start(interval=60)
+    first, second = Client(), Client()
+
+    def fail(upserts, deletes):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    store.mark(CLIENT, "/chat token-1", first)
+    store.mark(CLIENT, "/chat token-2", first)
+    with monkeypatch.context() as patch:
+        patch.setattr(store._backend, "write", fail)
+        with pytest.raises(sqlite3.Error):
+            await store.flush()
+    assert len(store) == 2
+    store.mark(CLIENT, "/chat token-2", second)
+    assert await store.flush() == 2
+    await store.stop()
+
+
+async def test_state_store_drop_rows_without_session(tmp_path):
+    store = StateStore(tmp_path / "state.db")
+    await store.start(interval=60)
+    client = Client()
+    client.name = "alice"
+    store.mark(CLIENT, "/chat token-1", client)
+    store._dirty[("client", "/chat sid-1")] = client
+    await store.stop()
+
+    store = StateStore(tmp_path / "state.db")
+    sessions = await store.start(interval=60)
+    assert [(namespace, token) for namespace, token, _ in sessions] == [("/chat", "token-1")]
+    assert sessions[0][2].name == "alice"
+    await store.stop()
+    assert {key for _, key, _ in await StateStore(tmp_path / "state.db").restore()} == {
+        "/chat token-1"
+    }
+
+
+def test_trivia_restore_keep_own_pack(monkeypatch):
+    questions = (TriviaQuestion("first", 1, ("a", "b", "c", "d")),
+                 TriviaQuestion("second", 2, ("a", "b", "c", "d")),
+                 TriviaQuestion("third", 3, ("a", "b", "c", "d")))
+    pack = ContentPack(version=1, topics=({"pk": "5", "name": "five"},),
+                       questions={"5": questions}, riddles=())
+    trivia = Trivia()
+    trivia.load_questions(pack)
+    trivia.topic = "5"
+    trivia.get_question("5")
+    state = trivia.to_state()
+
+    # content changed before restart, restored game keeps its questions
+    changed = ContentPack(version=2, topics=({"pk": "5", "name": "five"},),
+                          questions={"5": questions[:1]}, riddles=())
+    monkeypatch.setattr(content_loader, "_pack", changed)
+    restored = Trivia()
+    restored.load_state(state)
+    assert restored.question == "third"
+    assert restored.remaining_question_on_topic("5") == 2
+    restored.get_question("5")
+    assert (restored.question, restored.answer) == ("second", 2)
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+import socketio
+
+from src.apps import trivia as trivia_app
+from src.modules.content import TriviaQuestion
+from src.modules.quiz import QuizHub, QuizShow
+
+QUESTIONS = [
+    TriviaQuestion("second", 2, ("a", "b", "c", "d")),
+    TriviaQuestion("first", 1, ("a", "b", "c", "d")),
+]
+
+
+def test_quiz_round_scoring():
+    show = QuizShow("5", "room", QUESTIONS)
+    for i in range(4):
+        show.add_player(f"sid-{i}", f"player-{i}")
+    assert not show.record("sid-0", 1, 1)
+    show.next_question()
+    assert show.record("sid-0", 1, 1)
+    assert not show.record("sid-0", 2, 1)
+    assert not show.record("sid-1", 1, 2)
+    assert not show.record("unknown", 1, 1)
+    assert show.record("sid-1", 1, 1)
+    assert show.record("sid-2", 3, 1)
+
+    result = show.score_round()
+    assert result.answer == 1
+    assert result.distribution == [2, 0, 1, 0]
+    assert result.summary(len(show))["answered"] == 3
+    assert show.deltas(result) == [("sid-0", 1, 1), ("sid-1", 1, 1), ("sid-2", 0, 0)]
+    assert show.score_round() is None
+
+    show.next_question()
+    assert show.record("sid-2", 2, 2)
+    show.remove_player("sid-0")
+    result = show.score_round()
+    assert show.deltas(result) == [("sid-2", 1, 1)]
+    assert show.leaders(2) == [{"name": "player-1", "score": 1}, {"name": "player-2", "score": 1}]
+    assert show.next_question() is None
+
+
+@pytest.fixture
+def hub():
+    hub = QuizHub()
+    hub.reset()
+    yield hub
+    hub.reset()
+
+
+def test_quiz_hub(hub):
+    show = hub.join("5", "room", QUESTIONS, "sid-1", "player")
+    assert hub.join("5", "other", QUESTIONS, "sid-1", "player") is show
+    assert hub.join("5", "other", QUESTIONS, "sid-2", "player").room == "room"
+    hub.replace_sid("sid-2", "sid-3")
+    assert hub.show_of("sid-3") is show and "sid-3" in show
+    assert hub.leave("sid-1")
+    assert len(show) == 1
+    hub.close("5")
+    assert hub.show_of("sid-3") is None
+    assert len(hub) == 0
+
+
+async def test_trivia_stop_cancel_quiz(hub):
+    namespace = trivia_app.TriviaApp("/trivia-stop")
+    namespace._schedule_quiz(hub.join("5", "room", QUESTIONS, "sid-1", "player"))
+    task = namespace._quiz_tasks["5"]
+    await namespace.stop()
+    assert task.done()
+    assert not namespace._quiz_tasks
+    assert len(hub) == 0
+
+
+async def quiz_client(name: str, events: list) -> socketio.AsyncClient:
+    client = socketio.AsyncClient()
+    for event in ("quiz", "quiz_question", "quiz_result", "quiz_score", "quiz_over"):
+        client.on(
+            event,
+            lambda data, event=event: events.append((event, data)),
+            namespace="/trivia",
+        )
+    await client.connect("http://127.0.0.1:8080", namespaces=["/trivia"])
+    await client.emit("join_quiz", {"topic_pk": "5", "name": name}, namespace="/trivia")
+    return client
+
+
+async def wait_for(events: list, name: str) -> dict:
+    for _ in range(20):
+        if found := [data for event, data in events if event == name]:
+            return found[0]
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"{name} isn't received")
+
+
+async def test_quiz_show(server, monkeypatch):
+    monkeypatch.setattr(trivia_app, "QUIZ_LOBBY", 0.1)
+    monkeypatch.setattr(trivia_app, "QUIZ_DEADLINE", 0.2)
+    first_events, second_events = [], []
+    first = await quiz_client("first", first_events)
+    second = await quiz_client("second", second_events)
+
+    question = await wait_for(first_events, "quiz_question")
+    ack = await first.call(
+        "quiz_answer", {"index": 1, "round": question["round"]}, namespace="/trivia"
+    )
+    assert ack == {"accepted": True}
+
+    result = await wait_for(second_events, "quiz_result")
+    assert result["players"] == 2 and result["answered"] == 1
+    assert sum(result["distribution"]) == 1
+    assert (await wait_for(first_events, "quiz_score"))["delta"] in (0, 1)
+    assert "quiz_score" not in [event for event, _ in second_events]
+    await first.disconnect()
+    await second.disconnect()
@@ -0,0 +1,44 @@
+from src.modules.rooms import RoomRegistry, TypingTracker
+
+
+def test_room_registry_join_leave():
+    registry = RoomRegistry(["static"])
+    registry.join("static", "sid-1")
+    registry.join("dynamic", "sid-1")
+    registry.join("dynamic", "sid-2")
+    assert registry.count("dynamic") == 2
+    assert registry.pop_changes() == {"static": 1, "dynamic": 2}
+    assert not registry.has_changes
+
+    registry.leave("dynamic", "sid-1")
+    registry.leave("dynamic", "sid-2")
+    registry.leave("static", "sid-1")
+    assert "dynamic" not in registry
+    assert "static" in registry
+    assert registry.pop_changes() == {"static": 0, "dynamic": 0}
+
+
+def test_room_registry_snapshot_cache():
+    registry = RoomRegistry(["static"])
+    snapshot = registry.rooms_snapshot()
+    assert snapshot is registry.rooms_snapshot()
+    registry.join("static", "sid-1")
+    assert registry.rooms_snapshot() == [{"name": "static", "members": 1}]
+    assert not registry.create("static")
+
+
+def test_typing_tracker_debounce_and_expire():
+    tracker = TypingTracker(timeout=1.0)
+    tracker.ping("room", "sid-1", "alice", now=0.0)
+    tracker.ping("room", "sid-2", "bob", now=0.1)
+    assert tracker.pop_changes() == {"room": ["alice", "bob"]}
+
+    for i in range(100):
+        tracker.ping("room", "sid-1", "alice", now=0.2 + i / 1000)
+    assert tracker.pop_changes() == {}
+
+    tracker.expire(now=1.15)
+    assert tracker.pop_changes() == {"room": ["alice"]}
+    tracker.stop("room", "sid-1")
+    assert tracker.pop_changes() == {"room": []}
+    assert not tracker.is_active
@@ -0,0 +1,205 @@
+import asyncio
+
+import socketio
+
+from src.app import restore_sessions
+from src.helper import generate_game_uuid
+from src.modules import session as session_module
+from src.modules.content import content_loader
+from src.modules.mod import Client, ClientContainer, GameContainer, Trivia
+from src.modules.persistence import CLIENT, GAME, restore_containers
+from src.modules.session import SessionManager
+
+
+async def test_session_park_and_resume():
+    released = []
+
+    async def release(session):
+        released.append(session.sid)
+
+    manager = SessionManager(release, grace=10)
+    token = manager.issue("sid-1")
+    assert manager.park("sid-1", "client", ["sid-1", "room"])
+    assert not manager.park("sid-2", "client", [])
+    manager.record("room", "message", {"text": "hi"})
+    manager.record("other", "message", {"text": "skip"})
+    manager.record(None, "status", {})
+
+    session = manager.resume(token, "sid-3")
+    assert session.client == "client"
+    assert list(session.events) == [("message", {"text": "hi"}), ("status", {})]
+    assert manager.resume(token, "sid-4") is None
+    # events to new SID and resumed rooms wait for the replay
+    assert manager.is_held("sid-3")
+    manager.record("sid-3", "direct", {})
+    manager.record("room", "live", {})
+    assert [manager.next_event("sid-3") for _ in range(5)] == [
+        ("message", {"text": "hi"}), ("status", {}), ("direct", {}), ("live", {}), None,
+    ]
+    assert manager.release_hold("sid-3") is session
+    assert not manager.buffering
+    await manager.stop()
+    assert released == []
+
+
+async def test_session_stop_release_parked():
+    released = []
+
+    async def release(session):
+        released.append(session.sid)
+
+    manager = SessionManager(release)
+    manager.issue("sid-1")
+    manager.park("sid-1", "client", ["sid-1"])
+    await manager.stop()
+    assert released == ["sid-1"]
+    assert not manager.buffering
+    assert not manager.parked_sids
+
+
+async def test_session_buffer_is_bounded():
+    async def release(session):
+        pass
+
+    manager = SessionManager(release)
+    token = manager.issue("sid")
+    manager.park("sid", None, ["sid"])
+    for i in range(session_module.BUFFER_SIZE + 10):
+        manager.record("sid", "message", i)
+    events = manager.resume(token, "new").events
+    assert len(events) == session_module.BUFFER_SIZE
+    assert events[0] == ("message", 10)
+    await manager.stop()
+
+
+async def test_session_released_after_grace(monkeypatch):
+    monkeypatch.setattr(session_module, "SWEEP_INTERVAL", 0.01)
+    released = []
+
+    async def release(session):
+        released.append(session.sid)
+
+    manager = SessionManager(release, grace=0.02)
+    token = manager.issue("sid")
+    manager.park("sid", None, [])
+    await asyncio.sleep(0.1)
+    assert released == ["sid"]
+    assert manager.resume(token, "new") is None
+    await manager.stop()
+
+
+async def test_chat_session_resume(server):
+    received = []
+    tokens = []
+
+    async def on_session(data):
+        tokens.append(data)
+
+    async def on_message(data):
+        received.append(data)
+
+    first = socketio.AsyncClient()
+    first.on("session", on_session, namespace="/chat")
+    await first.connect("http://127.0.0.1:8080", namespaces=["/chat"])
+    await first.emit("join", {"name": "alice", "room": "drugs"}, namespace="/chat")
+    await asyncio.sleep(0.2)
+    await first.disconnect()
+    token = tokens[-1]["token"]
+
+    other = socketio.AsyncClient()
+    await other.connect("http://127.0.0.1:8080", namespaces=["/chat"])
+    await other.emit("join", {"name": "bob", "room": "drugs"}, namespace="/chat")
+    await asyncio.sleep(0.1)
+    await other.emit("send_message", {"text": "missed"}, namespace="/chat")
+    await asyncio.sleep(0.2)
+
+    second = socketio.AsyncClient()
+    second.on("session", on_session, namespace="/chat")
+    second.on("message", on_message, namespace="/chat")
+    await second.connect(
+        "http://127.0.0.1:8080", namespaces=["/chat"], auth={"session": token}
+    )
+    await second.emit("send_message", {"text": "back"}, namespace="/chat")
+    await asyncio.sleep(0.3)
+    await second.disconnect()
+    await other.disconnect()
+
+    assert tokens[-1]["resumed"] is True
+    # live message is delivered after the missed one
+    missed = received.index({"text": "missed", "author": "bob"})
+    assert received.index({"text": "back", "author": "alice"}) > missed
+
+
+async def test_restored_session_resume(server):
+    client = Client()
+    client.name = "carol"
+    client.room = "restored"
+    await restore_sessions(server._runner.app, [("/chat", "restored-token", client)])
+    tokens = []
+
+    async def on_session(data):
+        tokens.append(data)
+
+    sio = socketio.AsyncClient()
+    sio.on("session", on_session, namespace="/chat")
+    await sio.connect(
+        "http://127.0.0.1:8080", namespaces=["/chat"], auth={"session": "restored-token"}
+    )
+    await asyncio.sleep(0.2)
+    chat = ClientContainer("/chat")
+    sid = sio.get_sid("/chat")
+    assert tokens[-1]["resumed"] is True
+    assert chat.get_item(sid) is client
+    assert chat.key(sid) == f"/chat {tokens[-1]['token']}"
+    assert chat.key("restored-token") is None
+    await sio.disconnect()
+
+
+async def test_restored_trivia_game_resume(server):
+    # game of two players saved before restart, players keep their old SIDs
+    pack = content_loader.current
+    topic = next(t["pk"] for t in pack.topics if len(pack.questions_for(t["pk"])) > 2)
+    uid = generate_game_uuid()
+    trivia = Trivia()
+    trivia.load_questions(pack)
+    trivia.topic = topic
+    trivia.get_question(topic)
+    states = []
+    for name in ("dave", "erin"):
+        trivia.add_user(f"old-{name}")
+        client = Client()
+        client.create_game("trivia")
+        client.name = name
+        client.game_uid = uid
+        client.sid = f"old-{name}"
+        states.append((CLIENT, f"/trivia token-{name}", client.to_state()))
+    states.append((GAME, uid, trivia.to_state()))
+    await restore_sessions(server._runner.app, restore_containers(states))
+    assert GameContainer().get_item(uid).users == ["token-dave", "token-erin"]
+
+    games = []
+    clients = []
+    for name in ("dave", "erin"):
+        sio = socketio.AsyncClient()
+        sio.on("game", games.append, namespace="/trivia")
+        await sio.connect(
+            "http://127.0.0.1:8080", namespaces=["/trivia"], auth={"session": f"token-{name}"}
+        )
+        clients.append(sio)
+    await asyncio.sleep(0.2)
+    restored = GameContainer().get_item(uid)
+    assert restored.users == [sio.get_sid("/trivia") for sio in clients]
+    answer = {
+        "index": int(restored.answer),
+        "game_uid": uid,
+        "question_count": restored.remaining_question_on_topic(topic) + 1,
+    }
+    for sio in clients:
+        await sio.emit("answer", answer, namespace="/trivia")
+    await asyncio.sleep(0.3)
+    for sio in clients:
+        await sio.disconnect()
+
+    # both players are back in the game room and get the next round
+    assert len(games) == 2
+    assert games[0]["players"] == [{"name": "dave", "score": 1}, {"name": "erin", "score": 1}]
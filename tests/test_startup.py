@@ -0,0 +1,67 @@
+from aiohttp import ClientSession
+
+from src.modules.assets import AssetCache
+from src.modules.startup import StartupReport
+
+
+async def test_asset_cache_preload(tmp_path):
+    (tmp_path / "templates" / "chat").mkdir(parents=True)
+    (tmp_path / "templates" / "index.html").write_text("<p>root</p>")
+    (tmp_path / "templates" / "chat" / "index.html").write_text("<p>chat</p>")
+    (tmp_path / "static" / "js").mkdir(parents=True)
+    (tmp_path / "static" / "js" / "app.js").write_text("let a = 1")
+    cache = AssetCache(tmp_path / "templates", tmp_path / "static")
+    await cache.preload()
+    assert len(cache) == 3
+    assert cache.template("/").body == b"<p>root</p>"
+    assert cache.template("/chat").body == b"<p>chat</p>"
+    assert cache.template("/riddle") is None
+    assert "javascript" in cache.static("js/app.js").content_type
+    assert cache.static("../templates/index.html") is None
+    assert not await cache.reload()
+    (tmp_path / "static" / "js" / "app.js").write_text("let a = 2")
+    assert await cache.reload()
+    assert cache.static("js/app.js").body == b"let a = 2"
+
+
+def test_startup_phases():
+    report = StartupReport()
+    with report.phase("imports"):
+        import src.modules.history  # noqa: F401
+    assert "imports" in report.phases
+    assert report.stats()["warm_in"] is None
+    report.set_warm(True)
+    assert report.stats()["warm"]
+
+
+async def test_server_warm(server):
+    async with ClientSession() as session:
+        async with session.get("http://127.0.0.1:8080/ready") as response:
+            body = await response.json()
+        async with session.get("http://127.0.0.1:8080/src/static/js/socketio.js") as response:
+            assert response.status == 200
+            assert "socketio" in await response.text()
+        async with session.get("http://127.0.0.1:8080/chat") as response:
+            assert response.status == 200
+            assert response.content_type == "text/html"
+    assert body["startup"]["warm"]
+    assert {"socketio attach", "namespaces", "preload", "state restore"} <= set(
+        body["startup"]["phases"]
+    )
+
+
+
+async def test_static_not_modified(server):
+    url = "http://127.0.0.1:8080/src/static/js/socketio.js"
+    async with ClientSession() as session:
+        async with session.get(url) as response:
+            etag = response.headers["ETag"]
+            last_modified = response.headers["Last-Modified"]
+            assert response.headers["Cache-Control"] == "no-cache"
+        async with session.get(url, headers={"If-None-Match": etag}) as response:
+            assert response.status == 304
+            assert await response.read() == b""
+        async with session.get(url, headers={"If-Modified-Since": last_modified}) as response:
+            assert response.status == 304
+        async with session.get(url, headers={"If-None-Match": '"stale"'}) as response:
+            assert response.status == 200
@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from src.apps.base import BaseNamespace
+from src.modules.actor import GameActor
+from src.modules.tracing import FileSpanExporter, Tracer, bind, detached_task, span
+
+
+class EchoApp(BaseNamespace):
+    def __init__(self, namespace=None) -> None:
+        super().__init__(namespace)
+        self.actor = GameActor()
+
+    async def on_echo(self, sid, data):
+        with span("validate", size=len(data)):
+            pass
+        return await self.actor.send(bind(self._process, "game.actor"), data)
+
+    async def _process(self, data):
+        with span("game.update"):
+            return data
+
+
+def read_spans(path) -> list[dict]:
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource in json.loads(line)["resourceSpans"]:
+            for scope in resource["scopeSpans"]:
+                spans.extend(scope["spans"])
+    return spans
+
+
+async def test_span_noop_without_trace():
+    with span("free") as current:
+        assert current is None
+
+
+async def test_tracer_export_otlp(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(FileSpanExporter(path), sample_rate=1.0)
+    namespace = EchoApp("/trace")
+    namespace.add_middleware(tracer.middleware)
+    assert await namespace.trigger_event("echo", "sid", "data") == "data"
+    await tracer.stop()
+
+    spans = {item["name"]: item for item in read_spans(path)}
+    assert set(spans) == {"/trace:echo", "validate", "game.actor", "game.update"}
+    root = spans["/trace:echo"]
+    assert root["kind"] == 2
+    assert "parentSpanId" not in root
+    assert {item["traceId"] for item in spans.values()} == {root["traceId"]}
+    assert spans["validate"]["parentSpanId"] == root["spanId"]
+    assert spans["game.update"]["parentSpanId"] == spans["game.actor"]["spanId"]
+    assert spans["validate"]["attributes"] == [{"key": "size", "value": {"intValue": "4"}}]
+    assert int(root["endTimeUnixNano"]) >= int(spans["game.update"]["endTimeUnixNano"])
+
+
+async def test_tracer_sampling_off(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(FileSpanExporter(path), sample_rate=0.0)
+    namespace = EchoApp("/trace-off")
+    namespace.add_middleware(tracer.middleware)
+    for _ in range(10):
+        await namespace.trigger_event("echo", "sid", "data")
+    await tracer.stop()
+    assert tracer.exporter.exported == 0
+    assert not path.exists()
+
+
+async def test_background_task_outside_of_trace(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(FileSpanExporter(path), sample_rate=1.0)
+    started = asyncio.Event()
+    tasks = []
+
+    async def work():
+        await started.wait()
+        with span("background.work"):
+            pass
+
+    class BackgroundApp(BaseNamespace):
+        async def on_start(self, sid):
+            tasks.append(detached_task(work()))
+
+    namespace = BackgroundApp("/trace-background")
+    namespace.add_middleware(tracer.middleware)
+    await namespace.trigger_event("start", "sid")
+    started.set()
+    await tasks[0]
+    await tracer.stop()
+    assert [item["name"] for item in read_spans(path)] == ["/trace-background:start"]
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import aiohttp
+import pytest
+import socketio
+from aiohttp import web
+from socketio import packet
+
+import src
+from src.apps import riddle
+from src.modules import transport
+from src.modules.transport import (
+    JSON,
+    MSGPACK,
+    MSGPACK_SCRIPT,
+    SERIALIZER_ENV,
+    client_config,
+    get_serializer,
+)
+
+# runs msgpackParser of socketio.js with a JSON codec in place of @msgpack/msgpack
+NODE_PARSER_CHECK = """
+const fs = require('fs');
+const vm = require('vm');
+const context = vm.createContext({window: {}, TextEncoder, TextDecoder, Uint8Array});
+vm.runInContext(fs.readFileSync(process.argv[1], 'utf8'), context);
+const codec = {
+  encode: (value) => new TextEncoder().encode(JSON.stringify(value)),
+  decode: (bytes) => JSON.parse(new TextDecoder().decode(bytes)),
+};
+const {Encoder, Decoder} = vm.runInContext('msgpackParser', context)(codec);
+const chunks = new Encoder().encode(JSON.parse(process.argv[2]));
+const decoder = new Decoder();
+const decoded = [];
+decoder.on('decoded', (packet) => decoded.push(packet));
+decoder.add(chunks[0].buffer);
+decoder.destroy();
+decoder.add(chunks[0].buffer);
+process.stdout.write(JSON.stringify({chunks: chunks.length, decoded}));
+"""
+
+
+def test_get_serializer(monkeypatch):
+    monkeypatch.delenv(SERIALIZER_ENV, raising=False)
+    assert get_serializer() == JSON
+    monkeypatch.setenv(SERIALIZER_ENV, "xml")
+    assert get_serializer() == JSON
+    monkeypatch.setenv(SERIALIZER_ENV, MSGPACK)
+    monkeypatch.setattr(transport, "msgpack", None)
+    assert get_serializer() == JSON
+
+
+def test_client_config():
+    assert MSGPACK_SCRIPT not in client_config(JSON)
+    # codec is loaded only by pages of MessagePack deployments
+    assert MSGPACK_SCRIPT in client_config(MSGPACK)
+
+
+def test_msgpack_packet_format():
+    msgpack = pytest.importorskip("msgpack")
+    from socketio.msgpack_packet import MsgPackPacket
+
+    # socket.io-client packet objects are encoded as is by msgpackParser
+    sent = {"type": packet.EVENT, "nsp": "/riddle", "data": ["answer", {"text": "ёлка"}], "id": 3}
+    received = MsgPackPacket(encoded_packet=msgpack.packb(sent))
+    assert (received.packet_type, received.namespace, received.data, received.id) == (
+        packet.EVENT, "/riddle", ["answer", {"text": "ёлка"}], 3
+    )
+    reply = MsgPackPacket(packet.ACK, data=[{"accepted": True}], namespace="/trivia", id=3)
+    assert msgpack.unpackb(reply.encode()) == {
+        "type": packet.ACK, "nsp": "/trivia", "data": [{"accepted": True}], "id": 3
+    }
+
+
+def test_browser_msgpack_parser():
+    if (node := shutil.which("node")) is None:
+        pytest.skip("node isn't installed")
+    script = Path(src.__file__).parent / "static" / "js" / "socketio.js"
+    sent = {"type": packet.EVENT, "nsp": "/chat", "data": ["send_message", {"text": "hi"}]}
+    result = subprocess.run(
+        [node, "-e", NODE_PARSER_CHECK, str(script), json.dumps(sent)],
+        capture_output=True, text=True, timeout=30, check=True,
+    )
+    assert json.loads(result.stdout) == {"chunks": 1, "decoded": [sent]}
+
+
+async def test_transport_script(server):
+    async with aiohttp.ClientSession() as session:
+        async with session.get("http://127.0.0.1:8080/transport.js") as response:
+            assert response.status == 200
+            assert f'SOCKETIO_SERIALIZER = "{JSON}"' in await response.text()
+
+
+async def test_msgpack_packets():
+    pytest.importorskip("msgpack")
+    app = web.Application()
+    sio = socketio.AsyncServer(async_mode="aiohttp", serializer=MSGPACK)
+    sio.attach(app)
+    sio.register_namespace(riddle.RiddleApp(riddle.NAMESPACE))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, port=8092)
+    await site.start()
+
+    received = []
+    client = socketio.AsyncClient(serializer=MSGPACK)
+    client.on("riddle", lambda data: received.append(data), namespace=riddle.NAMESPACE)
+    await client.connect(
+        "http://127.0.0.1:8092", namespaces=[riddle.NAMESPACE], transports=["websocket"]
+    )
+    await client.emit("next", {}, namespace=riddle.NAMESPACE)
+    await asyncio.sleep(0.3)
+    await client.disconnect()
+    await runner.cleanup()
+    assert received and received[0]["text"]
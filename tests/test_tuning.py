@@ -0,0 +1,57 @@
+import asyncio
+import sys
+
+import aiohttp
+
+from src.modules.tuning import (
+    DEFAULT_PROFILE,
+    PORT,
+    PORT_ENV,
+    PROFILE_ENV,
+    PROFILES,
+    get_port,
+    get_profile,
+    install_event_loop,
+    server_options,
+)
+
+
+def test_get_profile(monkeypatch):
+    monkeypatch.delenv(PROFILE_ENV, raising=False)
+    assert get_profile().name == DEFAULT_PROFILE
+    monkeypatch.setenv(PROFILE_ENV, "websocket")
+    assert get_profile().transports == ("websocket",)
+    monkeypatch.setenv(PROFILE_ENV, "fastest")
+    assert get_profile().name == DEFAULT_PROFILE
+
+
+def test_get_port(monkeypatch):
+    monkeypatch.setenv(PORT_ENV, "9000")
+    assert get_port() == 9000
+    monkeypatch.setenv(PORT_ENV, "http")
+    assert get_port() == PORT
+
+
+def test_server_options():
+    options = server_options(PROFILES["throughput"])
+    assert options["transports"] == ["websocket"]
+    assert options["ping_interval"] == 60.0
+    assert options["compression_threshold"] == 8192
+    assert server_options(PROFILES[DEFAULT_PROFILE])["transports"] == ["polling", "websocket"]
+
+
+def test_install_event_loop(monkeypatch):
+    policy = asyncio.get_event_loop_policy()
+    assert install_event_loop(PROFILES[DEFAULT_PROFILE]) == "asyncio"
+    # uvloop is optional, a missing package keeps asyncio loop
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    assert install_event_loop(PROFILES["uvloop"]) == "asyncio"
+    assert asyncio.get_event_loop_policy() is policy
+
+
+async def test_ready_profile(server):
+    async with aiohttp.ClientSession() as session:
+        async with session.get("http://127.0.0.1:8080/ready") as response:
+            tuning = (await response.json())["tuning"]
+    assert tuning["profile"] == DEFAULT_PROFILE
+    assert tuning["loop"] in ("asyncio", "uvloop")